@@ -1,9 +1,14 @@
 """問題の分布を分析するスクリプト"""
-import sqlite3
+import random
 import sys
 from pathlib import Path
 from collections import Counter
-import re
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_bank import QuestionBank
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "questions.db"
@@ -14,57 +19,34 @@ def analyze_distribution():
         print(f"エラー: データベースファイルが見つかりません: {DB_PATH}")
         return
     
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+    bank = QuestionBank.load(DB_PATH, columns=['id', 'text', 'category', 'difficulty', 'tags'])
     
     # 総問題数
-    cursor.execute('SELECT COUNT(*) FROM questions')
-    total_count = cursor.fetchone()[0]
+    total_count = len(bank)
     print(f"\n{'='*60}")
     print(f"総問題数: {total_count}問")
     print(f"{'='*60}\n")
     
     # カテゴリ別の集計
     print("【カテゴリ別の分布】")
-    cursor.execute('''
-        SELECT category, COUNT(*) 
-        FROM questions 
-        GROUP BY category
-        ORDER BY category
-    ''')
-    category_counts = {}
-    for row in cursor.fetchall():
-        category_counts[row[0]] = row[1]
-        percentage = (row[1] / total_count * 100) if total_count > 0 else 0
-        print(f"  {row[0]}: {row[1]}問 ({percentage:.1f}%)")
+    category_counts = dict(sorted(bank.group_count('category').items()))
+    for category, count in category_counts.items():
+        percentage = (count / total_count * 100) if total_count > 0 else 0
+        print(f"  {category}: {count}問 ({percentage:.1f}%)")
     
     # 難易度別の集計
     print("\n【難易度別の分布】")
-    cursor.execute('''
-        SELECT difficulty, COUNT(*) 
-        FROM questions 
-        GROUP BY difficulty
-        ORDER BY difficulty
-    ''')
-    difficulty_counts = {}
-    for row in cursor.fetchall():
-        difficulty_counts[row[0]] = row[1]
-        percentage = (row[1] / total_count * 100) if total_count > 0 else 0
-        print(f"  {row[0]}: {row[1]}問 ({percentage:.1f}%)")
+    difficulty_counts = dict(sorted(bank.group_count('difficulty').items()))
+    for difficulty, count in difficulty_counts.items():
+        percentage = (count / total_count * 100) if total_count > 0 else 0
+        print(f"  {difficulty}: {count}問 ({percentage:.1f}%)")
     
     # カテゴリ×難易度別の集計
     print("\n【カテゴリ×難易度別の分布】")
-    cursor.execute('''
-        SELECT category, difficulty, COUNT(*) 
-        FROM questions 
-        GROUP BY category, difficulty
-        ORDER BY category, difficulty
-    ''')
     expected_per_category_difficulty = total_count / (len(category_counts) * len(difficulty_counts)) if category_counts and difficulty_counts else 0
     
     distribution_data = []
-    for row in cursor.fetchall():
-        category, difficulty, count = row
+    for (category, difficulty), count in sorted(bank.group_count('category', 'difficulty').items()):
         distribution_data.append((category, difficulty, count))
         expected = expected_per_category_difficulty
         deviation = count - expected
@@ -90,32 +72,21 @@ def analyze_distribution():
     
     # 問題文の類似度チェック（最初の50文字で比較）
     print("\n【問題文の類似度チェック】")
-    cursor.execute('SELECT text FROM questions LIMIT 100')
-    texts = [row[0] for row in cursor.fetchall()]
+    sample_rows = range(min(100, total_count))
     
-    if len(texts) > 1:
+    if len(sample_rows) > 1:
         # 問題文の最初の30文字を抽出して類似パターンを検出
-        prefixes = [text[:30] for text in texts]
-        prefix_counter = Counter(prefixes)
-        
-        duplicates = {prefix: count for prefix, count in prefix_counter.items() if count > 1}
+        duplicates = bank.duplicates('text', key=lambda text: text[:30], rows=sample_rows)
         if duplicates:
             print(f"  ⚠️  警告: {len(duplicates)}個の類似した問題文パターンが見つかりました")
-            for prefix, count in list(duplicates.items())[:5]:  # 最初の5つだけ表示
-                print(f"    \"{prefix}...\": {count}回")
+            for prefix, rows in list(duplicates.items())[:5]:  # 最初の5つだけ表示
+                print(f"    \"{prefix}...\": {len(rows)}回")
         else:
             print(f"  ✓ 問題文の多様性は良好です")
     
     # タグの分布
     print("\n【タグの分布】")
-    cursor.execute('SELECT tags FROM questions')
-    all_tags = []
-    for row in cursor.fetchall():
-        if row[0]:
-            tags = [tag.strip() for tag in row[0].split(',')]
-            all_tags.extend(tags)
-    
-    tag_counter = Counter(all_tags)
+    tag_counter = bank.tag_counts()
     print(f"  使用されているタグ数: {len(tag_counter)}")
     print(f"  最も使用されているタグ（上位10個）:")
     for tag, count in tag_counter.most_common(10):
@@ -124,20 +95,10 @@ def analyze_distribution():
     
     # サンプル問題を表示
     print("\n【サンプル問題（各カテゴリ×難易度から1問ずつ）】")
-    cursor.execute('''
-        SELECT id, text, category, difficulty 
-        FROM questions 
-        ORDER BY category, difficulty, RANDOM()
-        LIMIT 12
-    ''')
-    shown_combinations = set()
-    for row in cursor.fetchall():
-        combo = (row[2], row[3])
-        if combo not in shown_combinations:
-            shown_combinations.add(combo)
-            print(f"  [{row[0]}] {row[1][:60]}... ({row[2]}/{row[3]})")
-    
-    conn.close()
+    rows_by_combination = bank.group_rows('category', 'difficulty')
+    for category, difficulty in sorted(rows_by_combination):
+        question = bank.row(random.choice(rows_by_combination[(category, difficulty)]))
+        print(f"  [{question['id']}] {question['text'][:60]}... ({category}/{difficulty})")
     
     print(f"\n{'='*60}")
     print("分析完了")
@@ -1,141 +1,134 @@
-"""既存のJSONファイルのanswerIndexを均等化するスクリプト"""
+"""answerIndex（正解の位置）を均等化するスクリプト
+
+questions.db全体、または複数のJSONファイル全体を対象に、category × difficulty × region（--byで変更可）の
+層ごとに正解の位置が均等になるよう選択肢を入れ替える。均等化の処理はutils/answer_balance.pyを参照。
+"""
 import json
-import random
 import sys
 from pathlib import Path
 
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from json_to_db import DB_PATH, convert_new_schema_to_db_format, expand_json_inputs
+from utils.answer_balance import (
+    DEFAULT_STRATA,
+    OPTION_COUNT,
+    STRATUM_COLUMNS,
+    balance_database,
+    balance_json_files,
+)
+from utils.question_pack import PACK_SUFFIX, write_question_pack
+from utils.weekly_artifacts import is_weekly_recap_file, write_compressed_variants, write_manifest
+
+# 層の列名 → JSONの問題のフィールド名
+JSON_FIELDS = {
+    'category': 'category',
+    'difficulty': 'difficulty',
+    'region': 'region',
+    'league': 'league',
+    'quiz_type': 'quizType',
+    'category_id': 'categoryId',
+    'team_id': 'teamId',
+}
+
+
+def format_distribution(counts: list) -> str:
+    return ', '.join(f"[{index}]: {counts[index]}" for index in range(OPTION_COUNT))
+
+
+def print_result(result: dict, dry_run: bool):
+    print(f"対象: {result['total']}問（{result['strata']}層）, 対象外（選択肢が{OPTION_COUNT}つでない等）: {result['skipped']}問")
+    print(f"現在の分布: {format_distribution(result['before'])}")
+    print(f"均等化後の分布: {format_distribution(result['after'])}")
+    action = '入れ替える問題' if dry_run else '選択肢を入れ替えた問題'
+    print(f"{action}: {result['moved']}問")
+
 
-def balance_answer_indices(questions: list) -> list:
-    """
-    問題リストのanswerIndexを均等に分散させる
-    
-    選択肢の順序をシャッフルして、正解のインデックスを均等に分散させます。
-    これにより、ユーザーが特定のインデックスに偏って正解を選ぶことを防ぎます。
-    
-    Args:
-        questions: 問題のリスト
-    
-    Returns:
-        answerIndexが均等に分散された問題のリスト
-    """
-    if not questions:
-        return questions
-    
-    # 各インデックスの目標数を計算
-    total = len(questions)
-    target_per_index = total // 4
-    remainder = total % 4
-    
-    # 各インデックスの目標数を設定（余りは0,1,2,3に順に分配）
-    targets = [target_per_index] * 4
-    for i in range(remainder):
-        targets[i] += 1
-    
-    # 現在の分布を確認
-    current_counts = [0, 0, 0, 0]
-    for q in questions:
-        idx = q.get('answerIndex', 0)
-        if 0 <= idx <= 3:
-            current_counts[idx] += 1
-    
-    print(f"現在の分布: [0]: {current_counts[0]}, [1]: {current_counts[1]}, [2]: {current_counts[2]}, [3]: {current_counts[3]}")
-    print(f"目標分布: [0]: {targets[0]}, [1]: {targets[1]}, [2]: {targets[2]}, [3]: {targets[3]}")
-    
-    # 各問題について、必要に応じて選択肢をシャッフル
-    balanced_questions = []
-    new_counts = [0, 0, 0, 0]
-    
-    for question in questions:
-        original_index = question.get('answerIndex', 0)
-        if not (0 <= original_index <= 3):
-            original_index = 0
-        
-        # 現在の分布と目標分布を比較して、どのインデックスに割り当てるか決定
-        # 最も不足しているインデックスを優先的に使用
-        best_index = 0
-        min_ratio = float('inf')
-        for idx in range(4):
-            if new_counts[idx] < targets[idx]:
-                # 目標に対する現在の割合を計算
-                ratio = new_counts[idx] / targets[idx] if targets[idx] > 0 else 0
-                if ratio < min_ratio:
-                    min_ratio = ratio
-                    best_index = idx
-        
-        # 選択肢をシャッフルして、正解を指定されたインデックスに移動
-        options = question.get('options', [])
-        if len(options) == 4:
-            # 正解の選択肢を取得
-            correct_answer = options[original_index]
-            
-            # 選択肢をシャッフル（正解は除く）
-            other_options = [opt for i, opt in enumerate(options) if i != original_index]
-            random.shuffle(other_options)
-            
-            # 正解を指定されたインデックスに配置
-            new_options = other_options[:best_index] + [correct_answer] + other_options[best_index:]
-            
-            # 問題を更新
-            balanced_question = question.copy()
-            balanced_question['options'] = new_options
-            balanced_question['answerIndex'] = best_index
-            balanced_questions.append(balanced_question)
-            new_counts[best_index] += 1
-        else:
-            # 選択肢が4つでない場合はそのまま追加
-            balanced_questions.append(question)
-            if 0 <= original_index <= 3:
-                new_counts[original_index] += 1
-    
-    print(f"均等化後の分布: [0]: {new_counts[0]}, [1]: {new_counts[1]}, [2]: {new_counts[2]}, [3]: {new_counts[3]}")
-    
-    return balanced_questions
+def json_stratum(strata: list):
+    """JSONの問題から、DBに登録する場合と同じ値の層を返す関数"""
+    def stratum_of(question: dict) -> tuple:
+        converted = convert_new_schema_to_db_format(question)
+        return tuple(converted.get(JSON_FIELDS[column]) for column in strata)
+    return stratum_of
+
+
+def refresh_weekly_artifacts(json_files: list):
+    """書き換えたWeekly Recapファイルの問題パック・圧縮版・マニフェストを作り直す"""
+    output_dirs = set()
+    for json_path in json_files:
+        if not is_weekly_recap_file(json_path):
+            continue
+        pack_path = json_path.with_suffix(PACK_SUFFIX)
+        if pack_path.exists():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                write_question_pack(json.load(f), pack_path)
+        write_compressed_variants(json_path)
+        output_dirs.add(json_path.parent)
+    for output_dir in sorted(output_dirs):
+        manifest_path, updated = write_manifest(output_dir)
+        if updated:
+            print(f"マニフェスト更新: {manifest_path}")
 
 
 def main():
     """メイン処理"""
     import argparse
-    
-    parser = argparse.ArgumentParser(description='既存のJSONファイルのanswerIndexを均等化する')
-    parser.add_argument('input_file', help='入力JSONファイルのパス')
-    parser.add_argument('--output', '-o', help='出力JSONファイルのパス（指定しない場合は入力ファイルを上書き）')
-    parser.add_argument('--backup', action='store_true', help='元のファイルをバックアップする')
-    
+
+    parser = argparse.ArgumentParser(description='answerIndexを層（category × difficulty × region）ごとに均等化する')
+    parser.add_argument('inputs', nargs='*',
+                        help='均等化するJSONファイル・ディレクトリ・globパターン（指定したファイル全体で均等化）')
+    parser.add_argument('--db', nargs='?', const=str(DB_PATH),
+                        help='questions.dbの全問題を均等化する（パス省略時: data/questions.db）')
+    parser.add_argument('--by', nargs='+', choices=STRATUM_COLUMNS, default=list(DEFAULT_STRATA),
+                        help=f"層に使用する列（デフォルト: {' '.join(DEFAULT_STRATA)}）")
+    parser.add_argument('--seed', type=int, help='乱数のシード（指定すると同じ結果を再現できる）')
+    parser.add_argument('--dry-run', action='store_true', help='分布と入れ替える問題数のみ表示し、書き換えない')
+    parser.add_argument('--output', '-o', help='出力JSONファイルのパス（JSONファイルを1つ指定した場合のみ）')
+    parser.add_argument('--backup', action='store_true', help='書き換える前に元のJSONファイルを.json.bakにコピーする')
+
     args = parser.parse_args()
-    
-    input_path = Path(args.input_file)
-    if not input_path.exists():
-        print(f"エラー: ファイルが見つかりません: {input_path}")
+
+    if bool(args.inputs) == bool(args.db):
+        parser.error("JSONファイル（またはディレクトリ）と--dbのどちらか一方を指定してください")
+
+    if args.db:
+        db_path = Path(args.db)
+        if not db_path.exists():
+            print(f"エラー: データベースファイルが見つかりません: {db_path}")
+            sys.exit(1)
+        print(f"データベース: {db_path}（層: {' × '.join(args.by)}）")
+        result = balance_database(db_path, strata=args.by, seed=args.seed, dry_run=args.dry_run)
+        print_result(result, args.dry_run)
+        if result['moved'] and not args.dry_run:
+            print("JSONファイルを変更して再登録すると、そのファイルの問題は元の選択肢の順序に戻ります。"
+                  "JSONファイルも均等化する場合は、同じ条件でJSONファイルを指定して実行してください。")
+        return
+
+    json_files = expand_json_inputs(args.inputs)
+    if not json_files:
+        print("エラー: JSONファイルが見つかりません")
         sys.exit(1)
-    
-    # JSONファイルを読み込む
-    print(f"読み込み中: {input_path}")
-    with open(input_path, 'r', encoding='utf-8') as f:
-        questions = json.load(f)
-    
-    print(f"問題数: {len(questions)}問")
-    
-    # バックアップを作成
-    if args.backup:
-        backup_path = input_path.with_suffix('.json.bak')
-        print(f"バックアップ作成中: {backup_path}")
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(questions, f, ensure_ascii=False, indent=2)
-    
-    # answerIndexを均等化
-    balanced_questions = balance_answer_indices(questions)
-    
-    # 出力ファイルを決定
+    outputs = None
     if args.output:
-        output_path = Path(args.output)
-    else:
-        output_path = input_path
-    
-    # JSONファイルに保存
-    print(f"保存中: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(balanced_questions, f, ensure_ascii=False, indent=2)
-    
+        if len(json_files) != 1:
+            parser.error("--output はJSONファイルを1つ指定した場合のみ使用できます")
+        outputs = {json_files[0]: Path(args.output)}
+
+    print(f"JSONファイル: {len(json_files)}件（層: {' × '.join(args.by)}）")
+    result = balance_json_files(
+        json_files, strata=args.by, seed=args.seed, dry_run=args.dry_run, backup=args.backup,
+        stratum_of=json_stratum(args.by), outputs=outputs
+    )
+    for json_file, error in result['errors'].items():
+        print(f"スキップ: {json_file}（{error}）")
+    print_result(result, args.dry_run)
+    if args.dry_run:
+        return
+    for json_path in result['files']:
+        print(f"保存: {json_path}")
+    refresh_weekly_artifacts(result['files'])
     print("完了しました！")
 
 
@@ -0,0 +1,150 @@
+"""スクリプトの起動時間（インポート時間）のベンチマーク
+
+各モジュールを新しいプロセスで `python -X importtime` を付けてインポートし、インポートにかかった時間と
+読み込まれたモジュールを確認する。GEMINI_API_KEYを除いた環境で実行するため、
+APIキーなしでインポートできるかどうかも確認できる。
+
+- APIを使わないスクリプト（OFFLINE_MODULES）: 予算（--budget-ms）以内にインポートできること
+- すべてのモジュール: インポート時にGemini SDK（google.genai）を読み込まないこと
+
+予算を超えた・SDKを読み込んだ・インポートに失敗したモジュールがある場合は終了コード1で終了する。
+"""
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# scriptsディレクトリ（インポートするモジュールの基準）
+scripts_dir = Path(__file__).parent
+
+# APIを使わないスクリプト・モジュール（予算以内にインポートできること）
+OFFLINE_MODULES = [
+    'json_to_db',
+    'report',
+    'check_near_duplicates',
+    'balance_answer_indices',
+    'export_question_pack',
+    'build_weekly_manifest',
+    'utils.weekly_questions',
+    'utils.question_validator',
+    'utils.answer_balance',
+]
+# APIを使うモジュール（インポート時にSDKを読み込まないこと。予算は確認しない）
+API_MODULES = [
+    'utils.gemini_client',
+    'generate_weekly_recap',
+]
+# インポート時に読み込んではいけないモジュール（SDKとその依存）
+FORBIDDEN_MODULES = ('google.genai',)
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_REPEAT = 5
+MAX_SLOWEST = 5
+
+
+def run_importtime(statement: str) -> tuple:
+    """python -X importtimeでstatementを実行し、(終了コード, [(モジュール名, 自身の時間μs, 累積時間μs)], エラー) を返す"""
+    env = {key: value for key, value in os.environ.items() if key != 'GEMINI_API_KEY'}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(scripts_dir), env.get('PYTHONPATH')]))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=str(scripts_dir), env=env, capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    entries = []
+    errors = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            errors.append(line)
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 見出しの行
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return completed.returncode, entries, '\n'.join(errors).strip()
+
+
+def measure_module(module: str, baseline: set, repeat: int) -> dict:
+    """moduleのインポート時間（repeat回の中央値、ミリ秒）と、読み込まれたモジュールを計測"""
+    times = []
+    modules = {}
+    for _ in range(repeat):
+        returncode, entries, error = run_importtime(f'import {module}')
+        if returncode != 0:
+            return {'module': module, 'ok': False, 'error': error.splitlines()[-1] if error else f'終了コード {returncode}'}
+        # インタープリターの起動時に読み込まれるモジュール（baseline）を除いた、自身の時間の合計
+        own = [(name, self_us, cumulative_us) for name, self_us, cumulative_us in entries if name not in baseline]
+        times.append(sum(self_us for _, self_us, _ in own) / 1000)
+        for name, _, cumulative_us in own:
+            modules[name] = min(modules.get(name, cumulative_us), cumulative_us)
+    slowest = sorted(
+        (item for item in modules.items() if item[0] != module), key=lambda item: -item[1]
+    )[:MAX_SLOWEST]
+    return {
+        'module': module,
+        'ok': True,
+        'import_ms': statistics.median(times),
+        'module_count': len(modules),
+        'forbidden': sorted(name for name in modules if name.startswith(FORBIDDEN_MODULES)),
+        'slowest': [(name, cumulative_us / 1000) for name, cumulative_us in slowest],
+    }
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='スクリプトのインポート時間（python -X importtime）のベンチマーク')
+    parser.add_argument('modules', nargs='*',
+                        help='計測するモジュール（省略時はAPIを使わないスクリプトとAPIクライアント）')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'APIを使わないモジュールのインポート時間の上限（ミリ秒、デフォルト: {DEFAULT_BUDGET_MS:g}）')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'1モジュールあたりの計測回数（中央値を使用、デフォルト: {DEFAULT_REPEAT}）')
+    parser.add_argument('--verbose', action='store_true', help='時間のかかった依存モジュールも表示する')
+
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat は1以上を指定してください")
+    modules = args.modules or OFFLINE_MODULES + API_MODULES
+
+    # インタープリターの起動時に読み込まれるモジュール
+    _, baseline_entries, _ = run_importtime('pass')
+    baseline = {name for name, _, _ in baseline_entries}
+
+    print("=" * 60)
+    print("インポート時間のベンチマーク（GEMINI_API_KEYなし）")
+    print("=" * 60)
+    print(f"予算: {args.budget_ms:g}ms（APIを使わないモジュール）, 計測回数: {args.repeat}")
+    print("-" * 60)
+
+    failures = []
+    for module in modules:
+        result = measure_module(module, baseline, args.repeat)
+        if not result['ok']:
+            print(f"  {module:<28} インポートに失敗しました: {result['error']}")
+            failures.append(module)
+            continue
+        over_budget = module not in API_MODULES and result['import_ms'] > args.budget_ms
+        status = []
+        if over_budget:
+            status.append('予算超過')
+        if result['forbidden']:
+            status.append(f"SDKを読み込み: {', '.join(result['forbidden'][:3])}")
+        print(f"  {module:<28} {result['import_ms']:>8.1f}ms  {result['module_count']:>4}モジュール"
+              f"  {'/'.join(status) if status else 'OK'}")
+        if args.verbose or status:
+            for name, cumulative_ms in result['slowest']:
+                print(f"      {name:<36} {cumulative_ms:>8.1f}ms")
+        if status:
+            failures.append(module)
+
+    print("-" * 60)
+    if failures:
+        print(f"問題のあるモジュール: {len(failures)}件（{', '.join(failures)}）")
+        sys.exit(1)
+    print("すべてのモジュールが条件を満たしています")
+
+
+if __name__ == "__main__":
+    main()
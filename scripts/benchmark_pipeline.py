@@ -0,0 +1,344 @@
+"""データパイプラインのベンチマークスクリプト
+
+合成問題（utils/synthetic_questions.py）で、JSONの読み込み・変換・検証・登録・均等化・重複チェック・
+レスポンスからのJSONの抽出を、問題数（デフォルト: 1千・1万・10万・100万問）ごとに計測する。
+結果はJSONファイルに保存し、--compareで以前の結果（別のコミットなど）と比較できる。
+ファイルとデータベースは一時ディレクトリに作成し、data/questions.dbは変更しない。
+"""
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from json_to_db import (
+    bulk_insert_questions_to_db,
+    convert_new_schema_to_db_format,
+    create_database_schema,
+    find_duplicate_questions,
+    insert_questions_to_db,
+    iter_questions_from_json,
+    load_questions_from_json,
+)
+from utils.answer_balance import balance_answer_indices
+from utils.json_stream import JsonArrayStreamParser
+from utils.near_duplicates import find_similar_pairs
+from utils.question_validator import validate_questions
+from utils.synthetic_questions import generate_questions, model_response_text, write_questions_json
+from utils.weekly_questions import extract_json_text, load_questions_json
+
+PROJECT_ROOT = Path(__file__).parent.parent
+RESULTS_DIR = PROJECT_ROOT / "scripts" / ".cache" / "benchmarks"
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# 重複チェックの計測で、先に生成した問題と同じ内容にする問題の割合
+DUPLICATE_RATIO = 0.1
+# ストリーミングで届くレスポンスを模した1回あたりの文字数
+STREAM_CHUNK_SIZE = 4096
+# 1問ずつ処理するため時間のかかるケースの、デフォルトの最大問題数（--no-limitで解除）
+CASE_SIZE_LIMITS = {
+    'insert_questions_to_db': 100_000,
+    'find_similar_pairs': 100_000,
+}
+# --compareで遅くなったと判定する比率のデフォルト
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+
+
+def _write_file(workdir: Path, questions: list, layout: str) -> Path:
+    path = workdir / f"questions_{layout}.json"
+    write_questions_json(path, questions, layout)
+    return path
+
+
+def _new_database(workdir: Path, name: str) -> str:
+    db_path = str(workdir / name)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        create_database_schema(db_path)
+    return db_path
+
+
+def _quiet(function, *args, **kwargs):
+    """関数の出力（問題ごとのログ）を捨てて実行する"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        return function(*args, **kwargs)
+
+
+# ケース名 → (準備, 計測する処理)
+# 準備: (問題のリスト, 作業ディレクトリ) を受け取り、計測する処理に渡す値を返す（計測時間に含めない）
+def _prepare_none(questions, workdir):
+    return questions
+
+
+def _prepare_array_file(questions, workdir):
+    return _write_file(workdir, questions, 'array')
+
+
+def _prepare_weekly_file(questions, workdir):
+    return _write_file(workdir, questions, 'weekly')
+
+
+def _prepare_database(questions, workdir):
+    return questions, _new_database(workdir, 'benchmark.db')
+
+
+def _prepare_duplicates(questions, workdir):
+    items = [
+        (question['id'], question['text'], question['options'])
+        for question in generate_questions(len(questions), seed=1, duplicate_ratio=DUPLICATE_RATIO)
+    ]
+    return items, _new_database(workdir, 'dedupe.db')
+
+
+def _prepare_similar(questions, workdir):
+    return [(question['id'], question['text']) for question in questions]
+
+
+def _prepare_response(questions, workdir):
+    return model_response_text(questions)
+
+
+def _run_load(path):
+    return {'questions': len(load_questions_from_json(str(path), verbose=False))}
+
+
+def _run_iter(path):
+    return {'questions': sum(1 for _ in iter_questions_from_json(path))}
+
+
+def _run_convert(questions):
+    for question in questions:
+        convert_new_schema_to_db_format(question)
+    return {'questions': len(questions)}
+
+
+def _run_validate(questions):
+    result = validate_questions(questions)
+    return {'questions': result['total'], 'invalid': result['invalid']}
+
+
+def _run_balance(questions):
+    balanced = balance_answer_indices(questions, random.Random(0))
+    moved = sum(1 for before, after in zip(questions, balanced) if before is not after)
+    return {'questions': len(balanced), 'moved': moved}
+
+
+def _run_insert(prepared):
+    questions, db_path = prepared
+    _quiet(insert_questions_to_db, questions, db_path, replace=True, dedupe='off')
+    return {'questions': len(questions)}
+
+
+def _run_bulk_insert(prepared):
+    questions, db_path = prepared
+    result = _quiet(bulk_insert_questions_to_db, questions, db_path, replace=True, dedupe='off')
+    return {'questions': len(questions), 'inserted': result['inserted']}
+
+
+def _run_find_duplicates(prepared):
+    items, db_path = prepared
+    duplicates = find_duplicate_questions(db_path, items)
+    return {'questions': len(items), 'duplicates': len(duplicates)}
+
+
+def _run_find_similar(items):
+    return {'questions': len(items), 'pairs': len(find_similar_pairs(items))}
+
+
+def _run_extract_response(text):
+    questions = load_questions_json(extract_json_text(text), text)
+    return {'questions': len(questions)}
+
+
+def _run_stream_response(text):
+    parser = JsonArrayStreamParser()
+    count = 0
+    for start in range(0, len(text), STREAM_CHUNK_SIZE):
+        count += len(parser.feed(text[start:start + STREAM_CHUNK_SIZE]))
+    return {'questions': count}
+
+
+CASES = {
+    'load_questions_from_json[array]': (_prepare_array_file, _run_load),
+    'load_questions_from_json[weekly]': (_prepare_weekly_file, _run_load),
+    'iter_questions_from_json[weekly]': (_prepare_weekly_file, _run_iter),
+    'convert_new_schema_to_db_format': (_prepare_none, _run_convert),
+    'validate_questions': (_prepare_none, _run_validate),
+    'balance_answer_indices': (_prepare_none, _run_balance),
+    'insert_questions_to_db': (_prepare_database, _run_insert),
+    'bulk_insert_questions_to_db': (_prepare_database, _run_bulk_insert),
+    'find_duplicate_questions': (_prepare_duplicates, _run_find_duplicates),
+    'find_similar_pairs': (_prepare_similar, _run_find_similar),
+    'extract_response_json': (_prepare_response, _run_extract_response),
+    'stream_response_json': (_prepare_response, _run_stream_response),
+}
+
+
+def case_size_limit(case: str):
+    """ケースのデフォルトの最大問題数（制限がない場合はNone）"""
+    return CASE_SIZE_LIMITS.get(case.split('[')[0])
+
+
+def run_case(case: str, questions: list, workdir: Path, repeat: int) -> dict:
+    """1つのケースをrepeat回計測し、最短の時間を返す（準備の時間は含めない）"""
+    prepare, run = CASES[case]
+    timings = []
+    details = {}
+    for _ in range(repeat):
+        prepared = prepare(questions, workdir)
+        start = time.perf_counter()
+        details = run(prepared)
+        timings.append(time.perf_counter() - start)
+        del prepared
+    seconds = min(timings)
+    return {
+        'case': case,
+        'size': len(questions),
+        'seconds': seconds,
+        'median_seconds': statistics.median(timings),
+        'us_per_question': seconds / len(questions) * 1_000_000 if questions else 0.0,
+        'details': details,
+    }
+
+
+def get_commit() -> str:
+    """現在のコミットのハッシュ（gitが使えない場合はNone）"""
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=str(PROJECT_ROOT), capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare_results(results: list, previous: dict) -> list:
+    """以前の結果と比較し、(ケース, 問題数, 以前の秒数, 今回の秒数, 比率) のリストを返す"""
+    previous_seconds = {
+        (result['case'], result['size']): result['seconds']
+        for result in previous.get('results', []) if 'seconds' in result
+    }
+    comparisons = []
+    for result in results:
+        before = previous_seconds.get((result['case'], result['size']))
+        if before and 'seconds' in result:
+            comparisons.append((result['case'], result['size'], before, result['seconds'], result['seconds'] / before))
+    return comparisons
+
+
+def print_results(results: list):
+    print("\n" + "-" * 78)
+    print(f"{'ケース':<36} {'問題数':>10} {'時間':>12} {'1問あたり':>14}")
+    print("-" * 78)
+    for result in results:
+        if 'skipped' in result:
+            print(f"{result['case']:<38} {result['size']:>10,}   スキップ（{result['skipped']}）")
+            continue
+        print(f"{result['case']:<38} {result['size']:>10,} {result['seconds']:>11.3f}s {result['us_per_question']:>12.2f}μs")
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='データパイプライン（読み込み・変換・検証・登録・均等化・重複チェック）のベンチマーク')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f'計測する問題数（デフォルト: {" ".join(str(s) for s in DEFAULT_SIZES)}）')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES),
+                        help='計測するケース（デフォルト: すべて）')
+    parser.add_argument('--repeat', type=int, default=1, help='1ケースあたりの計測回数（最短の時間を使用、デフォルト: 1）')
+    parser.add_argument('--seed', type=int, default=0, help='合成問題の乱数のシード（デフォルト: 0）')
+    parser.add_argument('--no-limit', action='store_true',
+                        help='1問ずつ処理するケース（insert_questions_to_db等）も、10万問を超える問題数で計測する')
+    parser.add_argument('--output', type=str,
+                        help='結果のJSONファイルのパス（デフォルト: scripts/.cache/benchmarks/pipeline-{日時}-{コミット}.json）')
+    parser.add_argument('--compare', type=str, help='比較する以前の結果のJSONファイル')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help=f'--compareで遅くなったと判定する比率（デフォルト: {DEFAULT_REGRESSION_THRESHOLD}）。'
+                             f'超えたケースがある場合は終了コード1')
+
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat は1以上を指定してください")
+    if any(size < 1 for size in args.sizes):
+        parser.error("--sizes は1以上を指定してください")
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    commit = get_commit()
+    print("=" * 60)
+    print("データパイプラインのベンチマーク")
+    print("=" * 60)
+    print(f"コミット: {commit or '不明'}, Python {platform.python_version()}, 計測回数: {args.repeat}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = Path(temp_dir)
+        for size in args.sizes:
+            print(f"\n{size:,}問の合成問題を生成中...")
+            questions = list(generate_questions(size, seed=args.seed))
+            for case in args.cases:
+                limit = case_size_limit(case)
+                if limit is not None and size > limit and not args.no_limit:
+                    results.append({'case': case, 'size': size, 'skipped': f'{limit:,}問まで（--no-limitで計測）'})
+                    continue
+                result = run_case(case, questions, workdir, args.repeat)
+                print(f"  {case:<36} {result['seconds']:>9.3f}s")
+                results.append(result)
+            del questions
+
+    print_results(results)
+
+    output_path = Path(args.output) if args.output else (
+        RESULTS_DIR / f"pipeline-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'unknown'}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        'benchmark': 'pipeline',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'sizes': args.sizes,
+        'results': results,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存しました: {output_path}")
+
+    if previous is not None:
+        comparisons = compare_results(results, previous)
+        print(f"\n【比較】{args.compare}（コミット: {previous.get('commit') or '不明'}）")
+        regressions = 0
+        for case, size, before, after, ratio in comparisons:
+            mark = '  遅くなりました' if ratio > args.threshold else ''
+            regressions += ratio > args.threshold
+            print(f"  {case:<36} {size:>10,} {before:>9.3f}s → {after:>9.3f}s ({ratio:.2f}x){mark}")
+        if not comparisons:
+            print("  比較できる結果がありません（ケース・問題数が一致しません）")
+        if regressions:
+            print(f"{args.threshold:.2f}倍以上遅くなったケース: {regressions}件")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""ランダム抽出方式のベンチマークスクリプト
+
+ORDER BY RANDOM() LIMIT ? と、sort_key列の範囲検索（json_to_db.sample_random_page）の
+1クエリあたりの所要時間を、問題数（デフォルト: 1万・10万・100万件）ごとに比較する。
+データベースは一時ディレクトリに合成データで作成し、data/questions.dbは変更しない。
+"""
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from json_to_db import QUESTION_COLUMNS, build_upsert_sql, create_database_schema, refresh_sort_keys, sample_random_page
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+CATEGORIES = ['rules', 'history', 'teams', 'match_recap']
+DIFFICULTIES = ['easy', 'normal', 'hard']
+REGIONS = ['japan', 'world']
+
+
+def generate_rows(count: int, seed: int = 0):
+    """合成データの行（QUESTION_COLUMNSの順）を生成するジェネレーター"""
+    rng = random.Random(seed)
+    for i in range(count):
+        row = {
+            'id': f"bench_{i:07d}",
+            'text': f"ベンチマーク問題 {i}",
+            'options': '選択肢A|||選択肢B|||選択肢C|||選択肢D',
+            'answerIndex': rng.randrange(4),
+            'explanation': '解説',
+            'category': rng.choice(CATEGORIES),
+            'difficulty': rng.choice(DIFFICULTIES),
+            'tags': 'benchmark',
+            'quiz_type': 'rule',
+            'region': rng.choice(REGIONS),
+        }
+        yield tuple(row.get(column) for column in QUESTION_COLUMNS)
+
+
+def build_database(db_path: str, count: int):
+    """合成データでデータベースを作成し、sort_keyを振る"""
+    create_database_schema(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany(build_upsert_sql(), generate_rows(count))
+        refresh_sort_keys(conn.cursor())
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def time_queries(query, iterations: int) -> float:
+    """query()をiterations回実行し、1回あたりの平均時間（ミリ秒）を返す"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        query()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run_benchmark(count: int, iterations: int, limit: int) -> dict:
+    """1つの問題数について両方式を計測"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = str(Path(temp_dir) / "benchmark.db")
+        build_start = time.perf_counter()
+        build_database(db_path, count)
+        build_seconds = time.perf_counter() - build_start
+
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        rng = random.Random(1)
+
+        def random_filters():
+            return rng.choice(CATEGORIES), rng.choice(DIFFICULTIES), rng.choice(REGIONS)
+
+        def order_by_random():
+            category, difficulty, region = random_filters()
+            cursor.execute(
+                'SELECT * FROM questions WHERE category = ? AND difficulty = ? AND region = ? '
+                'ORDER BY RANDOM() LIMIT ?',
+                (category, difficulty, region, limit)
+            )
+            return cursor.fetchall()
+
+        def sort_key_seek():
+            category, difficulty, region = random_filters()
+            return sample_random_page(cursor, limit, category=category, difficulty=difficulty, region=region)
+
+        # ページキャッシュを温めてから計測
+        order_by_random()
+        sort_key_seek()
+        result = {
+            'rows': count,
+            'build_seconds': build_seconds,
+            'order_by_random_ms': time_queries(order_by_random, iterations),
+            'sort_key_seek_ms': time_queries(sort_key_seek, iterations),
+        }
+        conn.close()
+        return result
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='ORDER BY RANDOM() と sort_key範囲検索のベンチマーク')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f'計測する問題数（デフォルト: {" ".join(str(s) for s in DEFAULT_SIZES)}）')
+    parser.add_argument('--iterations', type=int, default=50, help='1方式あたりのクエリ実行回数（デフォルト: 50）')
+    parser.add_argument('--limit', type=int, default=10, help='1クエリで取得する問題数（デフォルト: 10）')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ランダム抽出方式のベンチマーク")
+    print("=" * 60)
+    print(f"クエリ実行回数: {args.iterations}, 取得件数: {args.limit}")
+
+    results = []
+    for count in args.sizes:
+        print(f"\n{count:,}件のデータベースを作成中...")
+        result = run_benchmark(count, args.iterations, args.limit)
+        print(f"  作成時間: {result['build_seconds']:.1f}秒")
+        results.append(result)
+
+    print("\n" + "-" * 60)
+    print(f"{'問題数':>10} {'ORDER BY RANDOM()':>20} {'sort_key範囲検索':>18} {'倍率':>8}")
+    print("-" * 60)
+    for result in results:
+        speedup = result['order_by_random_ms'] / result['sort_key_seek_ms'] if result['sort_key_seek_ms'] > 0 else 0
+        print(f"{result['rows']:>10,} {result['order_by_random_ms']:>17.3f}ms {result['sort_key_seek_ms']:>15.3f}ms {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Weekly Recapマニフェスト作成スクリプト - 既存のJSONから圧縮版とmanifest.jsonを作成する"""
+import json
+import sys
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.weekly_artifacts import is_weekly_recap_file, write_compressed_variants, write_manifest
+
+# プロジェクトルートを取得（scripts/から見て../）
+PROJECT_ROOT = Path(__file__).parent.parent
+WEEKLY_RECAP_DIR = PROJECT_ROOT / "data" / "weekly_recap"
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Weekly Recapの圧縮版（gzip/brotli）とmanifest.jsonを作成')
+    parser.add_argument('--dir', type=str, default=str(WEEKLY_RECAP_DIR),
+                        help='Weekly RecapのJSONがあるディレクトリ（デフォルト: data/weekly_recap）')
+    parser.add_argument('--manifest-only', action='store_true',
+                        help='圧縮版を作り直さず、manifest.jsonのみを更新する')
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.dir)
+    json_files = sorted(path for path in output_dir.glob("*.json") if is_weekly_recap_file(path))
+    if not json_files:
+        print(f"Weekly RecapのJSONファイルがありません: {output_dir}")
+        sys.exit(1)
+
+    if not args.manifest_only:
+        print(f"{len(json_files)}ファイルの圧縮版を作成します")
+        for json_path in json_files:
+            variants = write_compressed_variants(json_path)
+            sizes = ", ".join(f"{path.name}: {path.stat().st_size:,}" for path in variants)
+            print(f"  {json_path.name} ({json_path.stat().st_size:,}) -> {sizes}")
+
+    manifest_path, updated = write_manifest(output_dir)
+    if updated:
+        print(f"\nマニフェストを更新しました: {manifest_path}")
+    else:
+        print(f"\nマニフェストに変更はありません: {manifest_path}")
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for league_type, date in sorted(manifest['latest'].items()):
+        print(f"  最新 {league_type}: {date}")
+
+
+if __name__ == "__main__":
+    main()
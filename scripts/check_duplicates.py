@@ -1,7 +1,12 @@
 """データベース内の重複問題を確認するスクリプト"""
-import sqlite3
+import sys
 from pathlib import Path
-from collections import Counter
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_bank import QuestionBank
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "questions.db"
@@ -12,53 +17,37 @@ def check_duplicates():
         print(f"エラー: データベースファイルが見つかりません: {DB_PATH}")
         return
     
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-    
     # 全問題を取得
-    cursor.execute('SELECT id, text, category, difficulty FROM questions')
-    questions = cursor.fetchall()
+    bank = QuestionBank.load(DB_PATH, columns=['id', 'text', 'category', 'difficulty'])
     
-    print(f"全問題数: {len(questions)}問")
+    print(f"全問題数: {len(bank)}問")
     
     # IDの重複を確認
-    ids = [q[0] for q in questions]
-    id_counts = Counter(ids)
-    duplicates_by_id = {id: count for id, count in id_counts.items() if count > 1}
+    duplicates_by_id = bank.duplicates('id')
     
     if duplicates_by_id:
         print(f"\nIDの重複: {len(duplicates_by_id)}件")
-        for id, count in duplicates_by_id.items():
-            print(f"  {id}: {count}回")
+        for id, rows in duplicates_by_id.items():
+            print(f"  {id}: {len(rows)}回")
     else:
         print("\nIDの重複: なし")
     
     # 問題文の重複を確認
-    texts = [q[1] for q in questions]
-    text_counts = Counter(texts)
-    duplicates_by_text = {text: count for text, count in text_counts.items() if count > 1}
+    duplicates_by_text = bank.duplicates('text')
     
     if duplicates_by_text:
         print(f"\n問題文の重複: {len(duplicates_by_text)}件")
-        for text, count in list(duplicates_by_text.items())[:10]:  # 最初の10件のみ表示
-            print(f"  {text[:50]}...: {count}回")
+        for text, rows in list(duplicates_by_text.items())[:10]:  # 最初の10件のみ表示
+            print(f"  {text[:50]}...: {len(rows)}回")
         if len(duplicates_by_text) > 10:
             print(f"  ... 他 {len(duplicates_by_text) - 10}件")
     else:
         print("\n問題文の重複: なし")
     
     # カテゴリ・難易度別の集計
-    cursor.execute('''
-        SELECT category, difficulty, COUNT(*) 
-        FROM questions 
-        GROUP BY category, difficulty
-        ORDER BY category, difficulty
-    ''')
     print("\nカテゴリ・難易度別:")
-    for row in cursor.fetchall():
-        print(f"  {row[0]}/{row[1]}: {row[2]}問")
-    
-    conn.close()
+    for (category, difficulty), count in sorted(bank.group_count('category', 'difficulty').items()):
+        print(f"  {category}/{difficulty}: {count}問")
 
 if __name__ == "__main__":
     check_duplicates()
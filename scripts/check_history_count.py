@@ -1,7 +1,13 @@
 """historyカテゴリの問題数を確認するスクリプト"""
-import sqlite3
+import sys
 from pathlib import Path
 
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_bank import QuestionBank
+
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "questions.db"
 
@@ -11,33 +17,21 @@ def check_history_count():
         print(f"エラー: データベースファイルが見つかりません: {DB_PATH}")
         return
     
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+    bank = QuestionBank.load(DB_PATH, columns=['category', 'difficulty'])
     
     # historyカテゴリの問題数を確認
-    cursor.execute('SELECT COUNT(*) FROM questions WHERE category = ?', ('history',))
-    history_count = cursor.fetchone()[0]
-    print(f"historyカテゴリの問題数: {history_count}問")
+    history_rows = bank.filter(category='history')
+    print(f"historyカテゴリの問題数: {len(history_rows)}問")
     
     # 難易度別の内訳
-    cursor.execute('''
-        SELECT difficulty, COUNT(*) 
-        FROM questions 
-        WHERE category = ?
-        GROUP BY difficulty
-        ORDER BY difficulty
-    ''', ('history',))
     print("\n難易度別:")
-    for row in cursor.fetchall():
-        print(f"  {row[0]}: {row[1]}問")
+    for difficulty, count in sorted(bank.group_count('difficulty', rows=history_rows).items()):
+        print(f"  {difficulty}: {count}問")
     
     # 全カテゴリの問題数
-    cursor.execute('SELECT category, COUNT(*) FROM questions GROUP BY category')
     print("\n全カテゴリの問題数:")
-    for row in cursor.fetchall():
-        print(f"  {row[0]}: {row[1]}問")
-    
-    conn.close()
+    for category, count in sorted(bank.group_count('category').items()):
+        print(f"  {category}: {count}問")
 
 if __name__ == "__main__":
     check_history_count()
@@ -1,9 +1,20 @@
 """生成されたJSONファイルの問題数を確認するスクリプト"""
-import json
+import sys
 from pathlib import Path
 
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.json_stream import iter_json_file_items
+
 GENERATED_DIR = Path(__file__).parent / "generated"
 
+def count_questions(json_path: Path) -> int:
+    """JSONファイルの問題数（ファイル全体を読み込まずに1問ずつ数える）"""
+    return sum(1 for _ in iter_json_file_items(json_path))
+
+
 def check_json_files():
     """生成されたJSONファイルの問題数を確認"""
     if not GENERATED_DIR.exists():
@@ -17,11 +28,9 @@ def check_json_files():
     total_history = 0
     for file in sorted(history_files):
         try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                count = len(data)
-                total_history += count
-                print(f"  {file.name}: {count}問")
+            count = count_questions(file)
+            total_history += count
+            print(f"  {file.name}: {count}問")
         except Exception as e:
             print(f"  {file.name}: エラー - {e}")
     
@@ -34,17 +43,15 @@ def check_json_files():
     
     for file in sorted(all_files):
         try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                count = len(data)
-                # ファイル名からカテゴリを抽出
-                parts = file.stem.split('_')
-                if len(parts) >= 2:
-                    category = parts[0]
-                    if category not in category_counts:
-                        category_counts[category] = 0
-                    category_counts[category] += count
-                print(f"  {file.name}: {count}問")
+            count = count_questions(file)
+            # ファイル名からカテゴリを抽出
+            parts = file.stem.split('_')
+            if len(parts) >= 2:
+                category = parts[0]
+                if category not in category_counts:
+                    category_counts[category] = 0
+                category_counts[category] += count
+            print(f"  {file.name}: {count}問")
         except Exception as e:
             print(f"  {file.name}: エラー - {e}")
     
@@ -6,9 +6,9 @@ from pathlib import Path
 scripts_dir = Path(__file__).parent
 sys.path.insert(0, str(scripts_dir))
 
-from config import GEMINI_API_KEY
+from config import require_gemini_api_key
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+client = genai.Client(api_key=require_gemini_api_key())
 
 print("利用可能なモデル一覧:")
 print("=" * 60)
@@ -0,0 +1,121 @@
+"""類似問題（言い換え）を確認するスクリプト
+
+問題文のMinHash署名をscripts/.cache/question_signatures.dbに保存し、questions.dbとの差分だけを更新する。
+JSONファイルを指定した場合は、そのJSONの問題を登録済みの問題・JSONの問題どうしと比較する。
+指定しない場合は、登録済みの問題どうしで類似した組を表示する。
+"""
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from json_to_db import SIGNATURE_INDEX_PATH, expand_json_inputs, iter_questions_from_json
+from utils.near_duplicates import DEFAULT_THRESHOLD, SignatureIndex, find_similar_pairs
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / "data" / "questions.db"
+MAX_DISPLAY = 30
+
+
+def load_texts(db_path: Path) -> dict:
+    """登録済みの問題のID → 問題文"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return dict(conn.execute('SELECT id, text FROM questions'))
+    finally:
+        conn.close()
+
+
+def print_pair(texts: dict, id_a: str, id_b: str, similarity: float):
+    print(f"  {similarity:.0%}  {id_a} / {id_b}")
+    print(f"        {texts.get(id_a, '')[:60]}")
+    print(f"        {texts.get(id_b, '')[:60]}")
+
+
+def check_json_files(index: SignatureIndex, json_files: list, bank_texts: dict, threshold: float) -> int:
+    """JSONファイルの問題を登録済みの問題・JSONの問題どうしと比較し、類似した組の数を返す"""
+    items = []
+    for json_file in json_files:
+        for i, question in enumerate(iter_questions_from_json(json_file)):
+            question_id = question.get('id') or f"{Path(json_file).name}#{i + 1}"
+            items.append((question_id, question.get('text', '')))
+    texts = dict(bank_texts)
+    texts.update(items)
+    print(f"JSONの問題数: {len(items)}問")
+
+    start = time.perf_counter()
+    found = 0
+    print(f"\n【登録済みの問題と類似した問題】")
+    for question_id, text in items:
+        for match_id, similarity in index.query(text, threshold, exclude_id=question_id):
+            found += 1
+            if found <= MAX_DISPLAY:
+                print_pair(texts, question_id, match_id, similarity)
+    elapsed = time.perf_counter() - start
+    print(f"  {found}組（{elapsed * 1000:.1f}ms）")
+
+    print(f"\n【JSONの問題どうしで類似した問題】")
+    pairs = find_similar_pairs(items, threshold)
+    for id_a, id_b, similarity in pairs[:MAX_DISPLAY]:
+        print_pair(texts, id_a, id_b, similarity)
+    print(f"  {len(pairs)}組")
+    return found + len(pairs)
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='類似問題（言い換え）をMinHash/LSHで確認')
+    parser.add_argument('json_files', nargs='*',
+                        help='登録済みの問題と比較するJSONファイル・ディレクトリ・globパターン（省略時は登録済みの問題どうしを比較）')
+    parser.add_argument('--db', type=str, default=str(DB_PATH),
+                        help='データベースファイルのパス（デフォルト: data/questions.db）')
+    parser.add_argument('--index', type=str, default=str(SIGNATURE_INDEX_PATH),
+                        help='署名を保存するファイルのパス（デフォルト: scripts/.cache/question_signatures.db）')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'類似と判定する署名の一致率（0〜1、デフォルト: {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--strict', action='store_true',
+                        help='類似した問題がある場合は終了コード1で終了する')
+
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold は0より大きく1以下を指定してください")
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"エラー: データベースファイルが見つかりません: {db_path}")
+        sys.exit(1)
+
+    index_path = Path(args.index)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with SignatureIndex(index_path) as index:
+        start = time.perf_counter()
+        result = index.sync_from_db(db_path)
+        elapsed = time.perf_counter() - start
+        print(f"署名を更新しました: 追加・更新 {result['added']}問, 削除 {result['removed']}問, "
+              f"変更なし {result['unchanged']}問（{elapsed:.2f}秒）")
+
+        bank_texts = load_texts(db_path)
+        if args.json_files:
+            found = check_json_files(index, expand_json_inputs(args.json_files), bank_texts, args.threshold)
+        else:
+            print(f"\n【登録済みの問題どうしで類似した問題】（一致率{args.threshold:.0%}以上）")
+            pairs = index.similar_pairs(args.threshold)
+            for id_a, id_b, similarity in pairs[:MAX_DISPLAY]:
+                print_pair(bank_texts, id_a, id_b, similarity)
+            if len(pairs) > MAX_DISPLAY:
+                print(f"  ... 他 {len(pairs) - MAX_DISPLAY}組")
+            print(f"  {len(pairs)}組")
+            found = len(pairs)
+
+    if args.strict and found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
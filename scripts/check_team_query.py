@@ -1,34 +1,34 @@
 """team_id検索の問題を調査するスクリプト"""
 import sqlite3
+import sys
 from pathlib import Path
 
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_bank import QuestionBank
+
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "questions.db"
 
 def check_team_query():
     """team_id検索の問題を調査"""
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+    bank = QuestionBank.load(DB_PATH, columns=['id', 'category', 'difficulty', 'tags', 'team_id', 'team'])
     
     print("=" * 80)
     print("データベースの実際のデータを確認")
     print("=" * 80)
     
     # category=teams, difficulty=easy, team_id=kashiwaのデータを確認
-    cursor.execute('''
-        SELECT id, category, difficulty, tags, team_id, team
-        FROM questions 
-        WHERE category = ? AND difficulty = ? AND team_id = ?
-        LIMIT 5
-    ''', ('teams', 'easy', 'kashiwa'))
-    
-    rows = cursor.fetchall()
+    rows = bank.filter(category='teams', difficulty='easy', team_id='kashiwa')[:5]
     print(f"\ncategory=teams, difficulty=easy, team_id=kashiwa のデータ: {len(rows)}件")
     for row in rows:
-        print(f"  ID: {row[0]}")
-        print(f"    category: {row[1]}, difficulty: {row[2]}")
-        print(f"    tags: {row[3]}")
-        print(f"    team_id: {row[4]}, team: {row[5]}")
+        question = bank.row(row)
+        print(f"  ID: {question['id']}")
+        print(f"    category: {question['category']}, difficulty: {question['difficulty']}")
+        print(f"    tags: {question['tags']}")
+        print(f"    team_id: {question['team_id']}, team: {question['team']}")
         print()
     
     # tagsフィールドにjapanが含まれているか確認
@@ -36,20 +36,14 @@ def check_team_query():
     print("tagsフィールドにjapanが含まれているデータを確認")
     print("=" * 80)
     
-    cursor.execute('''
-        SELECT id, tags
-        FROM questions 
-        WHERE category = ? AND difficulty = ? AND team_id = ?
-        LIMIT 5
-    ''', ('teams', 'easy', 'kashiwa'))
-    
-    rows = cursor.fetchall()
     for row in rows:
-        tags = row[1]
+        tags = bank.value('tags', row)
         has_japan = 'japan' in tags.lower() if tags else False
-        print(f"  ID: {row[0]}, tags: {tags}, japan含む: {has_japan}")
+        print(f"  ID: {bank.value('id', row)}, tags: {tags}, japan含む: {has_japan}")
     
-    # SQLクエリを実際に実行してみる
+    # SQLクエリを実際に実行してみる（アプリと同じSQLの結果を確認するため、ここはデータベースに問い合わせる）
+    conn = sqlite3.connect(str(DB_PATH))
+    cursor = conn.cursor()
     print("\n" + "=" * 80)
     print("実際のSQLクエリを実行")
     print("=" * 80)
@@ -24,6 +24,23 @@ GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-3-pro-preview')
 # Weekly Recap出力ディレクトリ（オプション、デフォルト: data/weekly_recap）
 WEEKLY_RECAP_OUTPUT_DIR = os.getenv('WEEKLY_RECAP_OUTPUT_DIR', 'data/weekly_recap')
 
-# APIキーの検証
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEYが設定されていません。.envファイルまたは環境変数を確認してください。")
+# Gemini APIレスポンスのキャッシュ設定（オプション）
+# 相対パスの場合はプロジェクトルートからの相対パスとして解釈
+GEMINI_CACHE_DIR = os.getenv('GEMINI_CACHE_DIR', 'scripts/.cache/gemini')
+GEMINI_CACHE_TTL_HOURS = float(os.getenv('GEMINI_CACHE_TTL_HOURS', '168'))  # デフォルト: 7日
+GEMINI_CACHE_MAX_MB = float(os.getenv('GEMINI_CACHE_MAX_MB', '200'))  # デフォルト: 200MB
+
+# Gemini APIのクライアント側レート制限（オプション、0の場合は制限しない）
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '20'))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv('GEMINI_TOKENS_PER_MINUTE', '1000000'))
+
+
+def require_gemini_api_key() -> str:
+    """APIキーを検証して返す
+    
+    APIを呼び出す時（utils/gemini_client.get_client・check_models.py）にのみ検証し、
+    インポート時には検証しない（APIを使わないスクリプトはAPIキーなしで動作する）。
+    """
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEYが設定されていません。.envファイルまたは環境変数を確認してください。")
+    return GEMINI_API_KEY
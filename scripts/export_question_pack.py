@@ -0,0 +1,78 @@
+"""問題パック変換スクリプト - 既存のWeekly Recap JSONから問題パック（.qpk）を作成する"""
+import json
+import sys
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_pack import PACK_SUFFIX, QuestionPack, write_question_pack
+from utils.weekly_artifacts import is_weekly_recap_file
+
+# プロジェクトルートを取得（scripts/から見て../）
+PROJECT_ROOT = Path(__file__).parent.parent
+WEEKLY_RECAP_DIR = PROJECT_ROOT / "data" / "weekly_recap"
+
+
+def export_pack(json_path: Path, verify: bool = False) -> bool:
+    """JSONファイルの隣に問題パックを作成し、verifyがTrueの場合は読み戻して内容を比較する"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+
+    pack_path = write_question_pack(document, json_path.with_suffix(PACK_SUFFIX))
+    json_size = json_path.stat().st_size
+    pack_size = pack_path.stat().st_size
+    print(f"  {json_path.name} -> {pack_path.name}: {json_size:,} -> {pack_size:,}バイト ({pack_size / json_size:.0%})")
+
+    if verify:
+        pack = QuestionPack.open(pack_path)
+        if pack.to_document() != document:
+            print(f"  エラー: 問題パックの内容がJSONと一致しません: {pack_path}")
+            return False
+        questions = document.get('questions', []) if isinstance(document, dict) else document
+        for question in questions:
+            if pack.get(question['id']) != question:
+                print(f"  エラー: ID {question['id']} の問題が一致しません: {pack_path}")
+                return False
+    return True
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Weekly Recap JSONから問題パック（.qpk）を作成')
+    parser.add_argument('json_files', nargs='*',
+                        help='変換するJSONファイル（省略時は data/weekly_recap 内のすべてのJSON）')
+    parser.add_argument('--verify', action='store_true',
+                        help='作成した問題パックを読み戻し、JSONと内容が一致するか確認する')
+
+    args = parser.parse_args()
+
+    if args.json_files:
+        json_files = [Path(path) for path in args.json_files]
+    else:
+        json_files = sorted(path for path in WEEKLY_RECAP_DIR.glob("*.json") if is_weekly_recap_file(path))
+    if not json_files:
+        print("変換するJSONファイルがありません")
+        sys.exit(1)
+
+    print(f"{len(json_files)}ファイルを変換します")
+    failed = []
+    for json_path in json_files:
+        try:
+            if not export_pack(json_path, verify=args.verify):
+                failed.append(json_path)
+        except (OSError, ValueError) as e:
+            print(f"  エラー: {json_path}: {e}")
+            failed.append(json_path)
+
+    if failed:
+        print(f"\n{len(failed)}ファイルの変換に失敗しました")
+        sys.exit(1)
+    print("\n完了")
+
+
+if __name__ == "__main__":
+    main()
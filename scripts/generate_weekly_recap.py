@@ -1,6 +1,7 @@
 """Weekly Recap問題生成スクリプト（Gemini Grounding使用）"""
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -8,12 +9,61 @@ from pathlib import Path
 scripts_dir = Path(__file__).parent
 sys.path.insert(0, str(scripts_dir))
 
-from utils.gemini_client import generate_weekly_recap_questions_by_category, balance_answer_indices
-from config import WEEKLY_RECAP_OUTPUT_DIR
+from utils.gemini_client import (
+    generate_weekly_recap_questions_by_category,
+    configure_response_cache,
+)
+from utils.answer_balance import balance_answer_indices
+from utils.response_cache import ResponseCache
+from utils.question_pack import PACK_SUFFIX, write_question_pack
+from utils.weekly_artifacts import write_compressed_variants, write_manifest
+from config import (
+    WEEKLY_RECAP_OUTPUT_DIR,
+    GEMINI_CACHE_DIR,
+    GEMINI_CACHE_TTL_HOURS,
+    GEMINI_CACHE_MAX_MB,
+    require_gemini_api_key,
+)
 
 # プロジェクトルートを取得（scripts/から見て../）
 PROJECT_ROOT = Path(__file__).parent.parent
 
+# リーグごとのカテゴリ定義（categoryId, カテゴリ名, 問題数）
+# この順序がID（w_00001〜）の採番順になる
+LEAGUE_CONFIGS = {
+    "j1": {
+        "region": "japan",
+        "label": "J1リーグ",
+        "categories": [
+            ("weekly-jp-match", "試合・結果", 10),
+            ("weekly-jp-standings", "順位・スタッツ", 6),
+            ("weekly-jp-player", "選手の動向", 5),
+            ("weekly-jp-club", "クラブ・リーグの動向", 5),
+            ("weekly-jp-buzz", "今週の注目ニュース", 4),
+        ],
+    },
+    "europe": {
+        "region": "world",
+        "label": "ヨーロッパサッカー",
+        "categories": [
+            ("weekly-world-match", "試合・結果", 10),
+            ("weekly-world-standings", "順位・スタッツ", 6),
+            ("weekly-world-japanese", "海外日本人選手", 5),
+            ("weekly-world-player", "選手の動向", 5),
+            ("weekly-world-buzz", "今週の注目ニュース", 4),
+        ],
+    },
+}
+
+# 並列実行のデフォルト設定
+# 最大並列数（カテゴリ数がこれより少ない場合はカテゴリ数）。送信間隔は全スレッドで共有のレートリミッター
+# （GEMINI_REQUESTS_PER_MINUTE・GEMINI_TOKENS_PER_MINUTE）で調整されるため、並列数を増やしても上限は超えない
+DEFAULT_CONCURRENCY = 4
+DEFAULT_CATEGORY_RETRIES = 1  # 失敗したカテゴリのみを再実行する回数
+
+# カテゴリごとのチェックポイントを保存するディレクトリ（出力ディレクトリからの相対パス）
+CHECKPOINT_DIR_NAME = ".checkpoints"
+
 
 def get_monday_date() -> str:
     """最新の月曜日の日付をYYYY-MM-DD形式で取得
@@ -75,15 +125,20 @@ def save_weekly_recap_json(
     questions: list,
     date: str,
     league_type: str,
-    output_dir: Path
+    output_dir: Path,
+    write_pack: bool = True
 ) -> Path:
     """Weekly Recap問題をJSONファイルに保存
     
+    JSONを正のデータとし、write_packがTrueの場合は同じ内容の問題パック（.qpk）を隣に作成する。
+    あわせて配信用のgzip版・brotli版を作成し、出力ディレクトリのmanifest.jsonを更新する。
+    
     Args:
         questions: 問題のリスト
         date: 日付（YYYY-MM-DD形式）
         league_type: リーグタイプ（"j1" または "europe"）
         output_dir: 出力ディレクトリ
+        write_pack: 問題パックも作成するかどうか
     
     Returns:
         保存されたファイルのパス
@@ -109,9 +164,267 @@ def save_weekly_recap_json(
         json.dump(output_data, f, ensure_ascii=False, indent=2)
     
     print(f"保存完了: {filepath}")
+    
+    if write_pack:
+        pack_path = write_question_pack(output_data, filepath.with_suffix(PACK_SUFFIX))
+        json_size = filepath.stat().st_size
+        pack_size = pack_path.stat().st_size
+        print(f"問題パック作成: {pack_path} ({pack_size:,}バイト、JSONの{pack_size / json_size:.0%})")
+    
+    for variant_path in write_compressed_variants(filepath):
+        print(f"圧縮版作成: {variant_path} ({variant_path.stat().st_size:,}バイト)")
+    manifest_path, updated = write_manifest(output_dir)
+    if updated:
+        print(f"マニフェスト更新: {manifest_path}")
+    return filepath
+
+
+def resolve_project_path(path_str: str) -> Path:
+    """相対パスの場合はプロジェクトルートからの相対パスとして解釈"""
+    path = Path(path_str)
+    if path.is_absolute():
+        return path
+    return PROJECT_ROOT / path
+
+
+def build_category_tasks(league_types: list) -> list:
+    """生成対象のカテゴリタスクを作成
+    
+    各カテゴリのstart_numberはリーグ内の問題数の累積から事前に計算するため、
+    実行順序に関係なくプロンプトとIDの採番が決定的になる
+    
+    Args:
+        league_types: リーグタイプのリスト（"j1" / "europe"）
+    
+    Returns:
+        カテゴリタスクの辞書のリスト（LEAGUE_CONFIGSの定義順）
+    """
+    tasks = []
+    for league_type in league_types:
+        league_config = LEAGUE_CONFIGS[league_type]
+        start_number = 1
+        for category_id, category_name, question_count in league_config['categories']:
+            tasks.append({
+                'league_type': league_type,
+                'region': league_config['region'],
+                'category_id': category_id,
+                'category_name': category_name,
+                'question_count': question_count,
+                'start_number': start_number,
+            })
+            start_number += question_count
+    return tasks
+
+
+def get_checkpoint_path(checkpoint_dir: Path, category_id: str) -> Path:
+    """カテゴリのチェックポイントファイルのパスを取得"""
+    return Path(checkpoint_dir) / f"{category_id}.json"
+
+
+def save_category_checkpoint(checkpoint_dir: Path, task: dict, target_date: str, questions: list) -> Path:
+    """生成済みカテゴリの問題をチェックポイントとして保存
+    
+    ID採番・answerIndexのバランス調整前の問題をそのまま保存する
+    """
+    checkpoint_dir = Path(checkpoint_dir)
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    filepath = get_checkpoint_path(checkpoint_dir, task['category_id'])
+    
+    checkpoint_data = {
+        "date": target_date,
+        "league_type": task['league_type'],
+        "category_id": task['category_id'],
+        "question_count": task['question_count'],
+        "start_number": task['start_number'],
+        "saved_at": datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "questions": questions
+    }
+    
+    # 書き込み途中のファイルが残らないよう、一時ファイルに書いてから置き換える
+    tmp_path = filepath.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint_data, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(filepath)
     return filepath
 
 
+def load_category_checkpoint(checkpoint_dir: Path, task: dict, target_date: str):
+    """カテゴリのチェックポイントを読み込む
+    
+    Returns:
+        問題のリスト（チェックポイントが存在しない・条件が一致しない場合はNone）
+    """
+    filepath = get_checkpoint_path(checkpoint_dir, task['category_id'])
+    if not filepath.exists():
+        return None
+    
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            checkpoint_data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"警告: チェックポイントを読み込めませんでした: {filepath} ({e})")
+        return None
+    
+    # 対象日付・採番開始位置・問題数が一致しない場合は使用しない
+    if (checkpoint_data.get('date') != target_date
+            or checkpoint_data.get('start_number') != task['start_number']
+            or checkpoint_data.get('question_count') != task['question_count']):
+        print(f"警告: チェックポイントの条件が一致しないため使用しません: {filepath}")
+        return None
+    
+    questions = checkpoint_data.get('questions')
+    if not isinstance(questions, list) or not questions:
+        return None
+    return questions
+
+
+def remove_checkpoints(checkpoint_dir: Path, tasks: list):
+    """全リーグのJSON保存後、チェックポイントを削除"""
+    checkpoint_dir = Path(checkpoint_dir)
+    for task in tasks:
+        filepath = get_checkpoint_path(checkpoint_dir, task['category_id'])
+        if filepath.exists():
+            filepath.unlink()
+    # 空になったディレクトリも削除
+    for directory in (checkpoint_dir, checkpoint_dir.parent):
+        if directory.exists() and not any(directory.iterdir()):
+            directory.rmdir()
+
+
+def generate_category(
+    task: dict,
+    target_date: str,
+    weekly_meta_params: dict,
+    checkpoint_dir: Path = None,
+    stream: bool = False
+) -> list:
+    """1カテゴリ分の問題を生成（checkpoint_dirを指定した場合は完了時にチェックポイントを保存）"""
+    print(f"\nカテゴリ: {task['category_name']} [{task['category_id']}] ({task['question_count']}問) 生成中...")
+    category_questions = generate_weekly_recap_questions_by_category(
+        region=task['region'],
+        category_id=task['category_id'],
+        category_name=task['category_name'],
+        question_count=task['question_count'],
+        reference_date=target_date,
+        matchweek=weekly_meta_params['matchweek'],
+        publish_date=weekly_meta_params['publish_date'],
+        expiry_date=weekly_meta_params['expiry_date'],
+        season=weekly_meta_params['season'],
+        start_number=task['start_number'],
+        stream=stream
+    )
+    print(f"  [{task['category_id']}] {len(category_questions)}問生成完了")
+    if checkpoint_dir is not None:
+        save_category_checkpoint(checkpoint_dir, task, target_date, category_questions)
+    return category_questions
+
+
+def generate_categories(
+    tasks: list,
+    target_date: str,
+    weekly_meta_params: dict,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    category_retries: int = DEFAULT_CATEGORY_RETRIES,
+    checkpoint_dir: Path = None,
+    resume: bool = False,
+    stream: bool = False
+) -> dict:
+    """複数カテゴリの問題をスレッドプールで並列生成
+    
+    失敗したカテゴリだけを最大category_retries回まで再実行し、
+    成功済みのカテゴリは再生成しない。
+    resume=Trueの場合は、チェックポイントが残っているカテゴリを生成せずに復元する。
+    
+    Args:
+        tasks: build_category_tasksで作成したタスクのリスト
+        target_date: 対象日付（YYYY-MM-DD形式）
+        weekly_meta_params: calculate_weekly_meta_paramsの戻り値
+        concurrency: 最大並列数
+        category_retries: 失敗したカテゴリの再実行回数
+        checkpoint_dir: チェックポイントの保存先（Noneの場合は保存しない）
+        resume: チェックポイントから完了済みカテゴリを復元するかどうか
+        stream: ストリーミング生成を使用するかどうか
+    
+    Returns:
+        categoryIdをキーとした辞書（値は問題のリスト、または最後に発生した例外）
+    """
+    results = {}
+    pending = []
+    for task in tasks:
+        if resume and checkpoint_dir is not None:
+            checkpoint_questions = load_category_checkpoint(checkpoint_dir, task, target_date)
+            if checkpoint_questions is not None:
+                print(f"チェックポイントから復元: {task['category_id']} ({len(checkpoint_questions)}問)")
+                results[task['category_id']] = checkpoint_questions
+                continue
+        pending.append(task)
+    
+    for round_index in range(category_retries + 1):
+        if not pending:
+            break
+        if round_index > 0:
+            retry_ids = ', '.join(task['category_id'] for task in pending)
+            print(f"\n失敗したカテゴリを再実行します（{round_index}/{category_retries}）: {retry_ids}")
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(pending))) as executor:
+            futures = [
+                (task, executor.submit(
+                    generate_category, task, target_date, weekly_meta_params, checkpoint_dir, stream
+                ))
+                for task in pending
+            ]
+        
+        failed = []
+        for task, future in futures:
+            try:
+                results[task['category_id']] = future.result()
+            except Exception as e:
+                print(f"エラー: カテゴリ {task['category_id']} の生成に失敗しました: {e}")
+                results[task['category_id']] = e
+                failed.append(task)
+        pending = failed
+    
+    return results
+
+
+def assemble_league_questions(league_tasks: list, results: dict) -> list:
+    """カテゴリ定義順に問題を結合し、IDを連番（w_00001〜）で採番
+    
+    並列実行時の完了順に関係なく、LEAGUE_CONFIGSの定義順でIDを振り直す
+    """
+    league_questions = []
+    current_id = 1
+    for task in league_tasks:
+        for q in results[task['category_id']]:
+            q['id'] = f"w_{current_id:05d}"
+            current_id += 1
+            league_questions.append(q)
+    return league_questions
+
+
+def print_question_distribution(questions: list):
+    """answerIndex・難易度・カテゴリの分布を表示"""
+    counts = [0, 0, 0, 0]
+    for q in questions:
+        idx = q.get('answerIndex', 0)
+        if 0 <= idx <= 3:
+            counts[idx] += 1
+    print(f"\nanswerIndex分布: [0]: {counts[0]}, [1]: {counts[1]}, [2]: {counts[2]}, [3]: {counts[3]}")
+    
+    difficulty_counts = {"easy": 0, "normal": 0, "hard": 0}
+    for q in questions:
+        diff = q.get('difficulty', 'normal')
+        if diff in difficulty_counts:
+            difficulty_counts[diff] += 1
+    print(f"難易度分布: easy: {difficulty_counts['easy']}, normal: {difficulty_counts['normal']}, hard: {difficulty_counts['hard']}")
+    
+    category_counts = {}
+    for q in questions:
+        cat_id = q.get('categoryId', 'unknown')
+        category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
+    print(f"カテゴリ分布: {category_counts}")
+
+
 def main():
     """メイン処理"""
     import argparse
@@ -125,13 +438,40 @@ def main():
                        help='J1リーグのみ生成（テスト用）')
     parser.add_argument('--europe-only', action='store_true',
                        help='ヨーロッパサッカーのみ生成（テスト用）')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                       help=f'カテゴリ生成の最大並列数（デフォルト: {DEFAULT_CONCURRENCY}、1の場合は逐次実行。'
+                            f'送信間隔は共有のレートリミッターで調整）')
+    parser.add_argument('--category-retries', type=int, default=DEFAULT_CATEGORY_RETRIES,
+                       help=f'失敗したカテゴリのみを再実行する回数（デフォルト: {DEFAULT_CATEGORY_RETRIES}）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='APIレスポンスのキャッシュを使用しない（読み込み・保存とも行わない）')
+    parser.add_argument('--refresh', action='store_true',
+                       help='既存のキャッシュを使わずにAPIを呼び出し、キャッシュを上書きする')
+    parser.add_argument('--resume', action='store_true',
+                       help='前回の実行で完了したカテゴリをチェックポイントから復元し、未完了のカテゴリのみ生成する')
+    parser.add_argument('--stream', action='store_true',
+                       help='ストリーミング生成を使用し、完成した問題から順に検証する（必要数そろった時点で受信を打ち切る）')
+    parser.add_argument('--no-pack', action='store_true',
+                       help='問題パック（.qpk）を作成せず、JSONのみを保存する')
     
     args = parser.parse_args()
     
+    if args.concurrency < 1:
+        parser.error("--concurrency は1以上を指定してください")
+    if args.category_retries < 0:
+        parser.error("--category-retries は0以上を指定してください")
+    
     print("=" * 60)
     print("Weekly Recap問題生成スクリプト（Gemini Grounding使用）")
     print("=" * 60)
     
+    # APIキーの確認（APIクライアントは最初の呼び出し時に作成されるため、生成を始める前に確認する）
+    try:
+        require_gemini_api_key()
+    except ValueError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+    
     # 日付の決定
     if args.date:
         target_date = args.date
@@ -145,175 +485,94 @@ def main():
         output_dir = Path(args.output_dir)
     else:
         # 相対パスの場合はプロジェクトルートからの相対パスとして解釈
-        if Path(WEEKLY_RECAP_OUTPUT_DIR).is_absolute():
-            output_dir = Path(WEEKLY_RECAP_OUTPUT_DIR)
-        else:
-            output_dir = PROJECT_ROOT / WEEKLY_RECAP_OUTPUT_DIR
+        output_dir = resolve_project_path(WEEKLY_RECAP_OUTPUT_DIR)
     print(f"出力ディレクトリ: {output_dir}")
     
+    # APIレスポンスキャッシュの設定
+    if args.no_cache:
+        configure_response_cache(None)
+        print("キャッシュ: 使用しない")
+    else:
+        cache_dir = resolve_project_path(GEMINI_CACHE_DIR)
+        response_cache = ResponseCache(
+            cache_dir,
+            ttl_seconds=GEMINI_CACHE_TTL_HOURS * 3600,
+            max_bytes=int(GEMINI_CACHE_MAX_MB * 1024 * 1024)
+        )
+        configure_response_cache(response_cache, refresh=args.refresh)
+        print(f"キャッシュ: {cache_dir}{'（再取得して上書き）' if args.refresh else ''}")
+    
     # weeklyMetaパラメータの計算
     weekly_meta_params = calculate_weekly_meta_params(target_date)
     
+    # 生成対象のリーグ
+    league_types = []
+    if not args.europe_only:
+        league_types.append("j1")
+    if not args.j1_only:
+        league_types.append("europe")
+    
+    print(f"並列数: {args.concurrency}, カテゴリ再試行回数: {args.category_retries}"
+          f"{', ストリーミング生成' if args.stream else ''}")
+    
+    # 全リーグの全カテゴリをまとめて生成（並列数はargs.concurrencyで制限）
+    tasks = build_category_tasks(league_types)
+    checkpoint_dir = output_dir / CHECKPOINT_DIR_NAME / target_date
+    results = generate_categories(
+        tasks,
+        target_date,
+        weekly_meta_params,
+        concurrency=args.concurrency,
+        category_retries=args.category_retries,
+        checkpoint_dir=checkpoint_dir,
+        resume=args.resume,
+        stream=args.stream
+    )
+    
     saved_files = []
+    failed_leagues = []
     
-    # J1リーグ問題生成（カテゴリごとに分割生成）
-    if not args.europe_only:
+    for league_type in league_types:
+        league_label = LEAGUE_CONFIGS[league_type]["label"]
         print("\n" + "-" * 60)
-        print("J1リーグ問題生成中...")
+        print(f"{league_label}問題の集計中...")
         print("-" * 60)
         try:
-            # カテゴリごとの問題数定義
-            j1_categories = [
-                ("weekly-jp-match", "試合・結果", 10),
-                ("weekly-jp-standings", "順位・スタッツ", 6),
-                ("weekly-jp-player", "選手の動向", 5),
-                ("weekly-jp-club", "クラブ・リーグの動向", 5),
-                ("weekly-jp-buzz", "今週の注目ニュース", 4),
-            ]
-            
-            j1_questions = []
-            current_id = 1
-            
-            for category_id, category_name, question_count in j1_categories:
-                print(f"\nカテゴリ: {category_name} ({question_count}問) 生成中...")
-                category_questions = generate_weekly_recap_questions_by_category(
-                    region="japan",
-                    category_id=category_id,
-                    category_name=category_name,
-                    question_count=question_count,
-                    reference_date=target_date,
-                    matchweek=weekly_meta_params['matchweek'],
-                    publish_date=weekly_meta_params['publish_date'],
-                    expiry_date=weekly_meta_params['expiry_date'],
-                    season=weekly_meta_params['season'],
-                    start_number=current_id
+            league_tasks = [task for task in tasks if task['league_type'] == league_type]
+            failed = [task['category_id'] for task in league_tasks
+                      if isinstance(results[task['category_id']], Exception)]
+            if failed:
+                raise RuntimeError(
+                    f"カテゴリの生成に失敗しました: {', '.join(failed)}"
+                    f"（完了済みのカテゴリは --resume で再利用できます）"
                 )
-                
-                # IDを連番に更新
-                for q in category_questions:
-                    q['id'] = f"w_{current_id:05d}"
-                    current_id += 1
-                
-                j1_questions.extend(category_questions)
-                print(f"  {len(category_questions)}問生成完了")
             
-            # answerIndexのバランス調整
-            j1_questions = balance_answer_indices(j1_questions)
-            
-            # 分布を確認して表示
-            counts = [0, 0, 0, 0]
-            for q in j1_questions:
-                idx = q.get('answerIndex', 0)
-                if 0 <= idx <= 3:
-                    counts[idx] += 1
-            print(f"\nanswerIndex分布: [0]: {counts[0]}, [1]: {counts[1]}, [2]: {counts[2]}, [3]: {counts[3]}")
-            
-            # 難易度分布を確認して表示
-            difficulty_counts = {"easy": 0, "normal": 0, "hard": 0}
-            for q in j1_questions:
-                diff = q.get('difficulty', 'normal')
-                if diff in difficulty_counts:
-                    difficulty_counts[diff] += 1
-            print(f"難易度分布: easy: {difficulty_counts['easy']}, normal: {difficulty_counts['normal']}, hard: {difficulty_counts['hard']}")
-            
-            # カテゴリ分布を確認して表示
-            category_counts = {}
-            for q in j1_questions:
-                cat_id = q.get('categoryId', 'unknown')
-                category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
-            print(f"カテゴリ分布: {category_counts}")
-            
-            # J1リーグの問題を個別のファイルに保存
-            if j1_questions:
-                filepath = save_weekly_recap_json(j1_questions, target_date, "j1", output_dir)
-                saved_files.append(filepath)
-                print(f"\nJ1リーグ: {len(j1_questions)}問生成完了")
-        except Exception as e:
-            print(f"エラー: J1リーグ問題の生成に失敗しました: {e}")
-            import traceback
-            traceback.print_exc()
-            if args.j1_only:
-                raise
-    
-    # ヨーロッパサッカー問題生成（カテゴリごとに分割生成）
-    if not args.j1_only:
-        print("\n" + "-" * 60)
-        print("ヨーロッパサッカー問題生成中...")
-        print("-" * 60)
-        try:
-            # カテゴリごとの問題数定義
-            europe_categories = [
-                ("weekly-world-match", "試合・結果", 10),
-                ("weekly-world-standings", "順位・スタッツ", 6),
-                ("weekly-world-japanese", "海外日本人選手", 5),
-                ("weekly-world-player", "選手の動向", 5),
-                ("weekly-world-buzz", "今週の注目ニュース", 4),
-            ]
-            
-            europe_questions = []
-            current_id = 1
-            
-            for category_id, category_name, question_count in europe_categories:
-                print(f"\nカテゴリ: {category_name} ({question_count}問) 生成中...")
-                category_questions = generate_weekly_recap_questions_by_category(
-                    region="world",
-                    category_id=category_id,
-                    category_name=category_name,
-                    question_count=question_count,
-                    reference_date=target_date,
-                    matchweek=weekly_meta_params['matchweek'],
-                    publish_date=weekly_meta_params['publish_date'],
-                    expiry_date=weekly_meta_params['expiry_date'],
-                    season=weekly_meta_params['season'],
-                    start_number=current_id
-                )
-                
-                # IDを連番に更新
-                for q in category_questions:
-                    q['id'] = f"w_{current_id:05d}"
-                    current_id += 1
-                
-                europe_questions.extend(category_questions)
-                print(f"  {len(category_questions)}問生成完了")
+            league_questions = assemble_league_questions(league_tasks, results)
             
             # answerIndexのバランス調整
-            europe_questions = balance_answer_indices(europe_questions)
-            
-            # 分布を確認して表示
-            counts = [0, 0, 0, 0]
-            for q in europe_questions:
-                idx = q.get('answerIndex', 0)
-                if 0 <= idx <= 3:
-                    counts[idx] += 1
-            print(f"\nanswerIndex分布: [0]: {counts[0]}, [1]: {counts[1]}, [2]: {counts[2]}, [3]: {counts[3]}")
-            
-            # 難易度分布を確認して表示
-            difficulty_counts = {"easy": 0, "normal": 0, "hard": 0}
-            for q in europe_questions:
-                diff = q.get('difficulty', 'normal')
-                if diff in difficulty_counts:
-                    difficulty_counts[diff] += 1
-            print(f"難易度分布: easy: {difficulty_counts['easy']}, normal: {difficulty_counts['normal']}, hard: {difficulty_counts['hard']}")
+            league_questions = balance_answer_indices(league_questions)
             
-            # カテゴリ分布を確認して表示
-            category_counts = {}
-            for q in europe_questions:
-                cat_id = q.get('categoryId', 'unknown')
-                category_counts[cat_id] = category_counts.get(cat_id, 0) + 1
-            print(f"カテゴリ分布: {category_counts}")
+            print_question_distribution(league_questions)
             
-            # ヨーロッパサッカーの問題を個別のファイルに保存
-            if europe_questions:
-                filepath = save_weekly_recap_json(europe_questions, target_date, "europe", output_dir)
+            # リーグの問題を個別のファイルに保存
+            if league_questions:
+                filepath = save_weekly_recap_json(
+                    league_questions, target_date, league_type, output_dir, write_pack=not args.no_pack
+                )
                 saved_files.append(filepath)
-                print(f"\nヨーロッパサッカー: {len(europe_questions)}問生成完了")
+                print(f"\n{league_label}: {len(league_questions)}問生成完了")
         except Exception as e:
-            print(f"エラー: ヨーロッパサッカー問題の生成に失敗しました: {e}")
+            failed_leagues.append(league_type)
+            print(f"エラー: {league_label}問題の生成に失敗しました: {e}")
             import traceback
             traceback.print_exc()
-            if args.europe_only:
+            if len(league_types) == 1:
                 raise
     
+    # すべてのリーグが保存できた場合のみチェックポイントを削除（--resumeでの再利用のため）
+    if not failed_leagues:
+        remove_checkpoints(checkpoint_dir, tasks)
+    
     # 結果の表示
     print("\n" + "=" * 60)
     print("生成結果")
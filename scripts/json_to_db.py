@@ -1,70 +1,205 @@
 """JSONファイルからSQLiteデータベースへの変換スクリプト"""
+import hashlib
 import json
 import sqlite3
 import os
 import sys
 from pathlib import Path
 
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.db_migrations import LATEST_VERSION, get_schema_version, migrate_database, refresh_sort_keys, split_tags
+from utils.json_stream import FILE_CHUNK_SIZE, JsonFileItemReader, iter_json_file_items
+from utils.near_duplicates import SignatureIndex, compute_text_hash, find_similar_pairs
+from utils.question_validator import INGEST_QUESTION_VALIDATOR, missing_fields
+
 # プロジェクトルートを取得（scripts/から見て../）
 PROJECT_ROOT = Path(__file__).parent.parent
 DB_PATH = PROJECT_ROOT / "data" / "questions.db"
 
+# questionsテーブルに書き込む列（idを先頭に、スキーマ定義と同じ順序）
+QUESTION_COLUMNS = [
+    'id', 'text', 'options', 'answerIndex', 'explanation', 'trivia', 'category', 'difficulty', 'tags',
+    'reference_date', 'quiz_type', 'category_id', 'region', 'league', 'team', 'team_id', 'weekly_meta',
+    'source_file', 'text_hash'
+]
+
+# 登録前の重複チェックの動作（reject: 重複を登録しない、flag: 警告のみ表示して登録する、off: チェックしない）
+DEDUPE_MODES = ['reject', 'flag', 'off']
+# 類似チェック（--similarity）で使用する署名の保存先（check_near_duplicates.pyと共通）
+SIGNATURE_INDEX_PATH = PROJECT_ROOT / "scripts" / ".cache" / "question_signatures.db"
+# 重複チェックで表示する最大件数
+MAX_DEDUPE_MESSAGES = 30
+# ストリーミング登録（--bulk）で、検証・重複チェック・書き込みをまとめて行う問題数
+STREAM_BATCH_SIZE = 1000
+
+# --finalizeで比較するページサイズの候補（先頭が標準のページサイズ）
+FINALIZE_PAGE_SIZES = [4096, 1024, 2048, 8192, 16384]
+# 標準のページサイズより、この割合以上ファイルが小さくなる場合のみ他のページサイズを選ぶ
+# （ページが小さすぎると読み込み時のI/O回数が増えるため、わずかな差では変更しない）
+FINALIZE_PAGE_SIZE_MIN_SAVING = 0.05
+
+# --finalizeで実行計画を表示する、アプリ（lib/services/database_service.dart）の代表的なクエリ
+APP_QUERY_SHAPES = [
+    (
+        'カテゴリ・難易度・地域でランダム抽出',
+        "SELECT * FROM questions WHERE category = ? AND difficulty = ? AND region = ? ORDER BY RANDOM() LIMIT ?",
+        ('rules', 'easy', 'japan', 10),
+    ),
+    (
+        'J1全チーム（tags LIKE）',
+        "SELECT * FROM questions WHERE category = ? AND difficulty = ? AND tags LIKE ? AND tags LIKE ? ORDER BY RANDOM() LIMIT ?",
+        ('teams', 'easy', '%japan%', '%j1%', 10),
+    ),
+    (
+        'チームID指定',
+        "SELECT * FROM questions WHERE category = ? AND difficulty = ? AND team_id = ? ORDER BY RANDOM() LIMIT ?",
+        ('teams', 'easy', 'kashima', 10),
+    ),
+    (
+        'sort_keyの範囲検索',
+        "SELECT * FROM questions WHERE category = ? AND difficulty = ? AND region = ? AND sort_key >= ? ORDER BY sort_key LIMIT ?",
+        ('rules', 'easy', 'japan', 0.5, 10),
+    ),
+    (
+        'question_tagsでのタグ絞り込み',
+        "SELECT * FROM questions WHERE id IN (SELECT question_id FROM question_tags WHERE tag = ? "
+        "INTERSECT SELECT question_id FROM question_tags WHERE tag = ?)",
+        ('japan', 'j1'),
+    ),
+]
+
+# 一括登録中だけ適用するPRAGMA（1トランザクションで書き込むため、ジャーナルはメモリ上に置く）
+BULK_LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-65536',  # 64MB
+}
+
 
 def create_database_schema(db_path: str):
-    """データベーススキーマを作成"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    """データベーススキーマを作成（未適用のマイグレーションをすべて適用）"""
+    migrate_database(db_path)
+    print(f"データベーススキーマを作成しました: {db_path}（スキーマバージョン: {LATEST_VERSION}）")
+
+
+def sample_random_page(cursor, limit: int, category: str = None, difficulty: str = None, region: str = None) -> list:
+    """sort_keyを使ってランダムな問題をlimit件取得（ORDER BY RANDOM()の代替）
     
-    # questionsテーブルを作成（Flutterアプリと同じスキーマ）
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS questions (
-            id TEXT PRIMARY KEY,
-            text TEXT NOT NULL,
-            options TEXT NOT NULL,
-            answerIndex INTEGER NOT NULL,
-            explanation TEXT NOT NULL,
-            trivia TEXT,
-            category TEXT NOT NULL,
-            difficulty TEXT NOT NULL,
-            tags TEXT NOT NULL,
-            reference_date TEXT,
-            quiz_type TEXT,
-            category_id TEXT,
-            region TEXT,
-            league TEXT,
-            team TEXT,
-            team_id TEXT,
-            weekly_meta TEXT
+    乱数の位置からsort_keyの昇順に取得し、末尾に達した場合は先頭から続けて取得する。
+    category・difficulty・regionを指定した場合は、idx_questions_samplingの範囲検索になる。
+    """
+    import random
+    
+    conditions = []
+    params = []
+    for column, value in (('category', category), ('difficulty', difficulty), ('region', region)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    where = ' AND '.join(conditions + ['sort_key >= ?'])
+    start = random.random()
+    cursor.execute(f"SELECT * FROM questions WHERE {where} ORDER BY sort_key LIMIT ?", params + [start, limit])
+    rows = cursor.fetchall()
+    if len(rows) < limit:
+        where = ' AND '.join(conditions + ['sort_key < ?'])
+        cursor.execute(
+            f"SELECT * FROM questions WHERE {where} ORDER BY sort_key LIMIT ?",
+            params + [start, limit - len(rows)]
         )
-    ''')
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+def sync_question_tags(cursor, question_ids: list):
+    """指定した問題のquestion_tagsを、questionsテーブルの現在のtagsに合わせて差し替える
     
-    # インデックスを作成
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_questions_category_difficulty 
-        ON questions(category, difficulty)
-    ''')
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_questions_tags 
-        ON questions(tags)
-    ''')
+    登録しなかった問題（--replaceなしで既存の問題）や削除された問題にも正しく追従するよう、
+    書き込んだ値ではなくquestionsテーブルの値から作り直す
+    """
+    question_ids = list(dict.fromkeys(question_ids))
+    # SQLiteのパラメータ数の上限を超えないよう分割して処理
+    chunk_size = 500
+    for start in range(0, len(question_ids), chunk_size):
+        chunk = question_ids[start:start + chunk_size]
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(f'DELETE FROM question_tags WHERE question_id IN ({placeholders})', chunk)
+        cursor.execute(f'SELECT id, tags FROM questions WHERE id IN ({placeholders})', chunk)
+        cursor.executemany(
+            'INSERT OR IGNORE INTO question_tags (tag, question_id) VALUES (?, ?)',
+            [(tag, question_id) for question_id, tags in cursor.fetchall() for tag in split_tags(tags)]
+        )
+
+
+def load_ingest_manifest(db_path: str) -> dict:
+    """ingest_manifestを読み込み、source_fileをキーとした辞書を返す
     
-    conn.commit()
-    conn.close()
-    print(f"データベーススキーマを作成しました: {db_path}")
+    row_hashesは {問題ID: 行ハッシュ} の辞書に変換する
+    """
+    migrate_database(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT source_file, size, mtime_ns, content_hash, row_hashes FROM ingest_manifest')
+        return {
+            source_file: {
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'content_hash': content_hash,
+                'row_hashes': json.loads(row_hashes),
+            }
+            for source_file, size, mtime_ns, content_hash, row_hashes in cursor.fetchall()
+        }
+    finally:
+        conn.close()
+
 
+def compute_row_hash(row: tuple) -> str:
+    """DBに登録する1行のハッシュ（行単位の差分検出に使用）"""
+    return hashlib.sha256(json.dumps(row, ensure_ascii=False).encode('utf-8')).hexdigest()
 
-def load_questions_from_json(json_path: str) -> list:
+
+def get_source_file_label(json_path) -> str:
+    """source_file列に記録するパス（プロジェクト内のファイルはプロジェクトルートからの相対パス）"""
+    resolved = Path(json_path).resolve()
+    try:
+        return resolved.relative_to(PROJECT_ROOT.resolve()).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+
+def load_questions_from_json(json_path: str, verbose: bool = True) -> list:
     """JSONファイルから問題を読み込む
     
     Weekly Recap形式（{"questions": [...]}）と通常形式（[...]）の両方に対応
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    reader = JsonFileItemReader(json_path)
+    questions = list(reader)
+    if verbose:
+        if reader.layout == 'object':
+            print(f"Weekly Recap形式を検出しました")
+        print(f"JSONファイルから {len(questions)}問を読み込みました: {json_path}")
+    return questions
+
+
+def iter_questions_from_json(json_path):
+    """JSONファイルから問題を1問ずつ読み込むジェネレーター（ファイル全体をメモリに読み込まない）
     
+    Weekly Recap形式（{"questions": [...]}）と通常形式（[...]）の両方に対応
+    """
+    return iter_json_file_items(json_path)
+
+
+def extract_questions(data, verbose: bool = True) -> list:
+    """読み込んだJSONデータから問題のリストを取り出す"""
     # Weekly Recap形式の場合（questionsフィールドがある）
     if isinstance(data, dict) and 'questions' in data:
         questions = data['questions']
-        print(f"Weekly Recap形式を検出しました")
+        if verbose:
+            print(f"Weekly Recap形式を検出しました")
     elif isinstance(data, list):
         questions = data
     else:
@@ -72,11 +207,21 @@ def load_questions_from_json(json_path: str) -> list:
     
     if not isinstance(questions, list):
         raise ValueError("JSONファイルは問題のリストである必要があります")
-    
-    print(f"JSONファイルから {len(questions)}問を読み込みました: {json_path}")
     return questions
 
 
+def iter_batches(items, batch_size: int = STREAM_BATCH_SIZE):
+    """イテラブルをbatch_size件ずつのリストに分けて返すジェネレーター"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def parse_filename_for_new_schema(filename: str) -> dict:
     """
     新しいスキーマのファイル名からquizTypeとdifficultyを解析
@@ -176,8 +321,6 @@ def add_missing_metadata(questions: list, category: str = None, difficulty: str
     Returns:
         メタデータが追加された問題のリスト
     """
-    from datetime import datetime
-    
     # ファイル名から推測（引数で指定されていない場合）
     if json_filename and (not category or not difficulty):
         inferred = infer_metadata_from_filename(json_filename)
@@ -198,27 +341,30 @@ def add_missing_metadata(questions: list, category: str = None, difficulty: str
             "または、ファイル名を {category}_{difficulty}_*.json の形式にしてください。"
         )
     
-    # 各問題にメタデータを追加
-    updated_questions = []
+    return list(iter_with_missing_metadata(questions, category, difficulty, tags))
+
+
+def iter_with_missing_metadata(questions, category: str, difficulty: str, tags: str):
+    """問題を1問ずつ返しながら、不足しているメタデータ（id, category, difficulty, tags）を追加するジェネレーター
+    
+    コピーするのはメタデータが不足している問題のみ（不足がない問題はそのまま返す）
+    """
+    from datetime import datetime
+    
+    date_str = datetime.now().strftime('%Y%m%d')
     for i, question in enumerate(questions):
-        updated_question = question.copy()
-        
+        missing = {}
         # IDが無い場合は生成
-        if 'id' not in updated_question or not updated_question['id']:
-            date_str = datetime.now().strftime('%Y%m%d')
-            updated_question['id'] = f"manual_{category}_{difficulty}_{date_str}_{i+1:03d}"
-        
+        if not question.get('id'):
+            missing['id'] = f"manual_{category}_{difficulty}_{date_str}_{i+1:03d}"
         # category, difficulty, tagsを追加（既存の値がある場合は上書きしない）
-        if 'category' not in updated_question or not updated_question['category']:
-            updated_question['category'] = category
-        if 'difficulty' not in updated_question or not updated_question['difficulty']:
-            updated_question['difficulty'] = difficulty
-        if 'tags' not in updated_question or not updated_question['tags']:
-            updated_question['tags'] = tags
-        
-        updated_questions.append(updated_question)
-    
-    return updated_questions
+        if not question.get('category'):
+            missing['category'] = category
+        if not question.get('difficulty'):
+            missing['difficulty'] = difficulty
+        if not question.get('tags'):
+            missing['tags'] = tags
+        yield {**question, **missing} if missing else question
 
 
 def get_next_sequential_id(cursor, category: str, difficulty: str) -> int:
@@ -295,15 +441,191 @@ def convert_new_schema_to_db_format(question: dict) -> dict:
     return converted
 
 
-def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
+def find_duplicate_questions(db_path: str, items: list, ignore_ids=(), similarity: float = None,
+                             conn: sqlite3.Connection = None, signature_index: SignatureIndex = None) -> list:
+    """登録前の問題を、同じ入力内の問題・登録済みの問題と比較して重複を探す
+
+    内容の一致はtext_hash（正規化した問題文と選択肢のハッシュ）で判定し、登録済みの問題は
+    text_hashのインデックスをまとめて検索する。similarityを指定した場合は、MinHash署名の一致率が
+    similarity以上の類似した問題も探す。
+    ignore_idsの問題は登録済みの問題として扱わない（同じ登録で上書き・削除される問題）。
+    connを指定した場合は、その接続（書き込み中のトランザクション）で登録済みの問題を検索する。
+    signature_indexを指定した場合は、類似した問題をそのインデックス（登録済みの問題に合わせたもの）で探す。
+
+    Args:
+        items: (ID, 問題文, 選択肢) のリスト
+
+    Returns:
+        {'index': itemsの位置, 'id', 'match_id', 'kind': 'batch'/'bank'/'similar', 'similarity'} のリスト
+    """
+    ignore_ids = set(ignore_ids)
+    duplicates = []
+    duplicate_indexes = set()
+
+    # 同じ入力内の重複（最初に出現した問題を残す）
+    first_ids = {}
+    text_hashes = []
+    for index, (question_id, text, options) in enumerate(items):
+        text_hash = compute_text_hash(text, options)
+        text_hashes.append(text_hash)
+        if text_hash in first_ids and first_ids[text_hash] != question_id:
+            duplicates.append({'index': index, 'id': question_id, 'match_id': first_ids[text_hash],
+                               'kind': 'batch', 'similarity': 1.0})
+            duplicate_indexes.add(index)
+        else:
+            first_ids.setdefault(text_hash, question_id)
+
+    own_conn = conn is None
+    if own_conn:
+        migrate_database(db_path, verbose=False)
+        conn = sqlite3.connect(db_path)
+    try:
+        # 登録済みの問題との重複（text_hashのインデックスをまとめて検索）
+        bank_ids = {}
+        unique_hashes = list(set(text_hashes))
+        for start in range(0, len(unique_hashes), 500):
+            chunk = unique_hashes[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            for question_id, text_hash in conn.execute(
+                f"SELECT id, text_hash FROM questions WHERE text_hash IN ({placeholders})", chunk
+            ):
+                if question_id not in ignore_ids:
+                    bank_ids.setdefault(text_hash, question_id)
+        for index, (question_id, _, _) in enumerate(items):
+            match_id = bank_ids.get(text_hashes[index])
+            if index not in duplicate_indexes and match_id is not None and match_id != question_id:
+                duplicates.append({'index': index, 'id': question_id, 'match_id': match_id,
+                                   'kind': 'bank', 'similarity': 1.0})
+                duplicate_indexes.add(index)
+    finally:
+        if own_conn:
+            conn.close()
+
+    if similarity is not None:
+        duplicates.extend(
+            find_similar_questions(db_path, items, ignore_ids, similarity, exclude_indexes=duplicate_indexes,
+                                   conn=None if own_conn else conn, signature_index=signature_index)
+        )
+    return duplicates
+
+
+def open_signature_index(db_path: str, conn: sqlite3.Connection = None) -> SignatureIndex:
+    """類似チェック用の署名のインデックスを開き、登録済みの問題に合わせる
+
+    connを指定した場合は、その接続（書き込み中のトランザクション）で登録済みの問題を読む。
+    """
+    SIGNATURE_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    index = SignatureIndex(SIGNATURE_INDEX_PATH)
+    try:
+        if conn is None:
+            index.sync_from_db(db_path)
+        else:
+            index.sync(conn.execute('SELECT id, text FROM questions'))
+    except Exception:
+        index.close()
+        raise
+    return index
+
+
+def add_written_signatures(index: SignatureIndex, conn: sqlite3.Connection, question_ids: list):
+    """書き込んだ問題の署名をインデックスに追加・更新する（問題文はconnから読む）"""
+    unique_ids = list(dict.fromkeys(question_ids))
+    for start in range(0, len(unique_ids), 500):
+        chunk = unique_ids[start:start + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        index.add(conn.execute(f"SELECT id, text FROM questions WHERE id IN ({placeholders})", chunk))
+
+
+def find_similar_questions(db_path: str, items: list, ignore_ids: set, threshold: float,
+                           exclude_indexes: set = frozenset(), conn: sqlite3.Connection = None,
+                           signature_index: SignatureIndex = None) -> list:
+    """MinHash署名で、類似した（言い換えの）問題を探す（find_duplicate_questionsの結果と同じ形式）
+
+    signature_indexを指定しない場合は、インデックスを開いて登録済みの問題に合わせてから探す。
+    """
+    similar = []
+    flagged = set(exclude_indexes)
+    index = signature_index if signature_index is not None else open_signature_index(db_path, conn)
+    try:
+        for position, (question_id, text, _) in enumerate(items):
+            if position in flagged:
+                continue
+            for match_id, score in index.query(text, threshold, exclude_id=question_id):
+                if match_id not in ignore_ids:
+                    similar.append({'index': position, 'id': question_id, 'match_id': match_id,
+                                    'kind': 'similar', 'similarity': score})
+                    flagged.add(position)
+                    break
+    finally:
+        if signature_index is None:
+            index.close()
+
+    # 同じ入力内の類似（後に出現した問題を対象にする）
+    positions = {question_id: position for position, (question_id, _, _) in enumerate(items)}
+    for id_a, id_b, score in find_similar_pairs([(question_id, text) for question_id, text, _ in items], threshold):
+        first_id, later_id = sorted((id_a, id_b), key=lambda question_id: positions[question_id])
+        if positions[later_id] not in flagged:
+            similar.append({'index': positions[later_id], 'id': later_id, 'match_id': first_id,
+                            'kind': 'similar', 'similarity': score})
+            flagged.add(positions[later_id])
+    return similar
+
+
+def apply_dedupe_gate(db_path: str, items: list, mode: str = 'reject', ignore_ids=(), similarity: float = None,
+                      conn: sqlite3.Connection = None, verbose: bool = True,
+                      signature_index: SignatureIndex = None) -> set:
+    """登録前の重複チェックを行い、結果を表示して、登録しない問題のitemsの位置の集合を返す
+
+    mode='reject'の場合は内容が一致する問題を登録しない。類似（similarity）は判定が確率的なため、
+    modeに関わらず警告のみ表示する。verbose=Falseの場合、重複がなければ何も表示しない。
+    """
+    if mode == 'off' or not items:
+        return set()
+
+    duplicates = find_duplicate_questions(db_path, items, ignore_ids, similarity, conn=conn,
+                                          signature_index=signature_index)
+    exact = [duplicate for duplicate in duplicates if duplicate['kind'] != 'similar']
+    similar = [duplicate for duplicate in duplicates if duplicate['kind'] == 'similar']
+    if not duplicates:
+        if verbose:
+            print(f"重複チェック: {len(items)}問中、重複はありません")
+        return set()
+
+    action = '登録しません' if mode == 'reject' else '警告のみ'
+    print(f"重複チェック: {len(items)}問中、内容が一致 {len(exact)}問（{action}）, 類似 {len(similar)}問（警告のみ）")
+    labels = {'batch': '同じ入力内', 'bank': '登録済み', 'similar': '類似'}
+    for duplicate in duplicates[:MAX_DEDUPE_MESSAGES]:
+        detail = f"{duplicate['similarity']:.0%}" if duplicate['kind'] == 'similar' else '一致'
+        print(f"  {labels[duplicate['kind']]}: {duplicate['id']} → {duplicate['match_id']}（{detail}）")
+    if len(duplicates) > MAX_DEDUPE_MESSAGES:
+        print(f"  ... 他 {len(duplicates) - MAX_DEDUPE_MESSAGES}件")
+
+    if mode == 'reject':
+        return {duplicate['index'] for duplicate in exact}
+    return set()
+
+
+def insert_questions_to_db(questions: list, db_path: str, replace: bool = True, source_file: str = None,
+                           dedupe: str = 'reject', similarity: float = None):
     """問題をデータベースに挿入（新しいスキーマ形式のみ対応）"""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    migrate_database(db_path)
     
     inserted_count = 0
     skipped_count = 0
     updated_count = 0
     
+    # 登録前の重複チェック（replace=Trueの場合、同じIDの登録済みの問題は上書きされるため比較しない）
+    items = [(q.get('id'), q.get('text'), q.get('options')) for q in questions]
+    ignore_ids = {question_id for question_id, _, _ in items} if replace else set()
+    rejected = apply_dedupe_gate(db_path, items, dedupe, ignore_ids, similarity)
+    if rejected:
+        questions = [q for i, q in enumerate(questions) if i not in rejected]
+        skipped_count += len(rejected)
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    written_ids = []
+    
     print("新しいスキーマ形式として処理します")
     print(f"処理対象の問題数: {len(questions)}問")
     # 新しいスキーマの場合はIDをそのまま使用
@@ -321,25 +643,15 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
         if i < 3:  # 最初の3問の変換後の内容を表示
             print(f"  変換後 - category: {converted_question.get('category')}, quizType: {converted_question.get('quizType')}, tags: {type(converted_question.get('tags'))}")
         
-        original_id = converted_question.get('id', '')
-        if not original_id:
-            print(f"警告: 問題にIDがありません。スキップします。")
-            skipped_count += 1
-            continue
-        
-        # 必須フィールドの確認
-        required_fields = ['text', 'options', 'answerIndex', 'explanation', 'category', 'difficulty', 'tags', 'quizType']
-        missing_fields = [field for field in required_fields if field not in converted_question]
-        if missing_fields:
-            print(f"警告: 問題 {original_id} に必須フィールドが不足しています。不足フィールド: {missing_fields}")
+        # 必須フィールド・型の確認
+        errors = INGEST_QUESTION_VALIDATOR.check(converted_question)
+        if errors:
+            print(f"警告: {describe_ingest_errors(converted_question.get('id'), errors)}。スキップします。")
             skipped_count += 1
             continue
+        original_id = converted_question['id']
         
         # 選択肢を文字列に変換（|||で区切る）
-        if not isinstance(converted_question['options'], list):
-            print(f"警告: 問題 {original_id} のoptionsが配列ではありません。スキップします。")
-            skipped_count += 1
-            continue
         options_str = '|||'.join(converted_question['options'])
         
         # tagsが配列の場合は文字列に変換
@@ -358,7 +670,8 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
                     UPDATE questions 
                     SET text = ?, options = ?, answerIndex = ?, explanation = ?, 
                         trivia = ?, category = ?, difficulty = ?, tags = ?, reference_date = ?,
-                        quiz_type = ?, category_id = ?, region = ?, league = ?, team = ?, team_id = ?, weekly_meta = ?
+                        quiz_type = ?, category_id = ?, region = ?, league = ?, team = ?, team_id = ?, weekly_meta = ?,
+                        source_file = ?, text_hash = ?
                     WHERE id = ?
                 ''', (
                     converted_question['text'],
@@ -377,9 +690,12 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
                     converted_question.get('team'),
                     converted_question.get('teamId'),
                     converted_question.get('weeklyMeta'),
+                    source_file,
+                    compute_text_hash(converted_question['text'], converted_question['options']),
                     original_id
                 ))
                 updated_count += 1
+                written_ids.append(original_id)
                 print(f"  更新: {original_id}")
             else:
                 skipped_count += 1
@@ -390,8 +706,8 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
                 cursor.execute('''
                     INSERT INTO questions 
                     (id, text, options, answerIndex, explanation, trivia, category, difficulty, tags, reference_date,
-                     quiz_type, category_id, region, league, team, team_id, weekly_meta)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     quiz_type, category_id, region, league, team, team_id, weekly_meta, source_file, text_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     original_id,
                     converted_question['text'],
@@ -409,14 +725,20 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
                     converted_question.get('league'),
                     converted_question.get('team'),
                     converted_question.get('teamId'),
-                    converted_question.get('weeklyMeta')
+                    converted_question.get('weeklyMeta'),
+                    source_file,
+                    compute_text_hash(converted_question['text'], converted_question['options'])
                 ))
                 inserted_count += 1
+                written_ids.append(original_id)
                 print(f"  追加: {original_id}")
             except sqlite3.IntegrityError as e:
                 skipped_count += 1
                 print(f"  エラー: {original_id} の挿入に失敗しました: {e}")
     
+    sync_question_tags(cursor, written_ids)
+    if written_ids:
+        refresh_sort_keys(cursor)
     conn.commit()
     conn.close()
     
@@ -427,6 +749,791 @@ def insert_questions_to_db(questions: list, db_path: str, replace: bool = True):
         print(f"スキップ: {skipped_count}問")
 
 
+def build_question_row(question: dict, source_file: str = None) -> tuple:
+    """新しいスキーマ形式の問題をquestionsテーブルの1行（QUESTION_COLUMNSの順）に変換
+    
+    Raises:
+        ValueError: 新しいスキーマ形式でない、IDがない、必須フィールドが不足している場合
+    """
+    if not is_new_schema_format(question):
+        raise ValueError(f"問題 {question.get('id', 'unknown')} が新しいスキーマ形式ではありません")
+    
+    converted_question = convert_new_schema_to_db_format(question)
+    errors = INGEST_QUESTION_VALIDATOR.check(converted_question)
+    if errors:
+        raise ValueError(describe_ingest_errors(converted_question.get('id'), errors))
+    return question_row_from_converted(converted_question, source_file)
+
+
+def describe_ingest_errors(question_id, errors: list) -> str:
+    """INGEST_QUESTION_VALIDATORの検証結果を、1行のメッセージにする"""
+    if any(field == 'id' for field, _, _ in errors):
+        return "問題にIDがありません"
+    missing = missing_fields(errors)
+    if missing:
+        return f"問題 {question_id} に必須フィールドが不足しています。不足フィールド: {missing}"
+    return f"問題 {question_id}: " + '、'.join(message for _, _, message in errors)
+
+
+def question_row_from_converted(converted_question: dict, source_file: str = None) -> tuple:
+    """検証済みの（convert_new_schema_to_db_formatで変換した）問題を、questionsテーブルの1行に変換"""
+    original_id = converted_question['id']
+    tags_str = converted_question['tags']
+    if isinstance(tags_str, list):
+        tags_str = ','.join(tags_str)
+    
+    return (
+        original_id,
+        converted_question['text'],
+        '|||'.join(converted_question['options']),
+        converted_question['answerIndex'],
+        converted_question['explanation'],
+        converted_question.get('trivia'),
+        converted_question['category'],
+        converted_question['difficulty'],
+        tags_str,
+        converted_question.get('referenceDate'),
+        converted_question.get('quizType'),
+        converted_question.get('categoryId'),
+        converted_question.get('region'),
+        converted_question.get('league'),
+        converted_question.get('team'),
+        converted_question.get('teamId'),
+        converted_question.get('weeklyMeta'),
+        source_file,
+        compute_text_hash(converted_question['text'], converted_question['options'])
+    )
+
+
+def build_question_rows(questions: list, source_file: str = None) -> tuple:
+    """問題のリストをまとめて検証し、questionsテーブルの行に変換
+    
+    Returns:
+        (行のリスト, スキップした問題の警告メッセージのリスト) のタプル
+    """
+    warnings = []
+    rows = [row for batch in iter_row_batches(questions, source_file, warnings.append) for row in batch]
+    return rows, warnings
+
+
+def iter_converted_questions(questions, on_skip):
+    """新しいスキーマ形式の問題を1問ずつDBの形式に変換して返すジェネレーター
+    
+    新しいスキーマ形式でない問題は、on_skip(警告メッセージ)を呼び出して読み飛ばす。
+    """
+    for question in questions:
+        if is_new_schema_format(question):
+            yield convert_new_schema_to_db_format(question)
+        else:
+            on_skip(f"警告: 問題 {question.get('id', 'unknown')} が新しいスキーマ形式ではありません。スキップします。")
+
+
+def iter_row_batches(questions, source_file: str = None, on_skip=print, batch_size: int = STREAM_BATCH_SIZE):
+    """問題をbatch_size問ずつ検証し、questionsテーブルの行のリストを返すジェネレーター
+    
+    問題はイテラブル（iter_questions_from_jsonなど）から1問ずつ取り出すため、
+    同時にメモリに保持するのはbatch_size問分のみ。不正な問題はon_skip(警告メッセージ)を呼び出して除く。
+    """
+    for converted in iter_batches(iter_converted_questions(questions, on_skip), batch_size):
+        report = INGEST_QUESTION_VALIDATOR.validate_batch(converted)
+        for index, errors in report.errors_by_index().items():
+            messages = [(field, code, INGEST_QUESTION_VALIDATOR.messages[(field, code)]) for field, code in errors]
+            on_skip(f"警告: {describe_ingest_errors(converted[index].get('id'), messages)}。スキップします。")
+        yield [question_row_from_converted(converted[index], source_file) for index in report.valid_indexes()]
+
+
+def build_upsert_sql(replace: bool = True) -> str:
+    """questionsテーブルへのUPSERT文を作成（replace=Falseの場合は既存のIDを変更しない）"""
+    columns = ', '.join(QUESTION_COLUMNS)
+    placeholders = ', '.join('?' for _ in QUESTION_COLUMNS)
+    if replace:
+        assignments = ', '.join(f"{column} = excluded.{column}" for column in QUESTION_COLUMNS[1:])
+        conflict_action = f"DO UPDATE SET {assignments}"
+    else:
+        conflict_action = "DO NOTHING"
+    return f"INSERT INTO questions ({columns}) VALUES ({placeholders}) ON CONFLICT(id) {conflict_action}"
+
+
+def apply_bulk_load_pragmas(conn: sqlite3.Connection) -> dict:
+    """一括登録用のPRAGMAを適用し、元の設定値を返す"""
+    original = {}
+    for name, value in BULK_LOAD_PRAGMAS.items():
+        original[name] = conn.execute(f"PRAGMA {name}").fetchone()[0]
+        conn.execute(f"PRAGMA {name} = {value}")
+    return original
+
+
+def restore_pragmas(conn: sqlite3.Connection, original: dict):
+    """apply_bulk_load_pragmasで変更したPRAGMAを元に戻す"""
+    for name, value in original.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def write_rows_bulk(db_path: str, rows: list, replace: bool = True, on_transaction=None) -> dict:
+    """変換済みの行をUPSERTで一括登録（1接続・1トランザクション・executemany）
+    
+    途中でエラーが発生した場合はロールバックし、データベースは変更されない。
+    on_transactionを指定した場合は、同じトランザクション内でon_transaction(conn)を実行する。
+    
+    Returns:
+        {'inserted': 追加数, 'updated': 更新数, 'unchanged': 既存のため変更しなかった数, 'written': 書き込んだ行数} の辞書
+    """
+    return write_row_batches(db_path, [rows], replace, on_transaction=on_transaction)
+
+
+def write_row_batches(db_path: str, batches, replace: bool = True, on_transaction=None, before_write=None) -> dict:
+    """行のリストのイテラブルを、届いた順にUPSERTで登録（1接続・1トランザクション・バッチごとにexecutemany）
+    
+    batchesにはiter_row_batchesなどのジェネレーターを渡せる。最初のバッチはファイルの解析が終わる前に
+    書き込まれ、同時にメモリに保持する行は1バッチ分のみ。
+    途中でエラー（解析のエラーを含む）が発生した場合はロールバックし、データベースは変更されない。
+    before_writeを指定した場合は、バッチごとにbefore_write(conn, rows)が返す行を書き込む（重複チェック用）。
+    on_transactionを指定した場合は、すべてのバッチの書き込み後に同じトランザクション内でon_transaction(conn)を実行する。
+    
+    Returns:
+        {'inserted': 追加数, 'updated': 更新数, 'unchanged': 既存のため変更しなかった数, 'written': 書き込んだ行数} の辞書
+    """
+    migrate_database(db_path)
+    upsert_sql = build_upsert_sql(replace)
+    written_count = 0
+    changed_count = 0
+    # 自動コミットモードで接続し、トランザクションは明示的に管理する
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        original_pragmas = apply_bulk_load_pragmas(conn)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.cursor()
+                count_before = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+                for rows in batches:
+                    if before_write is not None:
+                        rows = before_write(conn, rows)
+                    if not rows:
+                        continue
+                    changes_before = conn.total_changes
+                    conn.executemany(upsert_sql, rows)
+                    changed_count += conn.total_changes - changes_before
+                    written_count += len(rows)
+                    sync_question_tags(cursor, [row[0] for row in rows])
+                count_after = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+                if on_transaction is not None:
+                    on_transaction(conn)
+                # 問題が追加・更新・削除された場合はランダム抽出用のsort_keyを振り直す
+                count_final = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+                if changed_count > 0 or count_final != count_after:
+                    refresh_sort_keys(cursor)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            restore_pragmas(conn, original_pragmas)
+    finally:
+        conn.close()
+    
+    inserted_count = count_after - count_before
+    # replace=Falseの場合、既存のIDは変更されない（DO NOTHING）
+    updated_count = changed_count - inserted_count if replace else 0
+    return {
+        'inserted': inserted_count,
+        'updated': updated_count,
+        'unchanged': written_count - inserted_count - updated_count,
+        'written': written_count,
+    }
+
+
+def print_bulk_summary(result: dict, row_count: int, skipped_count: int, elapsed: float):
+    """一括登録の件数サマリーを表示"""
+    print(f"\nデータベースに一括登録完了: {row_count}問を{elapsed:.2f}秒で処理しました")
+    print(f"追加: {result['inserted']}問")
+    if result['updated'] > 0:
+        print(f"更新: {result['updated']}問")
+    skipped_count += result['unchanged']
+    if skipped_count > 0:
+        print(f"スキップ: {skipped_count}問")
+
+
+def filter_duplicate_rows(db_path: str, rows: list, replace: bool, dedupe: str, similarity: float = None,
+                          ignore_ids=(), conn: sqlite3.Connection = None, verbose: bool = True,
+                          signature_index: SignatureIndex = None) -> tuple:
+    """変換済みの行に登録前の重複チェックを行い、(登録する行のリスト, 登録しない行の数) を返す"""
+    items = [(row[0], row[1], row[2]) for row in rows]
+    ignore_ids = set(ignore_ids)
+    if replace:
+        # 同じIDの登録済みの問題は、この登録で上書きされるため比較しない
+        ignore_ids.update(row[0] for row in rows)
+    rejected = apply_dedupe_gate(db_path, items, dedupe, ignore_ids, similarity, conn=conn, verbose=verbose,
+                                 signature_index=signature_index)
+    if not rejected:
+        return rows, 0
+    return [row for i, row in enumerate(rows) if i not in rejected], len(rejected)
+
+
+def bulk_insert_questions_to_db(questions, db_path: str, replace: bool = True, source_file: str = None,
+                                dedupe: str = 'reject', similarity: float = None) -> dict:
+    """問題をUPSERTで一括登録（1トランザクション・バッチごとにexecutemany）
+    
+    questionsはリストのほか、iter_questions_from_jsonなどのイテラブルも指定できる。
+    問題はSTREAM_BATCH_SIZE問ずつ検証・重複チェック・書き込みを行うため、
+    メモリ使用量は問題数によらず一定で、ファイルの解析が終わる前に最初の行が書き込まれる。
+    重複チェックは書き込み中の接続で行うため、先に書き込んだバッチの問題も登録済みの問題として比較する。
+    類似チェック（similarity）の署名のインデックスは最初のバッチの前に1回だけ登録済みの問題に合わせ、
+    以降は登録したバッチの問題の署名のみ追加する。
+    行ごとのSELECTや出力を行わず、最後に件数のサマリーのみを表示する。
+    途中でエラーが発生した場合はロールバックし、データベースは変更されない。
+    
+    Returns:
+        {'inserted': 追加数, 'updated': 更新数, 'skipped': スキップ数} の辞書
+    """
+    import time
+    
+    start_time = time.perf_counter()
+    skipped_count = 0
+    checked_count = 0
+    rejected_count = 0
+    
+    def skip(message):
+        nonlocal skipped_count
+        skipped_count += 1
+        print(message)
+    
+    signature_index = None
+    written_ids = []
+    
+    def filter_batch(conn, rows):
+        nonlocal checked_count, rejected_count, signature_index
+        checked_count += len(rows)
+        if similarity is not None:
+            if signature_index is None:
+                signature_index = open_signature_index(db_path, conn)
+            else:
+                # 前のバッチで書き込んだ問題の署名のみ追加する（--replaceなしで既存のIDの問題は変更されないため、
+                # 書き込み後の問題文を読む）
+                add_written_signatures(signature_index, conn, written_ids)
+        rows, rejected = filter_duplicate_rows(db_path, rows, replace, dedupe, similarity, conn=conn, verbose=False,
+                                               signature_index=signature_index)
+        rejected_count += rejected
+        written_ids[:] = [row[0] for row in rows]
+        return rows
+    
+    def add_last_signatures(conn):
+        if signature_index is not None:
+            add_written_signatures(signature_index, conn, written_ids)
+    
+    try:
+        result = write_row_batches(
+            db_path, iter_row_batches(questions, source_file, skip), replace,
+            on_transaction=add_last_signatures,
+            before_write=filter_batch if dedupe != 'off' else None
+        )
+    finally:
+        if signature_index is not None:
+            signature_index.close()
+    if dedupe != 'off':
+        print(f"重複チェック（合計）: {checked_count}問中、登録しなかった問題 {rejected_count}問")
+    skipped_count += rejected_count
+    print_bulk_summary(result, result['written'], skipped_count, time.perf_counter() - start_time)
+    return {
+        'inserted': result['inserted'],
+        'updated': result['updated'],
+        'skipped': skipped_count + result['unchanged'],
+    }
+
+
+def check_filename_metadata(questions: list, filename: str) -> list:
+    """ファイル名のquizType・difficultyとJSON内の値を比較し、警告メッセージのリストを返す"""
+    warnings = []
+    for _ in iter_checked_filename_metadata(questions, filename, warnings.append):
+        pass
+    return warnings
+
+
+def iter_checked_filename_metadata(questions, filename: str, warn=print):
+    """問題を1問ずつ返しながら、ファイル名のquizType・difficultyとJSON内の値を比較し、
+    一致しない場合はwarn(警告メッセージ)を呼び出すジェネレーター"""
+    filename_info = parse_filename_for_new_schema(filename)
+    if not filename_info:
+        warn("警告: ファイル名からquizTypeとdifficultyを検出できませんでした")
+        yield from questions
+        return
+    
+    file_quiz_type = filename_info.get('quizType')
+    file_difficulty = filename_info.get('difficulty')
+    for question in questions:
+        json_quiz_type = question.get('quizType')
+        json_difficulty = question.get('difficulty')
+        
+        if json_quiz_type and json_quiz_type != file_quiz_type:
+            warn(f"警告: 問題 {question.get('id', 'unknown')} のquizType ({json_quiz_type}) がファイル名 ({file_quiz_type}) と一致しません")
+        
+        if json_difficulty and json_difficulty != file_difficulty:
+            warn(f"警告: 問題 {question.get('id', 'unknown')} のdifficulty ({json_difficulty}) がファイル名 ({file_difficulty}) と一致しません")
+        yield question
+
+
+def find_new_schema_question(questions) -> tuple:
+    """最初の新しいスキーマ形式の問題まで読み進め、(読み進めた問題を含む問題のイテレーター, 見つかったか) を返す
+    
+    ストリーミング登録で、書き込みを始める前に新しいスキーマ形式のファイルかどうかを確認するために使用する
+    （新しいスキーマ形式の問題が見つからない場合のみファイルを最後まで読む）。
+    """
+    import itertools
+    
+    questions = iter(questions)
+    head = []
+    for question in questions:
+        head.append(question)
+        if is_new_schema_format(question):
+            return itertools.chain(head, questions), True
+    return iter(head), False
+
+
+def expand_json_inputs(inputs: list) -> list:
+    """ファイル・ディレクトリ・globパターンの指定を、重複のないJSONファイルのリストに展開
+    
+    - ディレクトリ: 配下の*.jsonを再帰的に検索（生成途中のチェックポイントなど、.で始まるディレクトリは除く）
+    - globパターン: ** による再帰指定に対応（シェルが展開しない環境向け）
+    - ディレクトリ・globパターンで見つかったWeekly Recapのマニフェスト（manifest.json）は問題のファイルではないため除く
+      （ファイルを直接指定した場合は除かない）
+    """
+    import glob
+    from utils.weekly_artifacts import MANIFEST_FILENAME
+    
+    json_files = []
+    seen = set()
+    for value in inputs:
+        path = Path(value)
+        if path.is_dir():
+            candidates = sorted(
+                candidate for candidate in path.rglob('*.json')
+                if not any(part.startswith('.') for part in candidate.relative_to(path).parent.parts)
+            )
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = [Path(p) for p in sorted(glob.glob(value, recursive=True))]
+            if not candidates:
+                print(f"警告: 一致するファイルがありません: {value}")
+        for candidate in candidates:
+            if not candidate.is_file() or candidate.suffix != '.json':
+                continue
+            if candidate.name == MANIFEST_FILENAME and candidate != path:
+                continue
+            key = candidate.resolve()
+            if key not in seen:
+                seen.add(key)
+                json_files.append(candidate)
+    return json_files
+
+
+def parse_json_file_to_rows(json_path: str, known_hash: str = None) -> dict:
+    """1つのJSONファイルを読み込み、DBに登録する行に変換（ワーカープロセスで実行）
+    
+    出力が混ざらないよう、このプロセスでは表示せずにメッセージを結果に含めて返す。
+    内容のハッシュがknown_hash（前回登録時のハッシュ）と一致する場合は変換を省略する。
+    ハッシュの計算と問題の読み込みはどちらもファイルを少しずつ読み進めて行う（ファイル全体を読み込まない）。
+    
+    Returns:
+        {'path', 'size', 'mtime_ns', 'content_hash', 'unchanged', 'rows', 'question_count',
+         'skipped', 'warnings', 'error'} の辞書
+    """
+    result = {
+        'path': json_path, 'size': None, 'mtime_ns': None, 'content_hash': None, 'unchanged': False,
+        'rows': [], 'question_count': 0, 'skipped': 0, 'warnings': [], 'error': None,
+    }
+    try:
+        stat = os.stat(json_path)
+        digest = hashlib.sha256()
+        with open(json_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FILE_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        result['size'] = stat.st_size
+        result['mtime_ns'] = stat.st_mtime_ns
+        result['content_hash'] = digest.hexdigest()
+        if result['content_hash'] == known_hash:
+            result['unchanged'] = True
+            return result
+        
+        questions, is_new_schema = find_new_schema_question(iter_questions_from_json(json_path))
+        if not is_new_schema:
+            result['error'] = "新しいスキーマ形式（quizTypeフィールドを含む）のJSONファイルではありません"
+            return result
+        
+        def count_questions(questions):
+            for question in questions:
+                result['question_count'] += 1
+                yield question
+        
+        skip_warnings = []
+        questions = iter_checked_filename_metadata(count_questions(questions), Path(json_path).name, result['warnings'].append)
+        for rows in iter_row_batches(questions, get_source_file_label(json_path), skip_warnings.append):
+            result['rows'].extend(rows)
+    except (OSError, ValueError) as e:
+        # json.JSONDecodeError・UnicodeDecodeErrorはValueErrorのサブクラス
+        result['error'] = str(e)
+        result['rows'] = []
+        return result
+    
+    result['warnings'].extend(skip_warnings)
+    result['skipped'] = len(skip_warnings)
+    return result
+
+
+def diff_rows_against_manifest(rows: list, previous_hashes: dict) -> tuple:
+    """前回登録時の行ハッシュと比較し、書き込みが必要な行と削除された問題IDを返す
+    
+    Returns:
+        (追加・変更された行のリスト, ファイルから削除された問題IDのリスト, 現在の行ハッシュの辞書) のタプル
+    """
+    row_hashes = {}
+    changed_rows = []
+    for row in rows:
+        row_hash = compute_row_hash(row)
+        row_hashes[row[0]] = row_hash
+        if previous_hashes.get(row[0]) != row_hash:
+            changed_rows.append(row)
+    removed_ids = [question_id for question_id in previous_hashes if question_id not in row_hashes]
+    return changed_rows, removed_ids, row_hashes
+
+
+def select_unique_id_rows(rows: list, keep_last: bool) -> tuple:
+    """同じ問題IDの行が複数ある場合（複数のファイル・同じファイル内）に1行だけを残す
+
+    keep_last=Trueの場合は最後の行（UPSERTで上書きされて残る行）、Falseの場合は最初の行
+    （以降はON CONFLICT DO NOTHINGで書き込まれない）を残す。
+
+    Returns:
+        (残す行のリスト, {重複した問題ID: 行の登録元ファイルのリスト}) のタプル
+    """
+    source_index = QUESTION_COLUMNS.index('source_file')
+    kept_positions = {}
+    sources = {}
+    for position, row in enumerate(rows):
+        sources.setdefault(row[0], []).append(row[source_index])
+        if keep_last or row[0] not in kept_positions:
+            kept_positions[row[0]] = position
+    if len(kept_positions) == len(rows):
+        return rows, {}
+    kept = set(kept_positions.values())
+    duplicates = {question_id: files for question_id, files in sources.items() if len(files) > 1}
+    return [row for position, row in enumerate(rows) if position in kept], duplicates
+
+
+def ingest_json_files(json_files: list, db_path: str, replace: bool = True, workers: int = None, full: bool = False,
+                      dedupe: str = 'reject', similarity: float = None) -> dict:
+    """複数のJSONファイルを並列に解析し、1つの接続・1トランザクションでまとめて登録
+    
+    ファイルの読み込みと変換はワーカープロセスで並列に行い、
+    書き込みはメインプロセスの1つの接続のみで行う（SQLiteの書き込みロック競合を避ける）。
+    
+    ingest_manifestに記録した前回の登録内容と比較し、
+    - サイズと更新時刻が同じファイルは読み込まない
+    - 内容のハッシュが同じファイルは変換しない
+    - 変更されたファイルは、追加・変更された問題のみを書き込み、ファイルから削除された問題はDBからも削除する
+    full=Trueの場合は前回の登録内容を使わず、すべてのファイル・問題を書き込む。
+    書き込む行は、書き込みのトランザクションの前にまとめて重複チェックを行う（apply_dedupe_gate）。
+    行ハッシュは実際に書き込んだ・削除した問題のみ更新する。重複チェックで登録しなかった問題、
+    replace=Falseで登録済みのIDの問題・削除しなかった問題は前回の値のままにし、そのファイルは次回も読み込む。
+    
+    Returns:
+        {'inserted', 'updated', 'deleted', 'skipped', 'unchanged_files', 'failed_files'} の辞書
+    """
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from datetime import datetime
+    
+    start_time = time.perf_counter()
+    manifest = {} if full else load_ingest_manifest(db_path)
+    
+    # サイズと更新時刻が前回と同じファイルは読み込まずにスキップ
+    paths = []
+    known_hashes = []
+    unchanged_files = []
+    for json_file in json_files:
+        path = str(json_file)
+        entry = manifest.get(get_source_file_label(path))
+        if entry is not None:
+            stat = os.stat(path)
+            if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+                unchanged_files.append(path)
+                continue
+        paths.append(path)
+        known_hashes.append(entry['content_hash'] if entry else None)
+    
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    if workers == 1:
+        results = [parse_json_file_to_rows(path, known_hash) for path, known_hash in zip(paths, known_hashes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(parse_json_file_to_rows, paths, known_hashes, chunksize=4))
+    
+    rows = []
+    stale_ids = []
+    file_entries = []
+    skipped_count = 0
+    failed_files = []
+    ingested_at = datetime.now().isoformat(timespec='seconds')
+    for result in results:
+        if result['error']:
+            print(f"エラー: {result['path']}: {result['error']}")
+            failed_files.append(result['path'])
+            continue
+        source_file = get_source_file_label(result['path'])
+        previous_hashes = manifest.get(source_file, {}).get('row_hashes', {})
+        if result['unchanged']:
+            # 内容は同じで更新時刻だけが変わったファイルは、次回読み込まないよう記録のみ更新
+            unchanged_files.append(result['path'])
+            row_hashes = previous_hashes
+        else:
+            changed_rows, removed_ids, row_hashes = diff_rows_against_manifest(result['rows'], previous_hashes)
+            print(f"  {result['path']}: {len(result['rows'])}問（書き込み: {len(changed_rows)}問, 削除: {len(removed_ids)}問）")
+            for warning in result['warnings']:
+                print(f"    {warning}")
+            rows.extend(changed_rows)
+            stale_ids.extend((question_id, source_file) for question_id in removed_ids)
+            skipped_count += result['skipped']
+        file_entries.append((source_file, result, row_hashes, previous_hashes))
+    
+    if paths:
+        print(f"\n{len(paths) - len(failed_files)}/{len(paths)}ファイルを解析しました（ワーカー数: {workers}）")
+    if unchanged_files:
+        print(f"変更のないファイル: {len(unchanged_files)}件（スキップ）")
+    
+    # 重複チェック（この登録で削除される問題は登録済みの問題として扱わない）
+    written_rows, rejected_count = filter_duplicate_rows(
+        db_path, rows, replace, dedupe, similarity,
+        ignore_ids=[question_id for question_id, _ in stale_ids] if replace else ()
+    )
+    skipped_count += rejected_count
+    # 同じ問題IDの行が複数ある場合は1行のみ書き込む（--replace指定時は後の行、なしの場合は先の行）
+    unique_rows, duplicate_ids = select_unique_id_rows(written_rows, keep_last=replace)
+    for question_id, files in list(duplicate_ids.items())[:MAX_DEDUPE_MESSAGES]:
+        kept_file = files[-1] if replace else files[0]
+        print(f"警告: 問題ID '{question_id}' が{len(files)}回あります（{', '.join(dict.fromkeys(files))}）。"
+              f"{kept_file} の問題のみ登録します")
+    if len(duplicate_ids) > MAX_DEDUPE_MESSAGES:
+        print(f"  ... 他 {len(duplicate_ids) - MAX_DEDUPE_MESSAGES}件の問題IDが重複しています")
+    skipped_count += len(written_rows) - len(unique_rows)
+    # 書き込まなかった問題（重複チェックで登録しなかった問題、IDが重複した問題、--replaceなしで登録済みのIDの問題）の
+    # (登録元ファイル, ID)。行ハッシュを前回の値のままにし、次回も書き込みの対象にする
+    source_index = QUESTION_COLUMNS.index('source_file')
+    written_row_ids = {id(row) for row in unique_rows}
+    unwritten_keys = {(row[source_index], row[0]) for row in rows if id(row) not in written_row_ids}
+    rows = unique_rows
+    existing_count = 0
+    
+    def check_existing_rows(conn, batch):
+        """登録済みのIDの行を確認する
+
+        別のファイルから登録された問題と問題IDが重複する場合は警告する。
+        replace=Falseの場合、登録済みのIDの行は書き込まれない（DO NOTHING）ため除いて記録する。
+        """
+        nonlocal existing_count
+        existing_sources = {}
+        for start in range(0, len(batch), 500):
+            chunk = [row[0] for row in batch[start:start + 500]]
+            placeholders = ', '.join('?' for _ in chunk)
+            existing_sources.update(
+                conn.execute(f"SELECT id, source_file FROM questions WHERE id IN ({placeholders})", chunk)
+            )
+        conflicts = [
+            row for row in batch
+            if row[0] in existing_sources and existing_sources[row[0]] not in (None, row[source_index])
+        ]
+        action = 'で上書きします' if replace else 'は登録しません'
+        for row in conflicts[:MAX_DEDUPE_MESSAGES]:
+            print(f"警告: 問題ID '{row[0]}' は別のファイル（{existing_sources[row[0]]}）から登録済みです。"
+                  f"{row[source_index]} の問題{action}")
+        if len(conflicts) > MAX_DEDUPE_MESSAGES:
+            print(f"  ... 他 {len(conflicts) - MAX_DEDUPE_MESSAGES}件の問題IDが重複しています")
+        if replace:
+            return batch
+        unwritten_keys.update((row[source_index], row[0]) for row in batch if row[0] in existing_sources)
+        existing_count += sum(1 for row in batch if row[0] in existing_sources)
+        return [row for row in batch if row[0] not in existing_sources]
+    
+    def build_manifest_updates():
+        """実際に書き込んだ・削除した問題のみ行ハッシュを更新した、ingest_manifestの行を作成"""
+        updates = []
+        for source_file, result, row_hashes, previous_hashes in file_entries:
+            recorded = {}
+            for question_id, row_hash in row_hashes.items():
+                if (source_file, question_id) in unwritten_keys:
+                    row_hash = previous_hashes.get(question_id)
+                if row_hash is not None:
+                    recorded[question_id] = row_hash
+            if not replace:
+                # ファイルから削除された問題は--replace指定時のみ削除するため、次回も削除の対象として残す
+                for question_id, row_hash in previous_hashes.items():
+                    if question_id not in row_hashes:
+                        recorded[question_id] = row_hash
+            if recorded == row_hashes:
+                updates.append((
+                    source_file, result['size'], result['mtime_ns'], result['content_hash'],
+                    json.dumps(recorded, ensure_ascii=False), ingested_at
+                ))
+            else:
+                # ファイルの内容がすべては反映されていないため、サイズ・更新時刻・内容のハッシュを記録せず、
+                # 次回も読み込んで行ハッシュの差分を確認する
+                updates.append((source_file, -1, -1, '', json.dumps(recorded, ensure_ascii=False), ingested_at))
+        return updates
+    
+    deleted_count = 0
+    
+    def apply_manifest_changes(conn):
+        nonlocal deleted_count
+        if replace and stale_ids:
+            # ファイルから削除された問題は、そのファイルから登録されたものに限りDBからも削除
+            changes_before = conn.total_changes
+            conn.executemany('DELETE FROM questions WHERE id = ? AND source_file = ?', stale_ids)
+            deleted_count = conn.total_changes - changes_before
+            sync_question_tags(conn.cursor(), [question_id for question_id, _ in stale_ids])
+        conn.executemany('''
+            INSERT INTO ingest_manifest (source_file, size, mtime_ns, content_hash, row_hashes, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source_file) DO UPDATE SET
+                size = excluded.size, mtime_ns = excluded.mtime_ns, content_hash = excluded.content_hash,
+                row_hashes = excluded.row_hashes, ingested_at = excluded.ingested_at
+        ''', build_manifest_updates())
+    
+    write_result = write_row_batches(
+        db_path, [rows], replace, on_transaction=apply_manifest_changes,
+        before_write=check_existing_rows
+    )
+    skipped_count += existing_count
+    print_bulk_summary(write_result, len(rows), skipped_count, time.perf_counter() - start_time)
+    if deleted_count > 0:
+        print(f"削除: {deleted_count}問")
+    if failed_files:
+        print(f"読み込みに失敗したファイル: {len(failed_files)}件")
+    return {
+        'inserted': write_result['inserted'],
+        'updated': write_result['updated'],
+        'deleted': deleted_count,
+        'skipped': skipped_count + write_result['unchanged'],
+        'unchanged_files': unchanged_files,
+        'failed_files': failed_files,
+    }
+
+
+def explain_app_queries(conn: sqlite3.Connection) -> dict:
+    """アプリの代表的なクエリの実行計画を取得（クエリ名をキーとした辞書）"""
+    plans = {}
+    for name, sql, params in APP_QUERY_SHAPES:
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            plans[name] = ' / '.join(row[-1] for row in rows)
+        except sqlite3.OperationalError as e:
+            # 古いスキーマで列・テーブルがない場合
+            plans[name] = f"(実行不可: {e})"
+    return plans
+
+
+def get_database_stats(db_path: str) -> dict:
+    """ファイルサイズ・ページサイズ・ページ数・空きページ数・ジャーナルモードを取得"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            'file_size': os.path.getsize(db_path),
+            'page_size': conn.execute("PRAGMA page_size").fetchone()[0],
+            'page_count': conn.execute("PRAGMA page_count").fetchone()[0],
+            'freelist_count': conn.execute("PRAGMA freelist_count").fetchone()[0],
+            'journal_mode': conn.execute("PRAGMA journal_mode").fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def vacuum_with_page_size(db_path: str, page_size: int):
+    """ページサイズを変更してVACUUMで再構築し、統計情報を更新する"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # WALモードではページサイズを変更できないため、先にDELETEモードに戻す
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute(f"PRAGMA page_size = {page_size}")
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+def choose_page_size(db_path: str) -> tuple:
+    """候補のページサイズごとに一時コピーを再構築し、ファイルサイズが最小になるものを選ぶ
+    
+    標準のページサイズ（FINALIZE_PAGE_SIZESの先頭）と比べてFINALIZE_PAGE_SIZE_MIN_SAVING以上
+    小さくならない場合は、標準のページサイズを選ぶ。
+    
+    Returns:
+        (選択したページサイズ, {ページサイズ: ファイルサイズ}) のタプル
+    """
+    import shutil
+    import tempfile
+    
+    sizes = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for page_size in FINALIZE_PAGE_SIZES:
+            temp_path = str(Path(temp_dir) / f"questions_{page_size}.db")
+            shutil.copyfile(db_path, temp_path)
+            vacuum_with_page_size(temp_path, page_size)
+            sizes[page_size] = os.path.getsize(temp_path)
+    default_page_size = FINALIZE_PAGE_SIZES[0]
+    best = min(FINALIZE_PAGE_SIZES, key=lambda page_size: (sizes[page_size], FINALIZE_PAGE_SIZES.index(page_size)))
+    if sizes[best] > sizes[default_page_size] * (1 - FINALIZE_PAGE_SIZE_MIN_SAVING):
+        best = default_page_size
+    return best, sizes
+
+
+def finalize_database(db_path: str, page_size: int = None) -> dict:
+    """配布用にデータベースを最適化し、サイズと実行計画の変化を表示
+    
+    - VACUUMで空きページを除去して詰め直す
+    - ページサイズを選択（指定がない場合は候補の中で最小のファイルになるもの）
+    - ANALYZE・PRAGMA optimizeでクエリプランナー用の統計情報を作成
+    - ジャーナルモードをDELETEにする（WALと違い、読み込み時に-wal/-shmファイルを必要としない）
+    
+    Returns:
+        {'before': 最適化前の統計, 'after': 最適化後の統計, 'plans_before', 'plans_after'} の辞書
+    """
+    print("\n" + "=" * 60)
+    print("データベースの最適化（--finalize）")
+    print("=" * 60)
+    
+    before = get_database_stats(db_path)
+    conn = sqlite3.connect(db_path)
+    plans_before = explain_app_queries(conn)
+    conn.close()
+    
+    if page_size is None:
+        page_size, candidate_sizes = choose_page_size(db_path)
+        for candidate, size in candidate_sizes.items():
+            print(f"  ページサイズ {candidate:>5}: {size / 1024:,.1f}KB")
+        print(f"ページサイズ {page_size} を選択しました")
+    vacuum_with_page_size(db_path, page_size)
+    
+    after = get_database_stats(db_path)
+    conn = sqlite3.connect(db_path)
+    plans_after = explain_app_queries(conn)
+    conn.close()
+    
+    print(f"\nファイルサイズ: {before['file_size'] / 1024:,.1f}KB → {after['file_size'] / 1024:,.1f}KB")
+    print(f"ページサイズ: {before['page_size']} → {after['page_size']}")
+    print(f"ページ数: {before['page_count']} → {after['page_count']}（空きページ: {before['freelist_count']} → {after['freelist_count']}）")
+    print(f"ジャーナルモード: {before['journal_mode']} → {after['journal_mode']}")
+    
+    print("\nアプリのクエリの実行計画:")
+    for name, _, _ in APP_QUERY_SHAPES:
+        if plans_before[name] == plans_after[name]:
+            print(f"  [{name}] 変化なし: {plans_after[name]}")
+        else:
+            print(f"  [{name}]")
+            print(f"    最適化前: {plans_before[name]}")
+            print(f"    最適化後: {plans_after[name]}")
+    
+    return {'before': before, 'after': after, 'plans_before': plans_before, 'plans_after': plans_after}
+
+
 def cleanup_old_json_files(current_json_file: Path):
     """古いJSONファイルを削除（現在のファイル以外）"""
     try:
@@ -463,59 +1570,115 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='JSONファイルからSQLiteデータベースに問題を変換')
-    parser.add_argument('json_file', help='変換するJSONファイルのパス')
+    parser.add_argument('json_file', nargs='*',
+                        help='変換するJSONファイルのパス（複数指定・ディレクトリ・globパターン（**対応）も可）')
     parser.add_argument('--db', default=str(DB_PATH), help='データベースファイルのパス（デフォルト: data/questions.db）')
     parser.add_argument('--replace', action='store_true', help='既存の問題を置き換える')
     parser.add_argument('--create-schema', action='store_true', help='データベーススキーマを作成')
-    parser.add_argument('--cleanup', action='store_true', default=True, help='登録後に古いJSONファイルを削除（デフォルト: True）')
+    parser.add_argument('--bulk', action='store_true',
+                        help='UPSERTで1トランザクションにまとめて一括登録する（行ごとの出力は行わずサマリーのみ表示）')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='複数ファイル登録時に解析を行うワーカープロセス数（デフォルト: CPU数）')
+    parser.add_argument('--full', action='store_true',
+                        help='複数ファイル登録時に、前回の登録内容（ingest_manifest）を使わずすべて書き込む')
+    parser.add_argument('--cleanup', action='store_true', default=True,
+                        help='登録後に古いJSONファイルを削除（デフォルト: True、単一ファイル指定時のみ）')
+    parser.add_argument('--dedupe', choices=DEDUPE_MODES, default='reject',
+                        help='登録前の重複チェック。IDが異なっても問題文と選択肢が同じ問題を、reject: 登録しない（デフォルト）、'
+                             'flag: 警告のみ表示して登録する、off: チェックしない')
+    parser.add_argument('--similarity', type=float, default=None,
+                        help='重複チェックで、MinHash署名の一致率がこの値以上の類似した問題も警告する（0〜1、例: 0.7）')
+    parser.add_argument('--migrate', action='store_true',
+                        help='未適用のスキーママイグレーションを適用する。JSONファイルの指定は省略可')
+    parser.add_argument('--finalize', action='store_true',
+                        help='配布用にデータベースを最適化（VACUUM・ANALYZE・ページサイズ・ジャーナルモード）。JSONファイルの指定は省略可')
+    parser.add_argument('--page-size', type=int, choices=FINALIZE_PAGE_SIZES, default=None,
+                        help='--finalize時のページサイズ（指定しない場合は候補の中で最も小さくなるものを選択）')
     
     args = parser.parse_args()
     
+    if not args.json_file and not args.finalize and not args.migrate:
+        parser.error("JSONファイルを指定するか、--migrate または --finalize を指定してください")
+    if args.similarity is not None and not 0 < args.similarity <= 1:
+        parser.error("--similarity は0より大きく1以下を指定してください")
+    
     # データベースディレクトリを作成
     os.makedirs(os.path.dirname(args.db), exist_ok=True)
     
-    # スキーマ作成
+    # スキーマ作成・マイグレーション
     if args.create_schema or not os.path.exists(args.db):
         create_database_schema(args.db)
+    elif args.migrate:
+        conn = sqlite3.connect(args.db)
+        previous_version = get_schema_version(conn.cursor())
+        conn.close()
+        version = migrate_database(args.db)
+        if version == previous_version:
+            print(f"スキーマは最新です（バージョン: {version}）")
+        else:
+            print(f"スキーマを更新しました: バージョン {previous_version} → {version}")
     
-    # JSONファイルから問題を読み込み
-    json_file_path = Path(args.json_file)
-    if not json_file_path.exists():
-        print(f"エラー: JSONファイルが見つかりません: {args.json_file}")
-        sys.exit(1)
+    if args.json_file:
+        ingest_from_args(args, parser)
     
-    questions = load_questions_from_json(str(json_file_path))
+    if args.finalize:
+        finalize_database(args.db, page_size=args.page_size)
+
+
+def ingest_from_args(args, parser):
+    """コマンドライン引数で指定されたJSONファイルを登録"""
+    # 複数ファイル・ディレクトリ・globパターンが指定された場合はまとめて登録
+    if len(args.json_file) > 1 or not Path(args.json_file[0]).is_file():
+        if args.workers is not None and args.workers < 1:
+            parser.error("--workers は1以上を指定してください")
+        json_files = expand_json_inputs(args.json_file)
+        if not json_files:
+            print(f"エラー: JSONファイルが見つかりません: {' '.join(args.json_file)}")
+            sys.exit(1)
+        print(f"{len(json_files)}件のJSONファイルを登録します")
+        result = ingest_json_files(
+            json_files, args.db, replace=args.replace, workers=args.workers, full=args.full,
+            dedupe=args.dedupe, similarity=args.similarity
+        )
+        print("\n変換完了！")
+        if result['failed_files']:
+            sys.exit(1)
+        return
     
-    # 新しいスキーマ形式を検証
-    is_new_schema = any(is_new_schema_format(q) for q in questions)
+    # JSONファイルから問題を読み込み
+    json_file_path = Path(args.json_file[0])
+    if args.bulk:
+        # 一括登録は、ファイルを1問ずつ読み込みながら登録する（ファイル全体をメモリに読み込まない）
+        questions, is_new_schema = find_new_schema_question(iter_questions_from_json(json_file_path))
+    else:
+        questions = load_questions_from_json(str(json_file_path))
+        # 新しいスキーマ形式を検証
+        is_new_schema = any(is_new_schema_format(q) for q in questions)
     
     if not is_new_schema:
         print("エラー: 新しいスキーマ形式（quizTypeフィールドを含む）のJSONファイルが必要です")
         sys.exit(1)
     
     print("新しいスキーマ形式を検出しました")
-    # ファイル名からquizTypeとdifficultyを解析
+    # ファイル名からquizTypeとdifficultyを解析し、JSON内の値と一致するか確認
     filename_info = parse_filename_for_new_schema(json_file_path.name)
     if filename_info:
-        file_quiz_type = filename_info.get('quizType')
-        file_difficulty = filename_info.get('difficulty')
-        print(f"ファイル名から検出: quizType={file_quiz_type}, difficulty={file_difficulty}")
-        
-        # JSON内の値と一致するか確認
-        for question in questions:
-            json_quiz_type = question.get('quizType')
-            json_difficulty = question.get('difficulty')
-            
-            if json_quiz_type and json_quiz_type != file_quiz_type:
-                print(f"警告: 問題 {question.get('id', 'unknown')} のquizType ({json_quiz_type}) がファイル名 ({file_quiz_type}) と一致しません")
-            
-            if json_difficulty and json_difficulty != file_difficulty:
-                print(f"警告: 問題 {question.get('id', 'unknown')} のdifficulty ({json_difficulty}) がファイル名 ({file_difficulty}) と一致しません")
-    else:
-        print("警告: ファイル名からquizTypeとdifficultyを検出できませんでした")
+        print(f"ファイル名から検出: quizType={filename_info.get('quizType')}, difficulty={filename_info.get('difficulty')}")
+    # 一括登録では、問題を登録しながら確認する
+    questions = iter_checked_filename_metadata(questions, json_file_path.name)
     
     # データベースに挿入
-    insert_questions_to_db(questions, args.db, replace=args.replace)
+    source_file = get_source_file_label(json_file_path)
+    if args.bulk:
+        bulk_insert_questions_to_db(
+            questions, args.db, replace=args.replace, source_file=source_file,
+            dedupe=args.dedupe, similarity=args.similarity
+        )
+    else:
+        insert_questions_to_db(
+            list(questions), args.db, replace=args.replace, source_file=source_file,
+            dedupe=args.dedupe, similarity=args.similarity
+        )
     
     # 古いJSONファイルを削除
     if args.cleanup:
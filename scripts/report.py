@@ -0,0 +1,246 @@
+"""データベースの健全性レポートスクリプト
+
+check系・分析系のスクリプトに分かれている集計を、questionsテーブルの1回の走査でまとめて計算し、
+JSONで出力する（CIでの実行を想定）。check系のスクリプトと同じく、テーブルをQuestionBankに読み込み、
+QuestionBankの集計（group_count・tag_counts・duplicates）で計算する。
+
+- カテゴリ・難易度・region・team_idごとの問題数（組み合わせ別を含む）
+- 列ごとの入力率（NULL・空文字でない行の割合）
+- answerIndexの分布と、選択肢の範囲外のanswerIndex
+- タグの出現回数
+- IDの重複・問題文の重複（空白を除いて比較）・問題文の先頭が一致する問題
+"""
+import hashlib
+import json
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.question_bank import QuestionBank
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DB_PATH = PROJECT_ROOT / "data" / "questions.db"
+
+REPORT_VERSION = '1.0'
+# 集計対象の列（テーブルに存在する列のみ読み込む）
+REPORT_COLUMNS = (
+    'id', 'text', 'options', 'answerIndex', 'explanation', 'trivia', 'category', 'difficulty', 'tags',
+    'reference_date', 'quiz_type', 'category_id', 'region', 'league', 'team', 'team_id', 'weekly_meta',
+)
+# NULL・空文字の値を表すキー
+EMPTY_KEY = '(NULL/空)'
+OPTIONS_SEPARATOR = '|||'
+# 類似した問題文として扱う先頭の文字数
+TEXT_PREFIX_LENGTH = 30
+DEFAULT_TOP_TAGS = 50
+DEFAULT_MAX_EXAMPLES = 20
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def label(value) -> str:
+    """集計のキー（NULL・空文字はEMPTY_KEYにまとめる）"""
+    if value is None or value == '':
+        return EMPTY_KEY
+    return str(value)
+
+
+def text_digest(text: str) -> bytes:
+    """空白を除いた問題文のハッシュ（重複検出用）"""
+    normalized = _WHITESPACE_PATTERN.sub('', text or '')
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+def count_labels(bank: QuestionBank, columns: list, rows=None) -> Counter:
+    """列の値の組み合わせ（タプル）ごとの行数（NULL・空文字とテーブルにない列の値はEMPTY_KEY）"""
+    present = [column for column in columns if bank.has_column(column)]
+    total = len(bank) if rows is None else len(rows)
+    if not present:
+        return Counter({(EMPTY_KEY,) * len(columns): total}) if total else Counter()
+    counts = Counter()
+    for values, count in bank.group_count(*present, rows=rows, key=label).items():
+        by_column = dict(zip(present, values if len(present) > 1 else (values,)))
+        counts[tuple(by_column.get(column, EMPTY_KEY) for column in columns)] += count
+    return counts
+
+
+def column_values(bank: QuestionBank, column: str) -> list:
+    """列の値のリスト（テーブルにない列はすべてNone）"""
+    return bank.column(column) if bank.has_column(column) else [None] * len(bank)
+
+
+def summarize_bank(bank: QuestionBank, top_tags: int = DEFAULT_TOP_TAGS,
+                   max_examples: int = DEFAULT_MAX_EXAMPLES) -> dict:
+    """QuestionBankの集計からレポートのdict（version・generated_at・database以外）を作成"""
+    total = len(bank)
+
+    def counts(counter: Counter) -> dict:
+        return dict(sorted(counter.items()))
+
+    by_category_difficulty_region = count_labels(bank, ['category', 'difficulty', 'region'])
+
+    def rollup(*positions) -> dict:
+        rolled = Counter()
+        for key, count in by_category_difficulty_region.items():
+            rolled['/'.join(key[i] for i in positions)] += count
+        return counts(rolled)
+
+    categories = sorted({key[0] for key in by_category_difficulty_region})
+    difficulties = sorted({key[1] for key in by_category_difficulty_region})
+    by_category_difficulty = rollup(0, 1)
+    missing_category_difficulty = [
+        f"{category}/{difficulty}"
+        for category in categories
+        for difficulty in difficulties
+        if f"{category}/{difficulty}" not in by_category_difficulty
+    ]
+    by_team_id = Counter({team_id: count for (team_id,), count in count_labels(bank, ['team_id']).items()})
+    teams_rows = bank.filter(category='teams') if bank.has_column('category') else []
+    teams_by_difficulty_team_id = count_labels(bank, ['difficulty', 'team_id'], rows=teams_rows)
+    team_ids = sorted({team_id for _, team_id in teams_by_difficulty_team_id if team_id != EMPTY_KEY})
+    missing_teams_difficulty_team_id = [
+        f"{difficulty}/{team_id}"
+        for difficulty in difficulties
+        for team_id in team_ids
+        if teams_by_difficulty_team_id[(difficulty, team_id)] == 0
+    ]
+
+    # 入力率（NULL・空文字でない行の数）
+    filled = {column: total - bank.group_count(column, key=label)[EMPTY_KEY] for column in bank.columns}
+
+    # answerIndexと選択肢の数
+    ids = column_values(bank, 'id')
+    option_counts = Counter()
+    invalid_answer_ids = []
+    for question_id, options, answer_index in zip(
+        ids, column_values(bank, 'options'), column_values(bank, 'answerIndex')
+    ):
+        option_count = len(options.split(OPTIONS_SEPARATOR)) if options else 0
+        option_counts[option_count] += 1
+        if not isinstance(answer_index, int) or not 0 <= answer_index < option_count:
+            invalid_answer_ids.append(question_id)
+    answer_index = Counter({value: count for (value,), count in count_labels(bank, ['answerIndex']).items()})
+
+    tags = bank.tag_counts() if bank.has_column('tags') else Counter()
+
+    # 重複検出（問題文は空白を除いたハッシュ・先頭で比較する）
+    duplicate_ids = {question_id: len(rows) for question_id, rows in bank.duplicates('id').items()}
+    duplicate_texts = [
+        [ids[row] for row in rows]
+        for rows in bank.duplicates('text', key=text_digest).values()
+    ]
+    similar_prefixes = [
+        {'prefix': prefix, 'ids': [ids[row] for row in rows]}
+        for prefix, rows in bank.duplicates('text', key=lambda text: (text or '')[:TEXT_PREFIX_LENGTH]).items()
+    ]
+
+    return {
+        'total': total,
+        'counts': {
+            'category': rollup(0),
+            'difficulty': rollup(1),
+            'region': rollup(2),
+            'category_difficulty': by_category_difficulty,
+            'category_region': rollup(0, 2),
+            'category_difficulty_region': rollup(0, 1, 2),
+            'team_id': counts(by_team_id),
+            'teams_difficulty_team_id': {
+                f"{difficulty}/{team_id}": count
+                for (difficulty, team_id), count in sorted(teams_by_difficulty_team_id.items())
+            },
+        },
+        'missing_combinations': {
+            'category_difficulty': missing_category_difficulty,
+            'teams_difficulty_team_id': missing_teams_difficulty_team_id,
+        },
+        'field_completeness': {
+            column: {
+                'filled': filled[column],
+                'ratio': round(filled[column] / total, 4) if total else 0,
+            }
+            for column in bank.columns
+        },
+        'answer_index': {
+            'distribution': counts(answer_index),
+            'option_counts': {str(count): n for count, n in sorted(option_counts.items())},
+            'invalid_count': len(invalid_answer_ids),
+            'invalid_ids': invalid_answer_ids[:max_examples],
+        },
+        'tags': {
+            'distinct': len(tags),
+            'total': sum(tags.values()),
+            'top': dict(tags.most_common(top_tags)),
+        },
+        'duplicates': {
+            'id_count': len(duplicate_ids),
+            'ids': dict(list(duplicate_ids.items())[:max_examples]),
+            'text_count': len(duplicate_texts),
+            'texts': duplicate_texts[:max_examples],
+            'similar_prefix_count': len(similar_prefixes),
+            'similar_prefixes': similar_prefixes[:max_examples],
+        },
+    }
+
+
+def build_report(db_path, top_tags: int = DEFAULT_TOP_TAGS, max_examples: int = DEFAULT_MAX_EXAMPLES) -> dict:
+    """questionsテーブルを1回の走査でQuestionBankに読み込み、レポートを作成"""
+    bank = QuestionBank.load(db_path, columns=REPORT_COLUMNS)
+    report = {
+        'version': REPORT_VERSION,
+        'generated_at': datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'database': str(db_path),
+    }
+    report.update(summarize_bank(bank, top_tags=top_tags, max_examples=max_examples))
+    return report
+
+
+def has_problems(report: dict) -> bool:
+    """重複・範囲外のanswerIndexがあるかどうか（--strictの判定）"""
+    duplicates = report['duplicates']
+    return bool(duplicates['id_count'] or duplicates['text_count'] or report['answer_index']['invalid_count'])
+
+
+def main():
+    """メイン処理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='questions.dbの健全性レポートをJSONで出力')
+    parser.add_argument('--db', type=str, default=str(DB_PATH),
+                        help='データベースファイルのパス（デフォルト: data/questions.db）')
+    parser.add_argument('--output', type=str,
+                        help='レポートの出力先（指定しない場合は標準出力）')
+    parser.add_argument('--top-tags', type=int, default=DEFAULT_TOP_TAGS,
+                        help=f'出力するタグの数（出現回数の多い順、デフォルト: {DEFAULT_TOP_TAGS}）')
+    parser.add_argument('--max-examples', type=int, default=DEFAULT_MAX_EXAMPLES,
+                        help=f'重複などの例として出力する最大件数（デフォルト: {DEFAULT_MAX_EXAMPLES}）')
+    parser.add_argument('--strict', action='store_true',
+                        help='IDや問題文の重複・範囲外のanswerIndexがある場合は終了コード1で終了する')
+
+    args = parser.parse_args()
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"エラー: データベースファイルが見つかりません: {db_path}", file=sys.stderr)
+        sys.exit(1)
+
+    report = build_report(db_path, top_tags=args.top_tags, max_examples=args.max_examples)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+        print(f"レポートを保存しました: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.strict and has_problems(report):
+        print("エラー: 重複または範囲外のanswerIndexがあります", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
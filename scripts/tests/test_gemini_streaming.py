@@ -0,0 +1,74 @@
+"""utils/gemini_client.py のストリーミング生成のテスト（FakeTransportを使用し、APIは呼び出さない）
+
+実行方法（scriptsディレクトリで）: python -m unittest discover -s tests
+"""
+import asyncio
+import io
+import json
+import sys
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils import gemini_client
+from utils.gemini_client import FakeTransport, generate_weekly_recap_questions_by_category_async
+
+REGION = 'japan'
+CATEGORY_ID = 'weekly-jp-match'
+REFERENCE_DATE = '2026-02-02'
+
+
+def make_question(number: int) -> dict:
+    return {
+        'text': f"第{number}節の試合で決勝点を挙げたクラブはどれ？",
+        'options': ['鹿島アントラーズ', '浦和レッズ', '川崎フロンターレ', 'ガンバ大阪'],
+        'answerIndex': 0,
+        'explanation': '後半アディショナルタイムのゴールで鹿島アントラーズが勝利し、首位との勝ち点差を縮めました。',
+        'trivia': '鹿島アントラーズはこの試合で今季初の逆転勝利を挙げました。',
+        'difficulty': 'normal',
+        'quizType': 'weekly',
+        'region': REGION,
+        'categoryId': CATEGORY_ID,
+        'tags': ['J1'],
+        'referenceDate': REFERENCE_DATE,
+        'weeklyMeta': {'matchweek': number, 'publishDate': REFERENCE_DATE},
+    }
+
+
+def generate(response_text: str, stream: bool) -> list:
+    transport = FakeTransport([response_text])
+    with redirect_stdout(io.StringIO()):
+        return asyncio.run(generate_weekly_recap_questions_by_category_async(
+            REGION, CATEGORY_ID, '試合結果', 2, REFERENCE_DATE, transport=transport, stream=stream
+        ))
+
+
+class StreamWithCitationTest(unittest.TestCase):
+    """コードブロックの前の説明文に引用の '[' があるレスポンス"""
+
+    def setUp(self):
+        gemini_client.configure_response_cache(None)
+        questions = [make_question(1), make_question(2)]
+        self.response_text = (
+            "検索結果 [1][2] をもとに作成しました。\n\n```json\n"
+            + json.dumps(questions, ensure_ascii=False, indent=2)
+            + "\n```\n"
+        )
+
+    def test_stream_skips_citation_brackets(self):
+        questions = generate(self.response_text, stream=True)
+        self.assertEqual([question['text'] for question in questions],
+                         [make_question(1)['text'], make_question(2)['text']])
+
+    def test_stream_matches_non_stream(self):
+        streamed = [question['text'] for question in generate(self.response_text, stream=True)]
+        whole = [question['text'] for question in generate(self.response_text, stream=False)]
+        self.assertEqual(streamed, whole)
+
+
+if __name__ == '__main__':
+    unittest.main()
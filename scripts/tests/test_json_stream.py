@@ -0,0 +1,60 @@
+"""utils/json_stream.py・utils/weekly_questions.py のレスポンスからのJSONの取り出しのテスト
+
+実行方法（scriptsディレクトリで）: python -m unittest discover -s tests
+"""
+import io
+import json
+import sys
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.json_stream import find_array_start, salvage_json_array
+from utils.weekly_questions import extract_json_text, load_questions_json
+
+# 説明文に '[' を含み、コードブロックの途中で切れたレスポンス
+TRUNCATED_RESPONSE = '以下が問題です [参考: 3件]\n```json\n[{"text":"a"},{"text":"b"},{"text":"c'
+
+
+class FindArrayStartTest(unittest.TestCase):
+    def test_code_fence(self):
+        text = '説明 [参考: 3件]\n```json\n[{"text": "a"}]\n```'
+        self.assertEqual(text[find_array_start(text):].split('\n')[0], '[{"text": "a"}]')
+
+    def test_bracket_in_prose_without_fence(self):
+        text = '説明 [参考: 3件] です\n[\n  {"text": "a"}\n]'
+        self.assertEqual(find_array_start(text), text.index('[\n'))
+
+    def test_not_found(self):
+        self.assertEqual(find_array_start('JSONはありません [参考]'), -1)
+
+
+class SalvageJsonArrayTest(unittest.TestCase):
+    def test_truncated_response_with_bracket_before_fence(self):
+        items, errors = salvage_json_array(TRUNCATED_RESPONSE)
+        self.assertEqual(items, [{'text': 'a'}, {'text': 'b'}])
+        self.assertEqual(errors, [])
+
+    def test_load_questions_json_salvages_instead_of_raising(self):
+        with redirect_stdout(io.StringIO()):
+            questions = load_questions_json(extract_json_text(TRUNCATED_RESPONSE), TRUNCATED_RESPONSE)
+        self.assertEqual([question['text'] for question in questions], ['a', 'b'])
+
+    def test_load_questions_json_raises_without_complete_items(self):
+        text = '以下が問題です [参考: 3件]\n```json\n[{"text":"a'
+        with self.assertRaises(json.JSONDecodeError):
+            load_questions_json(extract_json_text(text), text)
+
+
+class ExtractJsonTextTest(unittest.TestCase):
+    def test_bracket_in_prose_without_fence(self):
+        text = '出典 [1] をもとに作成しました。\n[{"text": "a"}]'
+        self.assertEqual(json.loads(extract_json_text(text)), [{'text': 'a'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""utils/near_duplicates.py の署名のインデックス（SignatureIndex）のテスト
+
+実行方法（scriptsディレクトリで）: python -m unittest discover -s tests
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils import near_duplicates
+from utils.near_duplicates import SignatureIndex
+
+QUESTIONS = [
+    ('q1', '2024年のJ1リーグで優勝したクラブはどこ？'),
+    ('q2', 'バロンドールを最も多く受賞した選手は誰？'),
+    ('q3', 'ワールドカップ2022の決勝で得点したフランスの選手は誰？'),
+]
+
+
+class SignatureIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = SignatureIndex(Path(self.temp_dir.name) / 'signatures.db')
+        near_duplicates.minhash_signature.cache_clear()
+
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def count_signature_calls(self, action):
+        """actionの実行中に署名を計算した回数（メモリ上のキャッシュは使わずに数える）"""
+        wrapped = mock.Mock(wraps=near_duplicates.minhash_signature.__wrapped__)
+        with mock.patch.object(near_duplicates, 'minhash_signature', wrapped):
+            action()
+        return wrapped.call_count
+
+    def test_sync_reuses_signatures_of_renumbered_questions(self):
+        self.index.sync(QUESTIONS)
+        renumbered = [(f'new-{question_id}', text) for question_id, text in QUESTIONS]
+
+        calls = self.count_signature_calls(lambda: self.index.sync(renumbered))
+
+        self.assertEqual(calls, 0)
+        self.assertEqual(self.index.sync(renumbered), {'added': 0, 'removed': 0, 'unchanged': 3})
+        self.assertEqual(self.index.query(QUESTIONS[1][1], 0.9), [('new-q2', 1.0)])
+
+    def test_add_updates_only_given_questions(self):
+        self.index.sync(QUESTIONS[:2])
+        self.index.add([('q2', QUESTIONS[2][1]), ('q4', QUESTIONS[1][1])])
+
+        self.assertEqual(self.index.query(QUESTIONS[2][1], 0.9), [('q2', 1.0)])
+        self.assertEqual(self.index.query(QUESTIONS[1][1], 0.9), [('q4', 1.0)])
+        self.assertEqual(self.index.sync(QUESTIONS[:1] + [('q2', QUESTIONS[2][1]), ('q4', QUESTIONS[1][1])]),
+                         {'added': 0, 'removed': 0, 'unchanged': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""utils/rate_limiter.py のクォータ超過の判定のテスト
+
+実行方法（scriptsディレクトリで）: python -m unittest discover -s tests
+"""
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from utils.rate_limiter import is_quota_error
+
+
+class ApiError(Exception):
+    """google.genaiのerrors.APIErrorと同じ属性（code・status・details）を持つエラー"""
+
+    def __init__(self, code, status, details=None):
+        super().__init__(f"{code} {status}")
+        self.code = code
+        self.status = status
+        self.details = details
+
+
+class IsQuotaErrorTest(unittest.TestCase):
+    def test_api_error_code_and_status(self):
+        self.assertTrue(is_quota_error(ApiError(429, 'RESOURCE_EXHAUSTED')))
+        self.assertTrue(is_quota_error(ApiError(None, 'RESOURCE_EXHAUSTED')))
+        self.assertFalse(is_quota_error(ApiError(500, 'INTERNAL')))
+
+    def test_structured_details(self):
+        error = ApiError(None, None, {'error': {'code': 429, 'status': 'RESOURCE_EXHAUSTED'}})
+        self.assertTrue(is_quota_error(error))
+
+    def test_messages_are_not_matched(self):
+        self.assertFalse(is_quota_error(json.JSONDecodeError("Expecting value", "x" * 500, 429)))
+        self.assertFalse(is_quota_error(ValueError("quota exceeded for RESOURCE_EXHAUSTED 429")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""report.py のレポートの集計（QuestionBankからの作成）のテスト
+
+実行方法（scriptsディレクトリで）: python -m unittest discover -s tests
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# scriptsディレクトリをパスに追加
+scripts_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(scripts_dir))
+
+from report import EMPTY_KEY, summarize_bank
+from utils.question_bank import QuestionBank
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'J1で優勝したクラブは？', 'options': 'A|||B|||C|||D', 'answerIndex': 0,
+     'category': 'teams', 'difficulty': 'easy', 'team_id': 'kashima', 'tags': 'J1,優勝'},
+    {'id': 'q2', 'text': 'J1で 優勝したクラブは？', 'options': 'A|||B|||C|||D', 'answerIndex': 4,
+     'category': 'teams', 'difficulty': 'hard', 'team_id': 'urawa', 'tags': 'J1'},
+    {'id': 'q2', 'text': 'オフサイドの反則は？', 'options': 'A|||B', 'answerIndex': None,
+     'category': 'rules', 'difficulty': 'easy', 'team_id': None, 'tags': ''},
+]
+COLUMNS = ['id', 'text', 'options', 'answerIndex', 'category', 'difficulty', 'team_id', 'tags']
+
+
+class SummarizeBankTest(unittest.TestCase):
+    def setUp(self):
+        self.report = summarize_bank(QuestionBank.from_questions(QUESTIONS, columns=COLUMNS))
+
+    def test_counts_treat_missing_columns_as_empty(self):
+        counts = self.report['counts']
+        self.assertEqual(counts['category_difficulty'], {'rules/easy': 1, 'teams/easy': 1, 'teams/hard': 1})
+        self.assertEqual(counts['region'], {EMPTY_KEY: 3})
+        self.assertEqual(counts['team_id'], {EMPTY_KEY: 1, 'kashima': 1, 'urawa': 1})
+        self.assertEqual(self.report['missing_combinations'], {
+            'category_difficulty': ['rules/hard'],
+            'teams_difficulty_team_id': ['easy/urawa', 'hard/kashima'],
+        })
+
+    def test_answer_index_and_completeness(self):
+        answer_index = self.report['answer_index']
+        self.assertEqual(answer_index['distribution'], {'0': 1, '4': 1, EMPTY_KEY: 1})
+        self.assertEqual(answer_index['invalid_ids'], ['q2', 'q2'])
+        self.assertEqual(self.report['field_completeness']['tags'], {'filled': 2, 'ratio': 0.6667})
+        self.assertEqual(self.report['tags']['top'], {'J1': 2, '優勝': 1})
+
+    def test_duplicates(self):
+        duplicates = self.report['duplicates']
+        self.assertEqual(duplicates['ids'], {'q2': 2})
+        self.assertEqual(duplicates['texts'], [['q1', 'q2']])
+        self.assertEqual(duplicates['similar_prefix_count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
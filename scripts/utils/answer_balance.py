@@ -0,0 +1,294 @@
+"""answerIndex（正解の位置）の均等化
+
+問題を層（デフォルトはcategory × difficulty × region）ごとにまとめ、層の中で正解の位置が0〜3に
+均等になるよう、選択肢の並びを入れ替える問題と移動先の位置を決める（plan_balance）。
+
+- 目標数の余りは、現在の問題数が多い位置に割り当てる
+- 目標数を超えている位置の問題のうち、超過分だけを不足している位置に移動する
+  （既に目標数の範囲内にある問題の選択肢は変更しない）
+- 移動する問題の選択と移動先はランダムに決める（正解の位置が規則的な並びにならないようにする）
+
+問題のリスト（balance_answer_indices）、questionsテーブル全体（balance_database）、
+複数のJSONファイル（balance_json_files）のいずれも同じ計画の処理を使用する。
+"""
+import json
+import os
+import random
+import shutil
+import sqlite3
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from utils.json_stream import iter_json_file_items
+
+OPTION_COUNT = 4
+OPTIONS_SEPARATOR = '|||'
+# 層の分け方（questionsテーブルの列名）
+DEFAULT_STRATA = ('category', 'difficulty', 'region')
+# 層に指定できる列
+STRATUM_COLUMNS = ('category', 'difficulty', 'region', 'league', 'quiz_type', 'category_id', 'team_id')
+UPDATE_BATCH_SIZE = 500
+
+
+def is_balanceable(options, answer_index) -> bool:
+    """選択肢がOPTION_COUNT個で、answerIndexが範囲内の問題かどうか"""
+    return (
+        isinstance(options, list)
+        and len(options) == OPTION_COUNT
+        and isinstance(answer_index, int)
+        and not isinstance(answer_index, bool)
+        and 0 <= answer_index < OPTION_COUNT
+    )
+
+
+def compute_targets(counts: list) -> list:
+    """位置ごとの現在の問題数から、位置ごとの目標数を計算（余りは問題数の多い位置に割り当てる）"""
+    total = sum(counts)
+    targets = [total // OPTION_COUNT] * OPTION_COUNT
+    by_count = sorted(range(OPTION_COUNT), key=lambda index: (-counts[index], index))
+    for index in by_count[:total % OPTION_COUNT]:
+        targets[index] += 1
+    return targets
+
+
+def plan_balance(entries, rng: random.Random = None) -> dict:
+    """層ごとに正解の位置を均等化するための移動先を決める
+
+    Args:
+        entries: (キー, 層, 現在のanswerIndex) のイテラブル（均等化できる問題のみ）
+        rng: 乱数生成器（指定しない場合は新しく作成する）
+
+    Returns:
+        {キー: 新しいanswerIndex} の辞書（移動する問題のみ）
+    """
+    rng = rng or random.Random()
+    groups = defaultdict(lambda: [[] for _ in range(OPTION_COUNT)])
+    for key, stratum, answer_index in entries:
+        groups[stratum][answer_index].append(key)
+
+    moves = {}
+    for stratum in sorted(groups, key=repr):
+        by_index = groups[stratum]
+        targets = compute_targets([len(keys) for keys in by_index])
+        movers = []
+        free_slots = []
+        for index, keys in enumerate(by_index):
+            surplus = len(keys) - targets[index]
+            if surplus > 0:
+                movers.extend(rng.sample(keys, surplus))
+            elif surplus < 0:
+                free_slots.extend([index] * -surplus)
+        rng.shuffle(free_slots)
+        moves.update(zip(movers, free_slots))
+    return moves
+
+
+def move_answer(options: list, answer_index: int, new_index: int, rng: random.Random = None) -> list:
+    """正解の選択肢をnew_indexに移動し、他の選択肢をシャッフルした新しい選択肢のリストを返す"""
+    rng = rng or random
+    correct_answer = options[answer_index]
+    other_options = [option for i, option in enumerate(options) if i != answer_index]
+    rng.shuffle(other_options)
+    return other_options[:new_index] + [correct_answer] + other_options[new_index:]
+
+
+def distribution(answer_indices) -> list:
+    """answerIndexの分布（位置0〜OPTION_COUNT-1の問題数）"""
+    counts = Counter(answer_indices)
+    return [counts[index] for index in range(OPTION_COUNT)]
+
+
+def balance_answer_indices(questions: list, rng: random.Random = None) -> list:
+    """問題リストのanswerIndexを均等に分散させる（リスト全体を1つの層として扱う）
+
+    選択肢の順序を入れ替えて、正解のインデックスを均等に分散させます。
+    これにより、ユーザーが特定のインデックスに偏って正解を選ぶことを防ぎます。
+
+    Args:
+        questions: 問題のリスト
+        rng: 乱数生成器（指定しない場合は新しく作成する）
+
+    Returns:
+        answerIndexが均等に分散された問題のリスト（選択肢を入れ替えた問題はコピー）
+    """
+    if not questions:
+        return questions
+
+    rng = rng or random.Random()
+    entries = [
+        (position, None, question.get('answerIndex'))
+        for position, question in enumerate(questions)
+        if is_balanceable(question.get('options'), question.get('answerIndex'))
+    ]
+    moves = plan_balance(entries, rng)
+    balanced_questions = list(questions)
+    for position, new_index in moves.items():
+        question = questions[position]
+        balanced_question = question.copy()
+        balanced_question['options'] = move_answer(question['options'], question['answerIndex'], new_index, rng)
+        balanced_question['answerIndex'] = new_index
+        balanced_questions[position] = balanced_question
+    return balanced_questions
+
+
+def balance_database(db_path, strata=DEFAULT_STRATA, seed: int = None, dry_run: bool = False) -> dict:
+    """questionsテーブル全体を層ごとに均等化し、変更する行を1トランザクションでまとめて更新する
+
+    Returns:
+        {'total': 均等化の対象の問題数, 'skipped': 対象外の問題数, 'moved': 選択肢を入れ替えた問題数,
+         'before': 変更前の分布, 'after': 変更後の分布, 'strata': 層の数} の辞書
+    """
+    strata = list(strata)
+    unknown = [column for column in strata if column not in STRATUM_COLUMNS]
+    if unknown:
+        raise ValueError(f"層に指定できない列です: {', '.join(unknown)}")
+    rng = random.Random(seed)
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        columns = ', '.join(['id', 'options', 'answerIndex'] + strata)
+        rows = {}
+        entries = []
+        skipped = 0
+        for question_id, options, answer_index, *stratum in conn.execute(f'SELECT {columns} FROM questions'):
+            options = options.split(OPTIONS_SEPARATOR) if options else []
+            if not is_balanceable(options, answer_index):
+                skipped += 1
+                continue
+            rows[question_id] = (options, answer_index)
+            entries.append((question_id, tuple(stratum), answer_index))
+
+        moves = plan_balance(entries, rng)
+        updates = []
+        for question_id, new_index in moves.items():
+            options, answer_index = rows[question_id]
+            new_options = move_answer(options, answer_index, new_index, rng)
+            updates.append((OPTIONS_SEPARATOR.join(new_options), new_index, question_id))
+
+        if updates and not dry_run:
+            with conn:
+                for start in range(0, len(updates), UPDATE_BATCH_SIZE):
+                    conn.executemany(
+                        'UPDATE questions SET options = ?, answerIndex = ? WHERE id = ?',
+                        updates[start:start + UPDATE_BATCH_SIZE]
+                    )
+    finally:
+        conn.close()
+
+    after = {question_id: answer_index for question_id, (_, answer_index) in rows.items()}
+    after.update(moves)
+    return {
+        'total': len(rows),
+        'skipped': skipped,
+        'moved': len(moves),
+        'before': distribution(answer_index for _, answer_index in rows.values()),
+        'after': distribution(after.values()),
+        'strata': len({stratum for _, stratum, _ in entries}),
+    }
+
+
+def load_question_document(json_path) -> tuple:
+    """JSONファイルを読み込み、(ドキュメント全体, 問題のリスト) を返す
+
+    Weekly Recap形式（{"questions": [...]}）と通常形式（[...]）の両方に対応
+
+    Raises:
+        ValueError: 問題のリストを含まないJSONファイルの場合
+    """
+    with open(json_path, 'r', encoding='utf-8-sig') as f:
+        document = json.load(f)
+    if isinstance(document, dict) and isinstance(document.get('questions'), list):
+        return document, document['questions']
+    if isinstance(document, list):
+        return document, document
+    raise ValueError("問題のリスト、または{'questions': [...]}形式ではありません")
+
+
+def _question_fields(question: dict, strata: list) -> tuple:
+    return tuple(question.get(field) for field in strata)
+
+
+def balance_json_files(json_files: list, strata=DEFAULT_STRATA, seed: int = None,
+                       dry_run: bool = False, backup: bool = False, stratum_of=None, outputs: dict = None) -> dict:
+    """複数のJSONファイル全体を層ごとに均等化し、変更のあるファイルのみ書き換える
+
+    1回目の走査では各ファイルの問題を1問ずつ読み込み（iter_json_file_items）、answerIndexと層のみを記録する。
+    2回目の走査で変更のあるファイルのみを1ファイルずつ読み込んで、選択肢を入れ替えて書き込む
+    （同時にメモリに保持するのは1ファイル分のみ）。
+
+    Args:
+        json_files: JSONファイルのパスのリスト
+        strata: 層に使用する問題のフィールド名（stratum_ofを指定した場合は使用しない）
+        seed: 乱数のシード
+        dry_run: Trueの場合はファイルを書き換えない
+        backup: Trueの場合は入力ファイルを上書きする前に元のファイルを{ファイル名}.json.bakにコピーする
+        stratum_of: 問題のdictから層を返す関数（指定しない場合はstrataのフィールドの値）
+        outputs: {入力ファイルのパス: 出力ファイルのパス}（指定したファイルは入力ファイルを上書きしない）
+
+    Returns:
+        {'total', 'skipped', 'moved', 'before', 'after', 'strata'}（balance_databaseと同じ）に
+        'files': 書き換えたファイルのリスト、'errors': {ファイル: エラー} を加えた辞書
+    """
+    strata = list(strata)
+    stratum_of = stratum_of or (lambda question: _question_fields(question, strata))
+    outputs = {Path(source): Path(target) for source, target in (outputs or {}).items()}
+    rng = random.Random(seed)
+
+    entries = []
+    answer_indices = {}
+    errors = {}
+    skipped = 0
+    for file_index, json_file in enumerate(json_files):
+        file_entries = []
+        file_skipped = 0
+        try:
+            for position, question in enumerate(iter_json_file_items(json_file)):
+                if not isinstance(question, dict) or not is_balanceable(question.get('options'), question.get('answerIndex')):
+                    file_skipped += 1
+                    continue
+                file_entries.append(((file_index, position), stratum_of(question), question['answerIndex']))
+        except (OSError, ValueError) as e:
+            # 途中で読み込みに失敗したファイルは、読み込んだ問題も含めて対象にしない
+            errors[str(json_file)] = str(e)
+            continue
+        skipped += file_skipped
+        entries.extend(file_entries)
+        answer_indices.update((key, answer_index) for key, _, answer_index in file_entries)
+
+    moves = plan_balance(entries, rng)
+    moves_by_file = defaultdict(dict)
+    for (file_index, position), new_index in moves.items():
+        moves_by_file[file_index][position] = new_index
+
+    written = []
+    for file_index in sorted(moves_by_file):
+        json_path = Path(json_files[file_index])
+        output_path = outputs.get(json_path, json_path)
+        if dry_run:
+            written.append(output_path)
+            continue
+        document, questions = load_question_document(json_path)
+        for position, new_index in moves_by_file[file_index].items():
+            question = questions[position]
+            question['options'] = move_answer(question['options'], question['answerIndex'], new_index, rng)
+            question['answerIndex'] = new_index
+        if backup and output_path == json_path:
+            shutil.copyfile(json_path, json_path.with_suffix('.json.bak'))
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, output_path)
+        written.append(output_path)
+
+    after = dict(answer_indices)
+    after.update(moves)
+    return {
+        'total': len(answer_indices),
+        'skipped': skipped,
+        'moved': len(moves),
+        'before': distribution(answer_indices.values()),
+        'after': distribution(after.values()),
+        'strata': len({stratum for _, stratum, _ in entries}),
+        'files': written,
+        'errors': errors,
+    }
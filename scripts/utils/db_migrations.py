@@ -0,0 +1,228 @@
+"""questions.dbのスキーママイグレーション
+
+スキーマの変更（列・テーブル・インデックスの追加など）をバージョン番号付きの手順として
+MIGRATIONSに順番に定義し、未適用の手順だけを1トランザクションで既存のデータベースに適用する。
+スキーマを変更するときは、既存の手順を書き換えずにMIGRATIONSの末尾に手順を追加する。
+
+適用済みのバージョンはschema_migrationsテーブルに記録する。
+PRAGMA user_versionはアプリ（sqflite）が自身のスキーマバージョン管理に使用しており、
+同梱するデータベースで値を変えるとアプリ側のonCreate/onUpgradeの判定が変わるため使用しない。
+"""
+import sqlite3
+from datetime import datetime
+
+from utils.near_duplicates import compute_text_hash
+
+
+def get_table_columns(cursor, table: str) -> list:
+    """テーブルの列名のリストを返す（テーブルがない場合は空のリスト）"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def table_exists(cursor, table: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    return cursor.fetchone() is not None
+
+
+def add_column_if_missing(cursor, table: str, column: str, definition: str) -> bool:
+    """列がなければ追加し、追加した場合はTrueを返す
+
+    以前のバージョンのスクリプトで手動で追加された列がある場合も、そのまま適用できるようにする
+    """
+    if column in get_table_columns(cursor, table):
+        return False
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def split_tags(tags) -> list:
+    """カンマ区切りのタグ文字列（またはタグの配列）を、空白を除いたタグのリストに変換"""
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [tag.strip() for tag in tags if tag and tag.strip()]
+
+
+def refresh_sort_keys(cursor):
+    """全問題のsort_keyに [0, 1) の一様乱数を振り直す"""
+    # random()は64ビット符号付き整数の一様乱数
+    cursor.execute("UPDATE questions SET sort_key = random() / 18446744073709551616.0 + 0.5")
+
+
+def migrate_001_questions_table(cursor):
+    """questionsテーブル（Flutterアプリと同じスキーマ）と基本のインデックス"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            options TEXT NOT NULL,
+            answerIndex INTEGER NOT NULL,
+            explanation TEXT NOT NULL,
+            trivia TEXT,
+            category TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            tags TEXT NOT NULL
+        )
+    ''')
+    # 後から追加された列（古いデータベースには存在しない場合がある）
+    for column in ('reference_date', 'quiz_type', 'category_id', 'region', 'league', 'team', 'team_id', 'weekly_meta'):
+        add_column_if_missing(cursor, 'questions', column, 'TEXT')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_questions_category_difficulty
+        ON questions(category, difficulty)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_questions_tags
+        ON questions(tags)
+    ''')
+
+
+def migrate_002_source_file(cursor):
+    """問題の登録元JSONファイルを記録するsource_file列"""
+    add_column_if_missing(cursor, 'questions', 'source_file', 'TEXT')
+
+
+def migrate_003_sort_key(cursor):
+    """ランダム抽出用のsort_key列と、抽出条件＋sort_keyの複合インデックス
+
+    sort_keyには登録のたびに [0, 1) の一様乱数を振り直す（refresh_sort_keys）。
+    ORDER BY RANDOM() で条件に一致する全行を並べ替える代わりに、乱数の位置から
+    インデックスを範囲検索するだけでランダムな問題を取得できる。
+    """
+    if add_column_if_missing(cursor, 'questions', 'sort_key', 'REAL'):
+        refresh_sort_keys(cursor)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_questions_sampling
+        ON questions(category, difficulty, region, sort_key)
+    ''')
+
+
+def migrate_004_question_tags(cursor):
+    """タグの正規化テーブル（question_tags）
+
+    questions.tagsはカンマ区切りの文字列のため、LIKE検索ではインデックスが使えない。
+    (tag, question_id) を主キーとするWITHOUT ROWIDテーブルにすることで、
+    タグでの絞り込みがインデックスの範囲検索だけで完結する。
+    テーブルを新規に作成した場合は、既存の全問題からタグを登録する。
+    """
+    if not table_exists(cursor, 'question_tags'):
+        cursor.execute('''
+            CREATE TABLE question_tags (
+                tag TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                PRIMARY KEY (tag, question_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('SELECT id, tags FROM questions')
+        cursor.executemany(
+            'INSERT OR IGNORE INTO question_tags (tag, question_id) VALUES (?, ?)',
+            [(tag, question_id) for question_id, tags in cursor.fetchall() for tag in split_tags(tags)]
+        )
+    # 問題の更新・削除時にタグを差し替えるためのインデックス
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_question_tags_question_id
+        ON question_tags(question_id, tag)
+    ''')
+
+
+def migrate_005_ingest_manifest(cursor):
+    """登録済みJSONファイルの管理テーブル（ingest_manifest）
+
+    ファイルごとにサイズ・更新時刻・内容のハッシュと、登録した問題IDごとの行ハッシュを記録し、
+    再実行時に変更のないファイル・問題の書き込みを省略するために使用する
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            source_file TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            row_hashes TEXT NOT NULL,
+            ingested_at TEXT NOT NULL
+        )
+    ''')
+
+
+def migrate_006_text_hash(cursor):
+    """重複検出用のtext_hash列（正規化した問題文と選択肢のハッシュ）とインデックス
+
+    IDが異なっていても内容が同じ問題を、登録前にインデックスの検索だけで見つけるために使用する。
+    既存の問題のtext_hashもここで計算する。
+    """
+    add_column_if_missing(cursor, 'questions', 'text_hash', 'TEXT')
+    cursor.execute('SELECT id, text, options FROM questions')
+    cursor.executemany(
+        'UPDATE questions SET text_hash = ? WHERE id = ?',
+        [(compute_text_hash(text, options), question_id) for question_id, text, options in cursor.fetchall()]
+    )
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_questions_text_hash
+        ON questions(text_hash)
+    ''')
+
+
+# (バージョン, 説明, 適用する関数) のリスト（バージョンの昇順）
+MIGRATIONS = [
+    (1, 'questionsテーブルと基本インデックス', migrate_001_questions_table),
+    (2, 'source_file列', migrate_002_source_file),
+    (3, 'sort_key列とランダム抽出用インデックス', migrate_003_sort_key),
+    (4, 'question_tagsテーブル', migrate_004_question_tags),
+    (5, 'ingest_manifestテーブル', migrate_005_ingest_manifest),
+    (6, 'text_hash列と重複検出用インデックス', migrate_006_text_hash),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor) -> int:
+    """適用済みのスキーマバージョンを返す（未適用の場合は0）"""
+    if not table_exists(cursor, 'schema_migrations'):
+        return 0
+    cursor.execute("SELECT MAX(version) FROM schema_migrations")
+    return cursor.fetchone()[0] or 0
+
+
+def migrate_database(db_path: str, verbose: bool = True) -> int:
+    """未適用のマイグレーションを1トランザクションで適用し、適用後のバージョンを返す
+
+    途中でエラーが発生した場合はロールバックし、データベースは変更されない。
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        # 適用済みの場合は読み込みのみで終了（書き込みロックを取らない）
+        current_version = get_schema_version(cursor)
+        if current_version >= LATEST_VERSION:
+            return current_version
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 他のプロセスが先に適用した場合に備えて、ロック取得後に再確認する
+            current_version = get_schema_version(cursor)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TEXT NOT NULL
+                )
+            ''')
+            for version, description, migrate in MIGRATIONS:
+                if version <= current_version:
+                    continue
+                migrate(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat(timespec='seconds'))
+                )
+                if verbose:
+                    print(f"マイグレーションを適用しました: {version:03d} {description}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return LATEST_VERSION
+    finally:
+        conn.close()
@@ -1,145 +1,107 @@
-"""Gemini APIクライアント"""
+"""Gemini APIクライアント
+
+google-genaiの読み込みとAPIクライアントの作成は、最初にAPIを呼び出す時（get_client）まで行わない。
+レスポンスの解析・問題の検証など、APIを使わない処理はutils/weekly_questions.pyにある。
+"""
+import asyncio
 import json
-import re
+import threading
 import time
 import sys
 import random
 from pathlib import Path
-
-# サードパーティライブラリのインポート
-try:
-    from google import genai
-except ImportError:
-    print("エラー: google-genaiパッケージがインストールされていません。")
-    print("以下のコマンドでインストールしてください:")
-    print("  pip install google-genai")
-    sys.exit(1)
+from types import SimpleNamespace
 
 # scripts/ディレクトリをパスに追加
 scripts_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(scripts_dir))
 
-from config import GEMINI_API_KEY, GEMINI_MODEL_NAME
+from config import (
+    GEMINI_MODEL_NAME,
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE,
+    require_gemini_api_key,
+)
+from utils.json_stream import JsonArrayStreamParser
+from utils.rate_limiter import (
+    RateLimiter,
+    compute_backoff,
+    estimate_tokens,
+    get_response_token_count,
+    get_retry_after_seconds,
+    is_quota_error,
+)
+# レスポンスの解析・検証（validate_batch_questions等は従来どおりこのモジュールからもインポートできる）
+from utils.weekly_questions import (
+    BATCH_QUESTION_COUNT,
+    check_region_category_id,
+    extract_json_text,
+    load_questions_json,
+    print_json_element_errors,
+    validate_batch_question,
+    validate_batch_questions,
+    validate_category_question,
+    validate_category_questions,
+    validate_question_list,
+)
 
 # モデルを選択（config.pyから読み込み、デフォルト: gemini-3-pro-preview）
 MODEL_NAME = GEMINI_MODEL_NAME
 
-# APIクライアントを作成（モジュールレベルで初期化）
-client = genai.Client(api_key=GEMINI_API_KEY)
+# APIクライアント（get_clientの初回の呼び出し時に作成し、すべての呼び出しで共有する）
+_client = None
+_client_lock = threading.Lock()
 
 # リトライ設定
-MAX_RETRIES = 3  # 最大リトライ回数
+MAX_RETRIES = 3  # 最大リトライ回数（クォータ超過以外のエラー）
+MAX_QUOTA_RETRIES = 8  # クォータ超過（429）時の最大リトライ回数
 BASE_DELAY = 1  # ベース待機時間（秒）
+MAX_DELAY = 60  # バックオフの最大待機時間（秒）
+MAX_TOP_UP_ROUNDS = 2  # 問題数が不足した場合に、不足分のみを追加で生成する最大回数
 
+# 全呼び出し元（スレッド・asyncio）で共有するレートリミッター
+rate_limiter = RateLimiter(
+    requests_per_minute=GEMINI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=GEMINI_TOKENS_PER_MINUTE
+)
 
-def balance_answer_indices(questions: list) -> list:
-    """
-    問題リストのanswerIndexを均等に分散させる
-    
-    選択肢の順序をシャッフルして、正解のインデックスを均等に分散させます。
-    これにより、ユーザーが特定のインデックスに偏って正解を選ぶことを防ぎます。
-    
-    Args:
-        questions: 問題のリスト
-    
-    Returns:
-        answerIndexが均等に分散された問題のリスト
-    """
-    if not questions:
-        return questions
-    
-    # 各インデックスの目標数を計算
-    total = len(questions)
-    target_per_index = total // 4
-    remainder = total % 4
-    
-    # 各インデックスの目標数を設定（余りは0,1,2,3に順に分配）
-    targets = [target_per_index] * 4
-    for i in range(remainder):
-        targets[i] += 1
-    
-    # 現在の分布を確認
-    current_counts = [0, 0, 0, 0]
-    for q in questions:
-        idx = q.get('answerIndex', 0)
-        if 0 <= idx <= 3:
-            current_counts[idx] += 1
-    
-    # 各問題について、必要に応じて選択肢をシャッフル
-    balanced_questions = []
-    new_counts = [0, 0, 0, 0]
-    
-    for question in questions:
-        original_index = question.get('answerIndex', 0)
-        if not (0 <= original_index <= 3):
-            original_index = 0
-        
-        # 現在の分布と目標分布を比較して、どのインデックスに割り当てるか決定
-        # 最も不足しているインデックスを優先的に使用
-        best_index = 0
-        min_ratio = float('inf')
-        for idx in range(4):
-            if new_counts[idx] < targets[idx]:
-                # 目標に対する現在の割合を計算
-                ratio = new_counts[idx] / targets[idx] if targets[idx] > 0 else 0
-                if ratio < min_ratio:
-                    min_ratio = ratio
-                    best_index = idx
-        
-        # 選択肢をシャッフルして、正解を指定されたインデックスに移動
-        options = question.get('options', [])
-        if len(options) == 4:
-            # 正解の選択肢を取得
-            correct_answer = options[original_index]
-            
-            # 選択肢をシャッフル（正解は除く）
-            other_options = [opt for i, opt in enumerate(options) if i != original_index]
-            random.shuffle(other_options)
-            
-            # 正解を指定されたインデックスに配置
-            new_options = other_options[:best_index] + [correct_answer] + other_options[best_index:]
-            
-            # 問題を更新
-            balanced_question = question.copy()
-            balanced_question['options'] = new_options
-            balanced_question['answerIndex'] = best_index
-            balanced_questions.append(balanced_question)
-            new_counts[best_index] += 1
-        else:
-            # 選択肢が4つでない場合はそのまま追加
-            balanced_questions.append(question)
-            if 0 <= original_index <= 3:
-                new_counts[original_index] += 1
-    
-    return balanced_questions
+# レスポンスキャッシュ（configure_response_cacheで設定、Noneの場合は使用しない）
+_response_cache = None
+_cache_refresh = False  # Trueの場合はキャッシュを読まずに上書きする
 
 
-def generate_weekly_recap_questions_batch(
-    region: str,
-    reference_date: str,
-    matchweek: int = None,
-    publish_date: str = None,
-    expiry_date: str = None,
-    season: str = None,
-    start_number: int = 1
-) -> list:
-    """
-    Grounding機能を使用して最新のサッカー情報を取得し、weeklyクイズ問題を30問一括生成
+def get_client():
+    """共有のAPIクライアントを取得（初回の呼び出し時にgoogle-genaiを読み込んで作成する）
     
-    Args:
-        region: "japan" または "world"
-        reference_date: 参照日（YYYY-MM-DD形式、例: "2026-02-07"）
-        matchweek: 節数（オプション、該当しない場合はNone）
-        publish_date: 公開日（YYYY-MM-DD形式、例: "2026-02-10"）
-        expiry_date: 有効期限（YYYY-MM-DD形式、例: "2026-02-16"）
-        season: シーズン（年、例: "2026"）
-        start_number: IDの開始番号（デフォルト: 1）
+    このモジュールのインポート時にはgoogle-genaiの読み込みやAPIキーの確認を行わないため、
+    キャッシュやFakeTransportのみを使う場合はAPIキーがなくても動作する。
     
-    Returns:
-        生成された問題のリスト（30問）
+    Raises:
+        ImportError: google-genaiパッケージがインストールされていない場合
+        ValueError: GEMINI_API_KEYが設定されていない場合
     """
-    # プロンプトテンプレート
-    prompt_template = """# Weekly サッカークイズ生成プロンプト
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    from google import genai
+                except ImportError as e:
+                    raise ImportError(
+                        "google-genaiパッケージがインストールされていません。"
+                        "以下のコマンドでインストールしてください: pip install google-genai"
+                    ) from e
+                _client = genai.Client(api_key=require_gemini_api_key())
+    return _client
+
+
+# Grounding機能（google_searchツール）を有効化した生成設定
+GROUNDING_CONFIG = {
+    "tools": [{"google_search": {}}],
+}
+
+# 30問一括生成用のプロンプトテンプレート
+BATCH_PROMPT_TEMPLATE = """# Weekly サッカークイズ生成プロンプト
 
 あなたはサッカークイズの問題作成の専門家です。
 最新のサッカー情報をWeb検索で収集し、以下のルールとフォーマットに従ってweeklyクイズ問題を30問作成してください。
@@ -335,239 +297,10 @@ def generate_weekly_recap_questions_batch(
 5. 問題を作成し、事実確認のため再度検索して裏取りする
 6. JSON配列のみを出力する
 """
-    
-    # matchweekの文字列表現（プロンプト用）
-    matchweek_str = str(matchweek) if matchweek is not None else "null"
-    
-    # matchweekの例（JSONスキーマ用）
-    matchweek_example = matchweek if matchweek is not None else "null"
-    
-    # categoryIdの例（JSONスキーマ用）
-    if region == "japan":
-        category_id_example = "weekly-jp-match"
-    else:  # world
-        category_id_example = "weekly-world-match"
-    
-    # startNumberを5桁ゼロ埋め形式に変換
-    start_number_str = f"{start_number:05d}"
-    
-    # プロンプトにパラメータを埋め込む
-    prompt = prompt_template.format(
-        region=region,
-        referenceDate=reference_date,
-        matchweek=matchweek_str,
-        matchweekExample=matchweek_example,
-        publishDate=publish_date or "",
-        expiryDate=expiry_date or "",
-        season=season or "",
-        startNumber=start_number_str,
-        category_id_example=category_id_example
-    )
-    
-    # リトライロジック付きでAPI呼び出し
-    for attempt in range(MAX_RETRIES):
-        try:
-            # 新しいAPIを使用（google_searchツールを有効化）
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=prompt,
-                config={
-                    "tools": [{"google_search": {}}],  # Grounding機能を有効化
-                }
-            )
-            
-            # レスポンスからJSONを抽出
-            response_text = response.text.strip()
-            
-            # マークダウンコードブロックからJSONを抽出
-            # ```json ... ``` の形式を探す
-            json_match = re.search(r'```json\s*\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                # JSONブロックが見つかった場合
-                response_text = json_match.group(1).strip()
-            else:
-                # JSONブロックが見つからない場合、通常の``` ... ```を探す
-                json_match = re.search(r'```\s*\n(.*?)\n```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    # コードブロックがない場合、JSON配列の開始位置を探す
-                    json_start = response_text.find('[')
-                    json_end = response_text.rfind(']') + 1
-                    if json_start != -1 and json_end > json_start:
-                        response_text = response_text[json_start:json_end]
-                    else:
-                        # それでも見つからない場合は、説明文を除去してから試す
-                        # 最初の[から最後の]までを抽出
-                        if '[' in response_text:
-                            response_text = response_text[response_text.find('['):]
-                            if ']' in response_text:
-                                response_text = response_text[:response_text.rfind(']') + 1]
-            
-            # JSON配列をパース
-            questions_data = json.loads(response_text)
-            
-            # リストでない場合はリストに変換
-            if not isinstance(questions_data, list):
-                questions_data = [questions_data]
-            
-            # 問題数の確認（30問期待）
-            expected_count = 30
-            if len(questions_data) < expected_count:
-                print(f"警告: 要求された{expected_count}問に対して{len(questions_data)}問しか生成されませんでした")
-            
-            # 各問題のバリデーションとフィールド補完
-            validated_questions = []
-            for i, question_data in enumerate(questions_data[:expected_count]):
-                # 必須フィールドの検証
-                required_fields = ['text', 'options', 'answerIndex', 'explanation', 'quizType', 'region', 'categoryId', 'referenceDate', 'weeklyMeta']
-                missing_fields = [f for f in required_fields if f not in question_data]
-                if missing_fields:
-                    print(f"警告: 問題{i+1}に必須フィールドがありません: {missing_fields}。スキップします。")
-                    continue
-                
-                # 選択肢が4つあるか確認
-                if len(question_data.get('options', [])) != 4:
-                    print(f"警告: 問題{i+1}の選択肢が4つではありません。スキップします。")
-                    continue
-                
-                # answerIndexが0であることを確認（プロンプトで0に固定）
-                if question_data.get('answerIndex', -1) != 0:
-                    print(f"警告: 問題{i+1}のanswerIndexが0ではありません。0に修正します。")
-                    question_data['answerIndex'] = 0
-                
-                # quizTypeが"weekly"であることを確認
-                if question_data.get('quizType') != 'weekly':
-                    print(f"警告: 問題{i+1}のquizTypeが'weekly'ではありません。修正します。")
-                    question_data['quizType'] = 'weekly'
-                
-                # regionが正しいことを確認
-                if question_data.get('region') != region:
-                    print(f"警告: 問題{i+1}のregionが'{region}'ではありません。修正します。")
-                    question_data['region'] = region
-                
-                # tagsが配列形式であることを確認（文字列の場合は分割）
-                tags_value = question_data.get('tags', [])
-                if isinstance(tags_value, str):
-                    # カンマ区切りの文字列を配列に変換
-                    question_data['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()]
-                elif not isinstance(tags_value, list):
-                    question_data['tags'] = []
-                
-                # teamとteamIdは常にnull
-                question_data['team'] = None
-                question_data['teamId'] = None
-                
-                # referenceDateが正しいことを確認
-                if question_data.get('referenceDate') != reference_date:
-                    print(f"警告: 問題{i+1}のreferenceDateが'{reference_date}'ではありません。修正します。")
-                    question_data['referenceDate'] = reference_date
-                
-                # weeklyMetaの検証と補完
-                weekly_meta = question_data.get('weeklyMeta', {})
-                if not isinstance(weekly_meta, dict):
-                    weekly_meta = {}
-                
-                # weeklyMetaの必須フィールドを補完
-                weekly_meta.setdefault('matchweek', matchweek)
-                weekly_meta.setdefault('matchDate', None)
-                weekly_meta.setdefault('publishDate', publish_date)
-                weekly_meta.setdefault('expiryDate', expiry_date)
-                weekly_meta.setdefault('season', season)
-                question_data['weeklyMeta'] = weekly_meta
-                
-                # デフォルト値の設定
-                question_data.setdefault('difficulty', 'normal')
-                question_data.setdefault('category', 'match_recap')
-                question_data.setdefault('trivia', '')
-                question_data.setdefault('league', None)
-                
-                validated_questions.append(question_data)
-            
-            if len(validated_questions) == 0:
-                raise ValueError("有効な問題が1問も生成されませんでした")
-            
-            print(f"成功: {len(validated_questions)}問を生成しました")
-            return validated_questions
-        
-        except json.JSONDecodeError as e:
-            print(f"JSON解析エラー: {e}")
-            print(f"レスポンス（最初の500文字）: {response_text[:500]}")
-            if attempt < MAX_RETRIES - 1:
-                print(f"{BASE_DELAY * (attempt + 1)}秒待機して再試行します...")
-                time.sleep(BASE_DELAY * (attempt + 1))
-                continue
-            raise
-        
-        except Exception as e:
-            error_str = str(e)
-            
-            # クォータ超過エラー（429）の場合
-            if '429' in error_str or 'quota' in error_str.lower() or 'Quota exceeded' in error_str:
-                retry_delay = BASE_DELAY * (2 ** attempt)
-                if attempt < MAX_RETRIES - 1:
-                    print(f"クォータ制限に達しました。{retry_delay:.1f}秒待機して再試行します... (試行 {attempt + 1}/{MAX_RETRIES})")
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    print(f"エラー: クォータ制限に達しました。しばらく待ってから再実行してください。")
-                    raise Exception(f"APIクォータ制限: {error_str}")
-            
-            # その他のエラー
-            if attempt < MAX_RETRIES - 1:
-                print(f"エラーが発生しました: {e}")
-                print(f"{BASE_DELAY * (attempt + 1)}秒待機して再試行します...")
-                time.sleep(BASE_DELAY * (attempt + 1))
-                continue
-            raise
-    
-    # すべてのリトライが失敗した場合
-    raise Exception("問題生成に失敗しました（最大リトライ回数に達しました）")
 
 
-def generate_weekly_recap_questions_by_category(
-    region: str,
-    category_id: str,
-    category_name: str,
-    question_count: int,
-    reference_date: str,
-    matchweek: int = None,
-    publish_date: str = None,
-    expiry_date: str = None,
-    season: str = None,
-    start_number: int = 1
-) -> list:
-    """
-    カテゴリごとにWeekly Recap問題を生成
-    
-    Args:
-        region: "japan" または "world"
-        category_id: カテゴリID（例: "weekly-jp-match", "weekly-world-japanese"）
-        category_name: カテゴリ名（例: "試合・結果", "海外日本人選手"）
-        question_count: 生成する問題数
-        reference_date: 参照日（YYYY-MM-DD形式）
-        matchweek: 節数（オプション）
-        publish_date: 公開日（YYYY-MM-DD形式）
-        expiry_date: 有効期限（YYYY-MM-DD形式）
-        season: シーズン
-        start_number: IDの開始番号
-    
-    Returns:
-        生成された問題のリスト
-    """
-    # regionとcategoryIdの整合性チェック
-    if region == "japan" and not category_id.startswith("weekly-jp-"):
-        raise ValueError(f"region='japan'の場合、categoryIdは'weekly-jp-*'で始まる必要があります。現在の値: {category_id}")
-    if region == "world" and not category_id.startswith("weekly-world-"):
-        raise ValueError(f"region='world'の場合、categoryIdは'weekly-world-*'で始まる必要があります。現在の値: {category_id}")
-    
-    # 難易度の配分を計算
-    easy_count = max(1, int(question_count * 0.4))  # 40%
-    normal_count = max(1, int(question_count * 0.4))  # 40%
-    hard_count = question_count - easy_count - normal_count  # 残り
-    
-    # プロンプトテンプレート
-    prompt_template = """# Weekly サッカークイズ生成プロンプト（カテゴリ別）
+# カテゴリ別生成用のプロンプトテンプレート
+CATEGORY_PROMPT_TEMPLATE = """# Weekly サッカークイズ生成プロンプト（カテゴリ別）
 
 あなたはサッカークイズの問題作成の専門家です。
 最新のサッカー情報をWeb検索で収集し、以下のルールとフォーマットに従ってweeklyクイズ問題を{questionCount}問作成してください。
@@ -716,6 +449,80 @@ def generate_weekly_recap_questions_by_category(
 4. 問題を作成し、事実確認のため再度検索して裏取りする
 5. JSON配列のみを出力する
 """
+
+
+# 不足分のみを追加で生成する際に、元のプロンプトの末尾に付け加える指示
+TOP_UP_INSTRUCTION_TEMPLATE = """
+
+---
+
+## 追加作成の指示（最優先）
+
+上記のルールで作成した問題のうち、以下の{existingCount}問はすでに作成済みです。
+これらと内容が重複しない問題を**{missingCount}問だけ**追加で作成し、同じJSON配列形式で出力してください。
+idは w_{startNumber} から連番で採番してください。
+
+作成済みの問題:
+{existingTexts}
+"""
+
+
+def build_batch_prompt(
+    region: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1
+) -> str:
+    """30問一括生成用のプロンプトを作成"""
+    # matchweekの文字列表現（プロンプト用）
+    matchweek_str = str(matchweek) if matchweek is not None else "null"
+    
+    # matchweekの例（JSONスキーマ用）
+    matchweek_example = matchweek if matchweek is not None else "null"
+    
+    # categoryIdの例（JSONスキーマ用）
+    if region == "japan":
+        category_id_example = "weekly-jp-match"
+    else:  # world
+        category_id_example = "weekly-world-match"
+    
+    # startNumberを5桁ゼロ埋め形式に変換
+    start_number_str = f"{start_number:05d}"
+    
+    # プロンプトにパラメータを埋め込む
+    return BATCH_PROMPT_TEMPLATE.format(
+        region=region,
+        referenceDate=reference_date,
+        matchweek=matchweek_str,
+        matchweekExample=matchweek_example,
+        publishDate=publish_date or "",
+        expiryDate=expiry_date or "",
+        season=season or "",
+        startNumber=start_number_str,
+        category_id_example=category_id_example
+    )
+
+
+def build_category_prompt(
+    region: str,
+    category_id: str,
+    category_name: str,
+    question_count: int,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1
+) -> str:
+    """カテゴリ別生成用のプロンプトを作成"""
+    # 難易度の配分を計算
+    easy_count = max(1, int(question_count * 0.4))  # 40%
+    normal_count = max(1, int(question_count * 0.4))  # 40%
+    hard_count = question_count - easy_count - normal_count  # 残り
     
     # matchweekの文字列表現（プロンプト用）
     matchweek_str = str(matchweek) if matchweek is not None else "null"
@@ -728,7 +535,7 @@ def generate_weekly_recap_questions_by_category(
     start_number_plus1_str = f"{start_number + 1:05d}"
     
     # プロンプトにパラメータを埋め込む
-    prompt = prompt_template.format(
+    return CATEGORY_PROMPT_TEMPLATE.format(
         region=region,
         categoryId=category_id,
         categoryName=category_name,
@@ -745,166 +552,607 @@ def generate_weekly_recap_questions_by_category(
         normalCount=normal_count,
         hardCount=hard_count
     )
+
+
+def _handle_generation_error(error: Exception, json_text: str, retry_counts: dict) -> float:
+    """生成エラーのログを出力し、再試行する場合は待機秒数を返す
+    
+    クォータ超過の場合はサーバー指定の待機時間（なければジッター付き指数バックオフ）だけ
+    共有のレートリミッターを停止し、他の呼び出し元も同じタイミングで待機させる。
+    再試行しない場合（最大リトライ回数に達した場合）は例外を送出する
+    
+    Args:
+        retry_counts: エラー種別ごとの失敗回数（{'quota': int, 'other': int}、この関数で更新）
+    
+    Returns:
+        この呼び出し元だけが待機する秒数（クォータ超過の場合はレートリミッター側で待機するため0）
+    """
+    if is_quota_error(error):
+        attempt = retry_counts['quota']
+        retry_counts['quota'] += 1
+        if retry_counts['quota'] >= MAX_QUOTA_RETRIES:
+            print(f"エラー: クォータ制限に達しました。しばらく待ってから再実行してください。")
+            raise Exception(f"APIクォータ制限: {error}")
+        retry_after = get_retry_after_seconds(error)
+        if retry_after is None:
+            retry_delay = compute_backoff(attempt, BASE_DELAY, MAX_DELAY)
+        else:
+            # サーバー指定の待機時間に少しだけジッターを加える
+            retry_delay = retry_after + random.uniform(0, BASE_DELAY)
+        print(f"クォータ制限に達しました。{retry_delay:.1f}秒待機して再試行します... (試行 {retry_counts['quota']}/{MAX_QUOTA_RETRIES})")
+        rate_limiter.pause(retry_delay)
+        return 0.0
+    
+    attempt = retry_counts['other']
+    retry_counts['other'] += 1
+    is_last_attempt = retry_counts['other'] >= MAX_RETRIES
+    retry_delay = compute_backoff(attempt + 1, BASE_DELAY, MAX_DELAY)
+    
+    if isinstance(error, json.JSONDecodeError):
+        print(f"JSON解析エラー: {error}")
+        print(f"レスポンス（最初の500文字）: {(json_text or error.doc)[:500]}")
+    elif not is_last_attempt:
+        print(f"エラーが発生しました: {error}")
+    
+    if is_last_attempt:
+        raise error
+    print(f"{retry_delay:.1f}秒待機して再試行します...")
+    return retry_delay
+
+
+def configure_response_cache(cache, refresh: bool = False):
+    """レスポンスキャッシュを設定
+    
+    Args:
+        cache: ResponseCacheのインスタンス（Noneの場合はキャッシュを使用しない）
+        refresh: Trueの場合は既存のキャッシュを読まず、新しいレスポンスで上書きする
+    """
+    global _response_cache, _cache_refresh
+    _response_cache = cache
+    _cache_refresh = refresh
+
+
+def _load_from_cache(prompt: str, validate) -> tuple:
+    """キャッシュ済みのレスポンスがあれば検証済みの問題リストを返す
+    
+    Returns:
+        (キャッシュキー, 問題リスト) のタプル
+        （キャッシュ未使用時のキーはNone、キャッシュがない場合の問題リストはNone）
+    """
+    if _response_cache is None:
+        return None, None
+    
+    cache_key = _response_cache.make_key(MODEL_NAME, prompt, GROUNDING_CONFIG)
+    if _cache_refresh:
+        return cache_key, None
+    
+    cached_text = _response_cache.get(cache_key)
+    if cached_text is None:
+        return cache_key, None
+    
+    try:
+        questions = validate(load_questions_json(extract_json_text(cached_text), cached_text))
+    except Exception as e:
+        print(f"警告: キャッシュされたレスポンスを利用できませんでした: {e}")
+        return cache_key, None
+    print(f"キャッシュを使用しました（キー: {cache_key[:12]}）")
+    return cache_key, questions
+
+
+def _store_in_cache(cache_key: str, response_text: str):
+    """検証に成功したレスポンスをキャッシュに保存"""
+    if _response_cache is None or cache_key is None:
+        return
+    try:
+        _response_cache.set(cache_key, response_text, model=MODEL_NAME)
+    except OSError as e:
+        print(f"警告: レスポンスのキャッシュ保存に失敗しました: {e}")
+
+
+def _collect_streamed_item(item, index: int, validate_item, collected: list):
+    """ストリーミングで完成した要素を検証し、有効なものをcollectedに追加"""
+    question = validate_item(item, index)
+    if question is not None:
+        collected.append(question)
+
+
+def _finish_stream(parser: JsonArrayStreamParser, received: list, collected: list) -> str:
+    """ストリーミング終了時の確認を行い、キャッシュ用のJSON文字列を返す"""
+    print_json_element_errors(parser.errors)
+    if not parser.started:
+        response_text = ''.join(received)
+        raise json.JSONDecodeError("レスポンスにJSON配列が見つかりません", response_text, 0)
+    # 早期終了した場合も再利用できるよう、検証済みの問題をJSON配列としてキャッシュする
+    return json.dumps(collected, ensure_ascii=False)
+
+
+def _stream_questions(prompt: str, validate_item, max_items: int, estimated_tokens: int) -> tuple[str, list]:
+    """ストリーミング生成で問題を逐次パース・検証し、max_items問そろった時点で打ち切る
+    
+    Returns:
+        (キャッシュ用のJSON文字列, 検証済みの問題リスト) のタプル
+    """
+    parser = JsonArrayStreamParser()
+    received = []
+    collected = []
+    index = 0
+    token_count = None
+    stream = get_client().models.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=GROUNDING_CONFIG
+    )
+    try:
+        for chunk in stream:
+            text = chunk.text or ''
+            received.append(text)
+            token_count = get_response_token_count(chunk) or token_count
+            for item in parser.feed(text):
+                _collect_streamed_item(item, index, validate_item, collected)
+                index += 1
+                if len(collected) >= max_items:
+                    break
+            if len(collected) >= max_items or parser.finished:
+                break
+    finally:
+        # 早期終了時はストリームを閉じて残りの受信を止める
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+    rate_limiter.record_usage(estimated_tokens, token_count)
+    return _finish_stream(parser, received, collected), collected
+
+
+async def _stream_questions_async(prompt: str, validate_item, max_items: int, estimated_tokens: int, transport) -> tuple[str, list]:
+    """_stream_questionsの非同期版"""
+    parser = JsonArrayStreamParser()
+    received = []
+    collected = []
+    index = 0
+    token_count = None
+    stream = await transport.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=GROUNDING_CONFIG
+    )
+    try:
+        async for chunk in stream:
+            text = chunk.text or ''
+            received.append(text)
+            token_count = get_response_token_count(chunk) or token_count
+            for item in parser.feed(text):
+                _collect_streamed_item(item, index, validate_item, collected)
+                index += 1
+                if len(collected) >= max_items:
+                    break
+            if len(collected) >= max_items or parser.finished:
+                break
+    finally:
+        aclose = getattr(stream, 'aclose', None)
+        if aclose is not None:
+            await aclose()
+    rate_limiter.record_usage(estimated_tokens, token_count)
+    return _finish_stream(parser, received, collected), collected
+
+
+def _generate_with_retry(
+    prompt: str,
+    validate,
+    failure_message: str,
+    validate_item=None,
+    max_items: int = None,
+    stream: bool = False
+) -> list:
+    """リトライロジック付きでAPIを呼び出し、検証済みの問題リストを返す
     
-    # リトライロジック付きでAPI呼び出し
-    for attempt in range(MAX_RETRIES):
+    Args:
+        prompt: 送信するプロンプト
+        validate: パース済みの問題データのリストを受け取り、検証済みリストを返す関数
+        failure_message: すべてのリトライが失敗した場合のエラーメッセージ
+        validate_item: 1問ずつ検証する関数（ストリーミング時に使用）
+        max_items: ストリーミング時に打ち切る問題数
+        stream: Trueの場合はストリーミング生成を使用する
+    """
+    cache_key, cached_questions = _load_from_cache(prompt, validate)
+    if cached_questions is not None:
+        return cached_questions
+    
+    estimated_tokens = estimate_tokens(prompt)
+    retry_counts = {'quota': 0, 'other': 0}
+    for _ in range(MAX_RETRIES + MAX_QUOTA_RETRIES):
+        json_text = ''
         try:
-            # 新しいAPIを使用（google_searchツールを有効化）
-            response = client.models.generate_content(
-                model=MODEL_NAME,
-                contents=prompt,
-                config={
-                    "tools": [{"google_search": {}}],  # Grounding機能を有効化
-                }
-            )
-            
-            # レスポンスからJSONを抽出
-            response_text = response.text.strip()
-            
-            # マークダウンコードブロックからJSONを抽出
-            json_match = re.search(r'```json\s*\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1).strip()
+            rate_limiter.acquire(estimated_tokens)
+            if stream:
+                response_text, questions_data = _stream_questions(
+                    prompt, validate_item, max_items, estimated_tokens
+                )
+            else:
+                response = get_client().models.generate_content(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=GROUNDING_CONFIG
+                )
+                rate_limiter.record_usage(estimated_tokens, get_response_token_count(response))
+                response_text = response.text
+                json_text = extract_json_text(response_text)
+                questions_data = load_questions_json(json_text, response_text)
+            questions = validate(questions_data)
+            _store_in_cache(cache_key, response_text)
+            return questions
+        except Exception as e:
+            retry_delay = _handle_generation_error(e, json_text, retry_counts)
+            time.sleep(retry_delay)
+    
+    # すべてのリトライが失敗した場合
+    raise Exception(failure_message)
+
+
+async def _generate_with_retry_async(
+    prompt: str,
+    validate,
+    failure_message: str,
+    transport=None,
+    validate_item=None,
+    max_items: int = None,
+    stream: bool = False
+) -> list:
+    """_generate_with_retryの非同期版
+    
+    Args:
+        transport: generate_content(model=, contents=, config=) をawaitできるオブジェクト
+                   （指定しない場合は共有の非同期クライアントを使用）
+    """
+    cache_key, cached_questions = _load_from_cache(prompt, validate)
+    if cached_questions is not None:
+        return cached_questions
+    
+    transport = transport or get_async_transport()
+    estimated_tokens = estimate_tokens(prompt)
+    retry_counts = {'quota': 0, 'other': 0}
+    for _ in range(MAX_RETRIES + MAX_QUOTA_RETRIES):
+        json_text = ''
+        try:
+            await rate_limiter.acquire_async(estimated_tokens)
+            if stream:
+                response_text, questions_data = await _stream_questions_async(
+                    prompt, validate_item, max_items, estimated_tokens, transport
+                )
             else:
-                json_match = re.search(r'```\s*\n(.*?)\n```', response_text, re.DOTALL)
-                if json_match:
-                    response_text = json_match.group(1).strip()
-                else:
-                    json_start = response_text.find('[')
-                    json_end = response_text.rfind(']') + 1
-                    if json_start != -1 and json_end > json_start:
-                        response_text = response_text[json_start:json_end]
-                    else:
-                        if '[' in response_text:
-                            response_text = response_text[response_text.find('['):]
-                            if ']' in response_text:
-                                response_text = response_text[:response_text.rfind(']') + 1]
-            
-            # JSON配列をパース
-            questions_data = json.loads(response_text)
-            
-            # リストでない場合はリストに変換
-            if not isinstance(questions_data, list):
-                questions_data = [questions_data]
-            
-            # 問題数の確認
-            if len(questions_data) < question_count:
-                print(f"警告: 要求された{question_count}問に対して{len(questions_data)}問しか生成されませんでした")
-            
-            # 各問題のバリデーションとフィールド補完
-            validated_questions = []
-            for i, question_data in enumerate(questions_data[:question_count]):
-                # 必須フィールドの検証
-                required_fields = ['text', 'options', 'answerIndex', 'explanation', 'quizType', 'region', 'categoryId', 'referenceDate', 'weeklyMeta']
-                missing_fields = [f for f in required_fields if f not in question_data]
-                if missing_fields:
-                    print(f"警告: 問題{i+1}に必須フィールドがありません: {missing_fields}。スキップします。")
-                    continue
-                
-                # 選択肢が4つあるか確認
-                if len(question_data.get('options', [])) != 4:
-                    print(f"警告: 問題{i+1}の選択肢が4つではありません。スキップします。")
-                    continue
-                
-                # answerIndexが0であることを確認
-                if question_data.get('answerIndex', -1) != 0:
-                    print(f"警告: 問題{i+1}のanswerIndexが0ではありません。0に修正します。")
-                    question_data['answerIndex'] = 0
-                
-                # quizTypeが"weekly"であることを確認
-                if question_data.get('quizType') != 'weekly':
-                    print(f"警告: 問題{i+1}のquizTypeが'weekly'ではありません。修正します。")
-                    question_data['quizType'] = 'weekly'
-                
-                # regionが正しいことを確認
-                if question_data.get('region') != region:
-                    print(f"警告: 問題{i+1}のregionが'{region}'ではありません。修正します。")
-                    question_data['region'] = region
-                
-                # categoryIdが正しいことを確認
-                if question_data.get('categoryId') != category_id:
-                    print(f"警告: 問題{i+1}のcategoryIdが'{category_id}'ではありません。修正します。")
-                    question_data['categoryId'] = category_id
-                
-                # regionとcategoryIdの整合性をチェック
-                question_region = question_data.get('region', '')
-                question_category_id = question_data.get('categoryId', '')
-                if question_region == "japan" and not question_category_id.startswith("weekly-jp-"):
-                    print(f"エラー: 問題{i+1}でregion='japan'なのにcategoryId='{question_category_id}'です。スキップします。")
-                    continue
-                if question_region == "world" and not question_category_id.startswith("weekly-world-"):
-                    print(f"エラー: 問題{i+1}でregion='world'なのにcategoryId='{question_category_id}'です。スキップします。")
-                    continue
-                
-                # tagsが配列形式であることを確認（文字列の場合は分割）
-                tags_value = question_data.get('tags', [])
-                if isinstance(tags_value, str):
-                    question_data['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()]
-                elif not isinstance(tags_value, list):
-                    question_data['tags'] = []
-                
-                # teamとteamIdは常にnull
-                question_data['team'] = None
-                question_data['teamId'] = None
-                
-                # referenceDateが正しいことを確認
-                if question_data.get('referenceDate') != reference_date:
-                    print(f"警告: 問題{i+1}のreferenceDateが'{reference_date}'ではありません。修正します。")
-                    question_data['referenceDate'] = reference_date
-                
-                # weeklyMetaの検証と補完
-                weekly_meta = question_data.get('weeklyMeta', {})
-                if not isinstance(weekly_meta, dict):
-                    weekly_meta = {}
-                
-                weekly_meta.setdefault('matchweek', matchweek)
-                weekly_meta.setdefault('matchDate', None)
-                weekly_meta.setdefault('publishDate', publish_date)
-                weekly_meta.setdefault('expiryDate', expiry_date)
-                weekly_meta.setdefault('season', season)
-                question_data['weeklyMeta'] = weekly_meta
-                
-                # デフォルト値の設定
-                question_data.setdefault('difficulty', 'normal')
-                question_data.setdefault('category', category_name)
-                question_data.setdefault('trivia', '')
-                question_data.setdefault('league', None)
-                
-                validated_questions.append(question_data)
-            
-            if len(validated_questions) == 0:
-                raise ValueError(f"有効な問題が1問も生成されませんでした（カテゴリ: {category_id}）")
-            
-            print(f"成功: {len(validated_questions)}問を生成しました（カテゴリ: {category_id}）")
-            return validated_questions
+                response = await transport.generate_content(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=GROUNDING_CONFIG
+                )
+                rate_limiter.record_usage(estimated_tokens, get_response_token_count(response))
+                response_text = response.text
+                json_text = extract_json_text(response_text)
+                questions_data = load_questions_json(json_text, response_text)
+            questions = validate(questions_data)
+            _store_in_cache(cache_key, response_text)
+            return questions
+        except Exception as e:
+            retry_delay = _handle_generation_error(e, json_text, retry_counts)
+            await asyncio.sleep(retry_delay)
+    
+    raise Exception(failure_message)
+
+
+def build_top_up_prompt(prompt: str, questions: list, missing_count: int, start_number: int) -> str:
+    """作成済みの問題を除いた不足分のみを生成するプロンプトを作成"""
+    existing_texts = "\n".join(f"- {q.get('text', '')}" for q in questions)
+    return prompt + TOP_UP_INSTRUCTION_TEMPLATE.format(
+        existingCount=len(questions),
+        missingCount=missing_count,
+        startNumber=f"{start_number + len(questions):05d}",
+        existingTexts=existing_texts
+    )
+
+
+def _merge_top_up_questions(questions: list, extra_questions: list, missing_count: int):
+    """追加生成した問題のうち、作成済みの問題と本文が重複しないものをquestionsに追加"""
+    existing_texts = {q.get('text') for q in questions}
+    added = 0
+    for q in extra_questions:
+        if added >= missing_count:
+            break
+        if q.get('text') in existing_texts:
+            print(f"警告: 追加生成した問題が作成済みの問題と重複しています。スキップします: {q.get('text', '')[:40]}")
+            continue
+        existing_texts.add(q.get('text'))
+        questions.append(q)
+        added += 1
+
+
+def _generate_questions(
+    prompt: str,
+    validate_item,
+    question_count: int,
+    failure_message: str,
+    start_number: int = 1,
+    category_id: str = None,
+    stream: bool = False
+) -> list:
+    """問題を生成し、不足した場合は不足分のみを追加で生成する
+    
+    JSONが途中で切れていた場合なども復元できた問題は保持し、
+    足りない問題数だけを作成済みの問題と重複しないように再リクエストする。
+    """
+    def make_validate(count):
+        return lambda questions_data: validate_question_list(
+            questions_data, validate_item, count, category_id=category_id
+        )
+    
+    questions = _generate_with_retry(
+        prompt, make_validate(question_count), failure_message,
+        validate_item=validate_item, max_items=question_count, stream=stream
+    )
+    for _ in range(MAX_TOP_UP_ROUNDS):
+        missing_count = question_count - len(questions)
+        if missing_count <= 0:
+            break
+        print(f"不足している{missing_count}問のみを追加で生成します...")
+        top_up_prompt = build_top_up_prompt(prompt, questions, missing_count, start_number)
+        try:
+            extra_questions = _generate_with_retry(
+                top_up_prompt, make_validate(missing_count), failure_message,
+                validate_item=validate_item, max_items=missing_count, stream=stream
+            )
+        except Exception as e:
+            print(f"警告: 不足分の追加生成に失敗しました: {e}")
+            break
+        _merge_top_up_questions(questions, extra_questions, missing_count)
+    return questions
+
+
+async def _generate_questions_async(
+    prompt: str,
+    validate_item,
+    question_count: int,
+    failure_message: str,
+    start_number: int = 1,
+    category_id: str = None,
+    transport=None,
+    stream: bool = False
+) -> list:
+    """_generate_questionsの非同期版"""
+    def make_validate(count):
+        return lambda questions_data: validate_question_list(
+            questions_data, validate_item, count, category_id=category_id
+        )
+    
+    questions = await _generate_with_retry_async(
+        prompt, make_validate(question_count), failure_message, transport=transport,
+        validate_item=validate_item, max_items=question_count, stream=stream
+    )
+    for _ in range(MAX_TOP_UP_ROUNDS):
+        missing_count = question_count - len(questions)
+        if missing_count <= 0:
+            break
+        print(f"不足している{missing_count}問のみを追加で生成します...")
+        top_up_prompt = build_top_up_prompt(prompt, questions, missing_count, start_number)
+        try:
+            extra_questions = await _generate_with_retry_async(
+                top_up_prompt, make_validate(missing_count), failure_message, transport=transport,
+                validate_item=validate_item, max_items=missing_count, stream=stream
+            )
+        except Exception as e:
+            print(f"警告: 不足分の追加生成に失敗しました: {e}")
+            break
+        _merge_top_up_questions(questions, extra_questions, missing_count)
+    return questions
+
+
+def get_async_transport():
+    """共有の非同期トランスポート（client.aio.models）を取得
+    
+    client.aioは同期クライアントと同じAPIクライアントを共有しており、
+    すべての非同期呼び出しで1つのコネクションプールが再利用される
+    """
+    return get_client().aio.models
+
+
+class FakeTransport:
+    """オフライン確認用の非同期トランスポート
+    
+    実際のAPIを呼び出さず、あらかじめ用意したレスポンス文字列を順番に返す。
+    responsesに関数を渡した場合は、プロンプトを引数に呼び出した結果を返す。
+    """
+    
+    def __init__(self, responses):
+        self.responses = responses
+        self.prompts = []
+    
+    async def generate_content(self, model: str, contents: str, config: dict = None):
+        self.prompts.append(contents)
+        if callable(self.responses):
+            text = self.responses(contents)
+        else:
+            text = self.responses[min(len(self.prompts), len(self.responses)) - 1]
+        if isinstance(text, Exception):
+            raise text
+        return SimpleNamespace(text=text)
+    
+    async def generate_content_stream(self, model: str, contents: str, config: dict = None, chunk_size: int = 64):
+        """レスポンス文字列をchunk_size文字ずつ返す非同期イテレーターを返す"""
+        response = await self.generate_content(model=model, contents=contents, config=config)
         
-        except json.JSONDecodeError as e:
-            print(f"JSON解析エラー: {e}")
-            print(f"レスポンス（最初の500文字）: {response_text[:500]}")
-            if attempt < MAX_RETRIES - 1:
-                print(f"{BASE_DELAY * (attempt + 1)}秒待機して再試行します...")
-                time.sleep(BASE_DELAY * (attempt + 1))
-                continue
-            raise
+        async def iterate_chunks():
+            for start in range(0, len(response.text), chunk_size):
+                yield SimpleNamespace(text=response.text[start:start + chunk_size])
         
-        except Exception as e:
-            error_str = str(e)
-            
-            if '429' in error_str or 'quota' in error_str.lower() or 'Quota exceeded' in error_str:
-                retry_delay = BASE_DELAY * (2 ** attempt)
-                if attempt < MAX_RETRIES - 1:
-                    print(f"クォータ制限に達しました。{retry_delay:.1f}秒待機して再試行します... (試行 {attempt + 1}/{MAX_RETRIES})")
-                    time.sleep(retry_delay)
-                    continue
-                else:
-                    print(f"エラー: クォータ制限に達しました。しばらく待ってから再実行してください。")
-                    raise Exception(f"APIクォータ制限: {error_str}")
-            
-            if attempt < MAX_RETRIES - 1:
-                print(f"エラーが発生しました: {e}")
-                print(f"{BASE_DELAY * (attempt + 1)}秒待機して再試行します...")
-                time.sleep(BASE_DELAY * (attempt + 1))
-                continue
-            raise
-    
-    raise Exception(f"問題生成に失敗しました（最大リトライ回数に達しました、カテゴリ: {category_id}）")
+        return iterate_chunks()
+
+
+def generate_weekly_recap_questions_batch(
+    region: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1,
+    stream: bool = False
+) -> list:
+    """
+    Grounding機能を使用して最新のサッカー情報を取得し、weeklyクイズ問題を30問一括生成
+    
+    Args:
+        region: "japan" または "world"
+        reference_date: 参照日（YYYY-MM-DD形式、例: "2026-02-07"）
+        matchweek: 節数（オプション、該当しない場合はNone）
+        publish_date: 公開日（YYYY-MM-DD形式、例: "2026-02-10"）
+        expiry_date: 有効期限（YYYY-MM-DD形式、例: "2026-02-16"）
+        season: シーズン（年、例: "2026"）
+        start_number: IDの開始番号（デフォルト: 1）
+        stream: Trueの場合はストリーミング生成を使用し、完成した問題から順に検証する
+    
+    Returns:
+        生成された問題のリスト（30問）
+    """
+    prompt = build_batch_prompt(
+        region, reference_date, matchweek, publish_date, expiry_date, season, start_number
+    )
+    return _generate_questions(
+        prompt,
+        lambda question_data, i: validate_batch_question(
+            question_data, i, region, reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        BATCH_QUESTION_COUNT,
+        "問題生成に失敗しました（最大リトライ回数に達しました）",
+        start_number=start_number,
+        stream=stream
+    )
+
+
+async def generate_weekly_recap_questions_batch_async(
+    region: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1,
+    transport=None,
+    stream: bool = False
+) -> list:
+    """
+    generate_weekly_recap_questions_batchの非同期版
+    
+    Args:
+        transport: 非同期トランスポート（指定しない場合は共有クライアント、テスト時はFakeTransport）
+        その他の引数はgenerate_weekly_recap_questions_batchと同じ
+    
+    Returns:
+        生成された問題のリスト（30問）
+    """
+    prompt = build_batch_prompt(
+        region, reference_date, matchweek, publish_date, expiry_date, season, start_number
+    )
+    return await _generate_questions_async(
+        prompt,
+        lambda question_data, i: validate_batch_question(
+            question_data, i, region, reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        BATCH_QUESTION_COUNT,
+        "問題生成に失敗しました（最大リトライ回数に達しました）",
+        start_number=start_number,
+        transport=transport,
+        stream=stream
+    )
+
+
+def generate_weekly_recap_questions_by_category(
+    region: str,
+    category_id: str,
+    category_name: str,
+    question_count: int,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1,
+    stream: bool = False
+) -> list:
+    """
+    カテゴリごとにWeekly Recap問題を生成
+    
+    Args:
+        region: "japan" または "world"
+        category_id: カテゴリID（例: "weekly-jp-match", "weekly-world-japanese"）
+        category_name: カテゴリ名（例: "試合・結果", "海外日本人選手"）
+        question_count: 生成する問題数
+        reference_date: 参照日（YYYY-MM-DD形式）
+        matchweek: 節数（オプション）
+        publish_date: 公開日（YYYY-MM-DD形式）
+        expiry_date: 有効期限（YYYY-MM-DD形式）
+        season: シーズン
+        start_number: IDの開始番号
+        stream: Trueの場合はストリーミング生成を使用し、完成した問題から順に検証する
+                （question_count問そろった時点で受信を打ち切る）
+    
+    Returns:
+        生成された問題のリスト
+    """
+    check_region_category_id(region, category_id)
+    prompt = build_category_prompt(
+        region, category_id, category_name, question_count, reference_date,
+        matchweek, publish_date, expiry_date, season, start_number
+    )
+    return _generate_questions(
+        prompt,
+        lambda question_data, i: validate_category_question(
+            question_data, i, region, category_id, category_name,
+            reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        question_count,
+        f"問題生成に失敗しました（最大リトライ回数に達しました、カテゴリ: {category_id}）",
+        start_number=start_number,
+        category_id=category_id,
+        stream=stream
+    )
+
+
+async def generate_weekly_recap_questions_by_category_async(
+    region: str,
+    category_id: str,
+    category_name: str,
+    question_count: int,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None,
+    start_number: int = 1,
+    transport=None,
+    stream: bool = False
+) -> list:
+    """
+    generate_weekly_recap_questions_by_categoryの非同期版
+    
+    Args:
+        transport: 非同期トランスポート（指定しない場合は共有クライアント、テスト時はFakeTransport）
+        その他の引数はgenerate_weekly_recap_questions_by_categoryと同じ
+    
+    Returns:
+        生成された問題のリスト
+    """
+    check_region_category_id(region, category_id)
+    prompt = build_category_prompt(
+        region, category_id, category_name, question_count, reference_date,
+        matchweek, publish_date, expiry_date, season, start_number
+    )
+    return await _generate_questions_async(
+        prompt,
+        lambda question_data, i: validate_category_question(
+            question_data, i, region, category_id, category_name,
+            reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        question_count,
+        f"問題生成に失敗しました（最大リトライ回数に達しました、カテゴリ: {category_id}）",
+        start_number=start_number,
+        category_id=category_id,
+        transport=transport,
+        stream=stream
+    )
@@ -0,0 +1,275 @@
+"""JSON配列の要素を逐次取り出すパーサー
+
+- JsonArrayStreamParser: モデルのレスポンス用。ストリーミングで届くテキストを少しずつ渡すと、
+  配列直下のオブジェクトが閉じた時点でそのオブジェクトを返す。受け取ったテキストは1度だけ走査し、
+  レスポンス全体を再走査したり正規表現で何度も探索したりしない。
+- JsonFileItemReader / iter_json_file_items: 問題のJSONファイル用。ファイルを少しずつ読み進めながら
+  問題の配列の要素を1つずつ返し、ファイル全体をメモリに読み込まない。
+"""
+import json
+import re
+
+# コードブロックの開始（```json など）
+_CODE_FENCE_PATTERN = re.compile(r'```[A-Za-z]*')
+# 説明文中の [参考: 3件] などと区別するため、直後（空白を除く）が '{' または ']' の '[' を配列の開始とみなす
+_ARRAY_START_PATTERN = re.compile(r'\[\s*[{\]]')
+
+
+def find_array_start(text: str) -> int:
+    """モデルのレスポンスの説明文の後にある、JSON配列の開始位置（'[' の位置）を返す（見つからない場合は-1）
+
+    - コードブロック（```json など）がある場合は、その後の最初の '['
+    - コードブロックがない場合は、直後（空白を除く）が '{' または ']' の最初の '['
+    """
+    fence = _CODE_FENCE_PATTERN.search(text)
+    if fence is not None:
+        return text.find('[', fence.end())
+    match = _ARRAY_START_PATTERN.search(text)
+    return match.start() if match else -1
+
+
+class JsonArrayStreamParser:
+    """JSON配列の要素（オブジェクト）を逐次パースする
+
+    - 配列の開始（find_array_start）より前のテキスト（説明文や ```json などのコードブロック記号）は読み飛ばす。
+      開始位置が決まるまでは受け取ったテキストを保持し、断片の境界をまたぐ場合も正しく判定する
+    - 配列直下の '{' 〜 '}' が閉じるたびに json.loads して返す
+    - 要素単体のパースに失敗した場合は、その要素だけを errors に記録して読み進める
+    """
+
+    def __init__(self):
+        self._buffer = []  # 現在の要素の途中までのテキスト
+        self._preamble = ''  # 配列の開始位置が決まるまでに受け取ったテキスト
+        self._started = False  # '[' を読んだかどうか
+        self._finished = False  # 配列の ']' を読んだかどうか
+        self._depth = 0  # 要素内の {} / [] のネスト
+        self._in_string = False
+        self._escape = False
+        self.items_found = 0
+        self.errors = []
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> list:
+        """テキストの断片を渡し、この断片で完成した要素のリストを返す"""
+        completed = []
+        if self._finished or not chunk:
+            return completed
+
+        i = 0
+        length = len(chunk)
+        if not self._started:
+            self._preamble += chunk
+            start = find_array_start(self._preamble)
+            if start == -1:
+                return completed
+            chunk = self._preamble
+            length = len(chunk)
+            self._preamble = ''
+            self._started = True
+            i = start + 1
+
+        element_start = 0 if self._depth > 0 else None
+        while i < length:
+            ch = chunk[i]
+            if self._depth == 0:
+                # 要素の外側: '{' で要素開始、']' で配列終了、それ以外（, や空白）は読み飛ばす
+                if ch == '{':
+                    self._depth = 1
+                    element_start = i
+                elif ch == ']':
+                    self._finished = True
+                    break
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{' or ch == '[':
+                self._depth += 1
+            elif ch == '}' or ch == ']':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[element_start:i + 1])
+                    element_start = None
+                    item = self._parse_element(''.join(self._buffer))
+                    self._buffer = []
+                    if item is not None:
+                        completed.append(item)
+            i += 1
+
+        # 要素の途中で断片が終わった場合は、続きの断片と連結するために保持する
+        if self._depth > 0 and element_start is not None:
+            self._buffer.append(chunk[element_start:])
+        return completed
+
+    def _parse_element(self, text: str):
+        self.items_found += 1
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            self.errors.append({'index': self.items_found - 1, 'error': str(e), 'text': text[:200]})
+            return None
+
+
+def iter_json_array_items(chunks):
+    """テキスト断片のイテラブルから、JSON配列の要素を完成した順に返すジェネレーター"""
+    parser = JsonArrayStreamParser()
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+        if parser.finished:
+            break
+
+
+def salvage_json_array(text: str) -> tuple[list, list]:
+    """途中で切れている・一部が壊れているJSON配列から、完全な要素だけを取り出す
+
+    JsonArrayStreamParserは説明文・コードブロック記号の後の配列（find_array_start）から読み始めるため、
+    説明文中の '[' を配列の開始と誤認しない。
+
+    Returns:
+        (取り出せた要素のリスト, パースできなかった要素のエラー情報のリスト) のタプル
+    """
+    parser = JsonArrayStreamParser()
+    items = parser.feed(text)
+    return items, parser.errors
+
+
+FILE_CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonFileItemReader:
+    """JSONファイルの問題の配列の要素を、ファイル全体を読み込まずに1つずつ返す
+
+    ファイルの形式は次のどちらか:
+    - 配列（[...]）: 配列の要素を返す
+    - オブジェクト（{"questions": [...], ...}）: keyの配列の要素を返す。
+      keyより前にある他のキーの値はmetadataに保持する
+
+    要素はjson.JSONDecoder.raw_decodeで1つずつデコードし、デコードした部分はバッファから捨てるため、
+    メモリ使用量はファイルのサイズによらず、読み込み単位（chunk_size）と最大の要素の大きさ程度になる。
+    """
+
+    def __init__(self, json_path, key: str = 'questions', chunk_size: int = FILE_CHUNK_SIZE):
+        self.json_path = json_path
+        self.key = key
+        self.chunk_size = chunk_size
+        self.layout = None  # 'array' または 'object'（読み始めるまではNone）
+        self.metadata = {}
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """ファイルを読み進めてバッファに追加する（ファイルの終わりの場合はFalse）"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def _peek(self) -> str:
+        """空白を読み飛ばし、次の文字を返す（ファイルの終わりの場合は空文字）"""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, expected: str):
+        ch = self._peek()
+        if ch != expected:
+            raise ValueError(f"JSONの形式が正しくありません: '{expected}' が必要です（{self.json_path}）")
+        self._pos += 1
+
+    def _decode_value(self):
+        """次の値を1つデコードする（値が読み込み単位をまたぐ場合はファイルを読み進めて再試行する）"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                # エラーの位置はバッファ内の位置のため、メッセージのみを使用する
+                raise ValueError(f"JSONの形式が正しくありません: {e.msg}（{self.json_path}）") from e
+            # 数値はバッファの末尾で途切れている可能性があるため、続きを読んでから確定する
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _seek_to_array(self):
+        first = self._peek()
+        if first == '[':
+            self.layout = 'array'
+            self._pos += 1
+            return
+        if first != '{':
+            raise ValueError("JSONファイルは問題のリスト、または{'questions': [...]}形式である必要があります")
+        self.layout = 'object'
+        self._pos += 1
+        while True:
+            ch = self._peek()
+            if ch == '}' or ch == '':
+                raise ValueError("JSONファイルは問題のリスト、または{'questions': [...]}形式である必要があります")
+            if ch == ',':
+                self._pos += 1
+                continue
+            name = self._decode_value()
+            self._expect(':')
+            if name == self.key:
+                if self._peek() != '[':
+                    raise ValueError("JSONファイルは問題のリストである必要があります")
+                self._pos += 1
+                return
+            self.metadata[name] = self._decode_value()
+
+    def __iter__(self):
+        with open(self.json_path, 'r', encoding='utf-8-sig') as f:
+            self._file = f
+            try:
+                self._seek_to_array()
+                while True:
+                    ch = self._peek()
+                    if ch == ']':
+                        self._pos += 1
+                        return
+                    if ch == ',':
+                        self._pos += 1
+                        continue
+                    if ch == '':
+                        raise ValueError(f"JSONの配列が閉じていません（{self.json_path}）")
+                    yield self._decode_value()
+            finally:
+                self._file = None
+
+
+def iter_json_file_items(json_path, key: str = 'questions', chunk_size: int = FILE_CHUNK_SIZE):
+    """JSONファイルの問題の配列（[...] または {"questions": [...]}）の要素を1つずつ返すジェネレーター"""
+    return iter(JsonFileItemReader(json_path, key, chunk_size))
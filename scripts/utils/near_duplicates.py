@@ -0,0 +1,337 @@
+"""問題文の類似（言い換え）検出（MinHash/LSH）
+
+問題文を正規化して文字n-gram（日本語でもそのまま使える）の集合にし、MinHashの署名を作成する。
+署名をBANDS個のバンドに分け、いずれかのバンドが一致した問題だけを候補として署名の一致率
+（Jaccard係数の推定値）を比較するため、全組み合わせを比較せずに類似した問題を見つけられる。
+
+SignatureIndexは署名とバンドをSQLiteのファイルに保存し、questions.dbとの差分だけを更新する。
+新しい問題は、バンドのインデックスを検索するだけで既存の問題と比較できる。
+"""
+import hashlib
+import random
+import re
+import sqlite3
+import unicodedata
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# 候補になる一致率の目安は (1 / BANDS) ** (1 / ROWS_PER_BAND) ≒ 0.5
+DEFAULT_THRESHOLD = 0.5
+HASH_SEED = 20240601
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+
+_rng = random.Random(HASH_SEED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# 同じ問題文の署名を作り直さないためのキャッシュの件数（登録時は、登録済みの問題の検索・同じ入力内の比較・
+# インデックスへの追加で、同じ問題文の署名を3回使う）
+SIGNATURE_CACHE_SIZE = 10_000
+
+_IGNORED_PATTERN = re.compile(r'[\s\W_]+')
+
+
+def normalize_text(text: str) -> str:
+    """比較用に正規化した問題文（全角・半角と大文字・小文字を統一し、空白・記号を除く）"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return _IGNORED_PATTERN.sub('', text)
+
+
+def compute_text_hash(text: str, options=None) -> str:
+    """正規化した問題文と選択肢のハッシュ（完全一致の重複検出用）
+
+    選択肢は'|||'区切りの文字列またはリスト。並び順が変わっても同じ問題として扱うため、正規化して並べ替える。
+    """
+    if isinstance(options, str):
+        options = options.split('|||')
+    normalized_options = sorted(normalize_text(option) for option in (options or []) if isinstance(option, str))
+    key = '\x1f'.join([normalize_text(text)] + normalized_options)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """正規化した問題文の文字n-gramの集合"""
+    normalized = normalize_text(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def signature_text_hash(text: str) -> str:
+    """署名のインデックスで問題文の変更を判定するハッシュ（正規化した問題文のSHA-256）"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def minhash_signature(text: str) -> array:
+    """問題文のMinHash署名（NUM_PERMUTATIONS個の整数）
+
+    1問あたりNUM_PERMUTATIONS × n-gramの数（約40）回のハッシュ計算を行うため、CPythonでは1問あたり約1ミリ秒かかる。
+    同じ問題文の署名はキャッシュする（返す署名は変更しないこと）。
+    """
+    hashes = [_hash64(shingle) % _MERSENNE_PRIME for shingle in shingles(text)]
+    if not hashes:
+        return array('Q', [_MAX_HASH] * NUM_PERMUTATIONS)
+    return array('Q', [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    ])
+
+
+def band_keys(signature: array) -> list:
+    """署名の各バンドのキー（SQLiteのINTEGERに収まる符号付き64ビット整数）のリスト"""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def estimate_similarity(signature_a: array, signature_b: array) -> float:
+    """署名の一致率（Jaccard係数の推定値）"""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / NUM_PERMUTATIONS
+
+
+def signature_from_bytes(data: bytes) -> array:
+    signature = array('Q')
+    signature.frombytes(data)
+    return signature
+
+
+def find_similar_pairs(items, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """(ID, 問題文) のリストの中で類似した組を探す（署名はメモリ上で作成し、保存しない）
+
+    Returns:
+        (ID1, ID2, 一致率) のリスト（一致率の高い順）
+    """
+    signatures = {}
+    buckets = defaultdict(list)
+    for question_id, text in items:
+        signature = minhash_signature(text)
+        signatures[question_id] = signature
+        for band, key in enumerate(band_keys(signature)):
+            buckets[(band, key)].append(question_id)
+    return _verify_candidate_pairs(buckets.values(), signatures, threshold)
+
+
+def _verify_candidate_pairs(groups, signatures: dict, threshold: float) -> list:
+    """同じバンドに入ったIDのグループから、一致率がthreshold以上の組を返す"""
+    seen = set()
+    pairs = []
+    for group in groups:
+        for id_a, id_b in combinations(sorted(set(group)), 2):
+            if (id_a, id_b) in seen:
+                continue
+            seen.add((id_a, id_b))
+            similarity = estimate_similarity(signatures[id_a], signatures[id_b])
+            if similarity >= threshold:
+                pairs.append((id_a, id_b, similarity))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs
+
+
+class SignatureIndex:
+    """問題の署名とLSHのバンドを保存するSQLiteのインデックス
+
+    questions.db（アプリに同梱する）とは別のファイルに保存する。
+    署名の作成条件（n-gramの長さ・署名の長さ・バンド数）が変わった場合は作り直す。
+    """
+
+    def __init__(self, index_path):
+        self.index_path = str(index_path)
+        self.conn = sqlite3.connect(self.index_path)
+        self._create_tables()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _parameters() -> str:
+        return f"shingle={SHINGLE_SIZE},permutations={NUM_PERMUTATIONS},bands={BANDS},seed={HASH_SEED}"
+
+    def _create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute('CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        cursor.execute("SELECT value FROM index_meta WHERE key = 'parameters'")
+        row = cursor.fetchone()
+        if row is not None and row[0] != self._parameters():
+            cursor.execute('DROP TABLE IF EXISTS signatures')
+            cursor.execute('DROP TABLE IF EXISTS bands')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS signatures (
+                question_id TEXT PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                signature BLOB NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                question_id TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, question_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bands_question_id ON bands(question_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_signatures_text_hash ON signatures(text_hash)')
+        cursor.execute(
+            "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('parameters', ?)",
+            (self._parameters(),)
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM signatures').fetchone()[0]
+
+    def sync(self, items) -> dict:
+        """(ID, 問題文) の一覧にインデックスを合わせる（問題文が変わった問題のみ署名を作り直す）
+
+        Returns:
+            {'added': 追加・更新した数, 'removed': 削除した数, 'unchanged': 変更のない数}
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT question_id, text_hash FROM signatures')
+        current = dict(cursor.fetchall())
+
+        changed = []
+        seen = set()
+        for question_id, text in items:
+            seen.add(question_id)
+            text_hash = signature_text_hash(text)
+            if current.get(question_id) != text_hash:
+                changed.append((question_id, text, text_hash))
+        removed = [question_id for question_id in current if question_id not in seen]
+
+        with self.conn:
+            # 削除する問題の署名も、同じ問題文の別のIDで使えるよう削除の前に作り直す
+            self._replace(cursor, changed)
+            self._delete(cursor, removed)
+        return {'added': len(changed), 'removed': len(removed), 'unchanged': len(seen) - len(changed)}
+
+    def add(self, items) -> int:
+        """(ID, 問題文) の問題をインデックスに追加・更新し、追加・更新した数を返す
+
+        sync と異なりインデックス全体とは比較しないため、登録した問題を少しずつ反映する場合に使う。
+        """
+        changed = [(question_id, text, signature_text_hash(text)) for question_id, text in items]
+        with self.conn:
+            self._replace(self.conn.cursor(), changed)
+        return len(changed)
+
+    def sync_from_db(self, db_path) -> dict:
+        """questions.dbの全問題にインデックスを合わせる"""
+        conn = sqlite3.connect(str(db_path))
+        try:
+            return self.sync(conn.execute('SELECT id, text FROM questions'))
+        finally:
+            conn.close()
+
+    def _replace(self, cursor, changed: list):
+        """(ID, 問題文, text_hash) の問題の署名を作り直す
+
+        同じ問題文（text_hash）の署名がインデックスにあれば、計算せずにその署名を使う（IDの振り直しなど）。
+        """
+        stored = {}
+        unique_hashes = list({text_hash for _, _, text_hash in changed})
+        for start in range(0, len(unique_hashes), 500):
+            chunk = unique_hashes[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            for text_hash, data in cursor.execute(
+                f'SELECT text_hash, signature FROM signatures WHERE text_hash IN ({placeholders})', chunk
+            ):
+                stored.setdefault(text_hash, data)
+        self._delete(cursor, [question_id for question_id, _, _ in changed])
+        for question_id, text, text_hash in changed:
+            data = stored.get(text_hash)
+            signature = signature_from_bytes(data) if data is not None else minhash_signature(text)
+            self._insert(cursor, question_id, text_hash, signature)
+            stored.setdefault(text_hash, signature.tobytes())
+
+    @staticmethod
+    def _delete(cursor, question_ids: list):
+        for question_id in question_ids:
+            cursor.execute('DELETE FROM signatures WHERE question_id = ?', (question_id,))
+            cursor.execute('DELETE FROM bands WHERE question_id = ?', (question_id,))
+
+    @staticmethod
+    def _insert(cursor, question_id: str, text_hash: str, signature: array):
+        cursor.execute(
+            'INSERT INTO signatures (question_id, text_hash, signature) VALUES (?, ?, ?)',
+            (question_id, text_hash, signature.tobytes())
+        )
+        cursor.executemany(
+            'INSERT OR IGNORE INTO bands (band, bucket, question_id) VALUES (?, ?, ?)',
+            [(band, key, question_id) for band, key in enumerate(band_keys(signature))]
+        )
+
+    def _signatures(self, question_ids) -> dict:
+        signatures = {}
+        for question_id in question_ids:
+            row = self.conn.execute(
+                'SELECT signature FROM signatures WHERE question_id = ?', (question_id,)
+            ).fetchone()
+            if row is not None:
+                signatures[question_id] = signature_from_bytes(row[0])
+        return signatures
+
+    def query(self, text: str, threshold: float = DEFAULT_THRESHOLD, exclude_id: str = None) -> list:
+        """問題文に類似した登録済みの問題を探す
+
+        Returns:
+            (ID, 一致率) のリスト（一致率の高い順）
+        """
+        signature = minhash_signature(text)
+        candidates = set()
+        for band, key in enumerate(band_keys(signature)):
+            rows = self.conn.execute(
+                'SELECT question_id FROM bands WHERE band = ? AND bucket = ?', (band, key)
+            ).fetchall()
+            candidates.update(row[0] for row in rows)
+        candidates.discard(exclude_id)
+
+        matches = []
+        for question_id, candidate in self._signatures(candidates).items():
+            similarity = estimate_similarity(signature, candidate)
+            if similarity >= threshold:
+                matches.append((question_id, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def similar_pairs(self, threshold: float = DEFAULT_THRESHOLD) -> list:
+        """インデックス内の問題どうしで類似した組を探す
+
+        Returns:
+            (ID1, ID2, 一致率) のリスト（一致率の高い順）
+        """
+        groups = [
+            row[0].split('\x1f')
+            for row in self.conn.execute('''
+                SELECT GROUP_CONCAT(question_id, char(31))
+                FROM bands
+                GROUP BY band, bucket
+                HAVING COUNT(*) > 1
+            ''')
+        ]
+        question_ids = {question_id for group in groups for question_id in group}
+        return _verify_candidate_pairs(groups, self._signatures(question_ids), threshold)
@@ -0,0 +1,272 @@
+"""questionsテーブルを列指向で保持する問題データ（QuestionBank）
+
+check系・分析系のスクリプトは、QuestionBank.load() でテーブルを1回だけ走査して読み込み、
+集計・絞り込み・重複検出をメモリ上で行う。
+
+- category・difficulty・regionなど値の種類が少ない列は、値の一覧と行ごとの番号（array）で保持する
+- answerIndexは64ビット整数のarrayと、値があるかどうかのマスクで保持する
+- tagsはカンマ区切りを分割し、タグの番号のタプルで保持する
+- 問題文などのその他の列はリストで保持する
+"""
+import sqlite3
+from array import array
+from collections import Counter, defaultdict
+
+from utils.db_migrations import get_table_columns, split_tags
+
+# 値の一覧と番号で保持する列
+CODED_COLUMNS = (
+    'category', 'difficulty', 'region', 'quiz_type', 'category_id',
+    'league', 'team', 'team_id', 'reference_date', 'source_file',
+)
+# 整数で保持する列
+INTEGER_COLUMNS = ('answerIndex',)
+# 整数の列のarrayに保持できる範囲（SQLiteのINTEGERと同じ64ビット）
+INTEGER_MIN = -(1 << 63)
+INTEGER_MAX = (1 << 63) - 1
+# 読み込み対象の列（テーブルに存在する列のみ読み込む）
+BANK_COLUMNS = (
+    'id', 'text', 'options', 'answerIndex', 'explanation', 'trivia', 'category', 'difficulty', 'tags',
+    'reference_date', 'quiz_type', 'category_id', 'region', 'league', 'team', 'team_id',
+    'weekly_meta', 'source_file',
+)
+
+
+class _CodedColumn:
+    """値の一覧（values）と、行ごとの値の番号（codes）"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('I')
+        self._lookup = {}
+
+    def intern(self, value) -> int:
+        """値の番号を返す（初めての値は一覧に追加する）"""
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._lookup[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self.intern(value))
+
+    def code_of(self, value):
+        """値の番号（存在しない値の場合はNone）"""
+        return self._lookup.get(value)
+
+
+class _IntegerColumn:
+    """行ごとの整数（values）と、値があるかどうか（present）
+
+    NULLの行はpresentが0になる。整数以外の値（文字列など）や範囲外の整数はothersに元の値のまま保持する。
+    """
+
+    def __init__(self):
+        self.values = array('q')
+        self.present = bytearray()
+        self.others = {}
+
+    def append(self, value):
+        if isinstance(value, int) and INTEGER_MIN <= value <= INTEGER_MAX:
+            self.values.append(value)
+            self.present.append(1)
+            return
+        if value is not None:
+            self.others[len(self.values)] = value
+        self.values.append(0)
+        self.present.append(0)
+
+    def get(self, row: int):
+        if self.present[row]:
+            return self.values[row]
+        return self.others.get(row)
+
+
+class QuestionBank:
+    """questionsテーブルの全行を列ごとに保持する
+
+    行はloadした順の行番号（0始まり）で扱う。filter()などは行番号のリストを返し、
+    group_count()などのrows引数に渡すと、その行だけを対象に集計する。
+    """
+
+    def __init__(self, columns: list):
+        self.columns = list(columns)
+        self._coded = {}
+        self._integers = {}
+        self._plain = {}
+        for column in self.columns:
+            if column in CODED_COLUMNS:
+                self._coded[column] = _CodedColumn()
+            elif column in INTEGER_COLUMNS:
+                self._integers[column] = _IntegerColumn()
+            elif column != 'tags':
+                self._plain[column] = []
+        self._tag_names = _CodedColumn() if 'tags' in self.columns else None
+        self._tag_codes = []
+        self._raw_tags = []
+        self._size = 0
+
+    @classmethod
+    def load(cls, db_path, columns=None) -> 'QuestionBank':
+        """questionsテーブルを1回の走査で読み込む（columnsを省略した場合は存在するすべての列）"""
+        conn = sqlite3.connect(str(db_path))
+        try:
+            cursor = conn.cursor()
+            existing = get_table_columns(cursor, 'questions')
+            wanted = BANK_COLUMNS if columns is None else columns
+            selected = [column for column in wanted if column in existing]
+            bank = cls(selected)
+            cursor.execute(f"SELECT {', '.join(selected)} FROM questions")
+            for row in cursor:
+                bank.append(row)
+            return bank
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_questions(cls, questions: list, columns=None) -> 'QuestionBank':
+        """行のdictのリストから作成（キーはデータベースの列名）"""
+        bank = cls(BANK_COLUMNS if columns is None else columns)
+        for question in questions:
+            bank.append(tuple(question.get(column) for column in bank.columns))
+        return bank
+
+    def append(self, row):
+        """self.columnsの順の値のタプルを1行追加"""
+        for column, value in zip(self.columns, row):
+            if column in self._coded:
+                self._coded[column].append(value)
+            elif column in self._integers:
+                self._integers[column].append(value)
+            elif column == 'tags':
+                self._raw_tags.append(value)
+                self._tag_codes.append(tuple(self._tag_names.intern(tag) for tag in split_tags(value)))
+            else:
+                self._plain[column].append(value)
+        self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def has_column(self, column: str) -> bool:
+        return column in self.columns
+
+    def value(self, column: str, row: int):
+        """行の列の値（tagsは元のカンマ区切りの文字列）"""
+        if column in self._coded:
+            coded = self._coded[column]
+            return coded.values[coded.codes[row]]
+        if column in self._integers:
+            return self._integers[column].get(row)
+        if column == 'tags':
+            return self._raw_tags[row]
+        return self._plain[column][row]
+
+    def row(self, row: int) -> dict:
+        """行の全列の値のdict"""
+        return {column: self.value(column, row) for column in self.columns}
+
+    def column(self, column: str, rows=None) -> list:
+        """列の値のリスト"""
+        if rows is None:
+            rows = range(self._size)
+        return [self.value(column, row) for row in rows]
+
+    def tags(self, row: int) -> list:
+        """行のタグのリスト"""
+        names = self._tag_names.values
+        return [names[code] for code in self._tag_codes[row]]
+
+    def filter(self, rows=None, **conditions) -> list:
+        """条件に一致する行番号のリスト
+
+        条件の値は、一致させる値・値の集合（set/frozenset）・値を受け取ってboolを返す関数のいずれか。
+        tagsの条件は、タグのリストを受け取る関数、またはそのタグを含む行に一致するタグ名。
+        """
+        result = list(range(self._size)) if rows is None else list(rows)
+        for column, condition in conditions.items():
+            if column == 'tags':
+                if callable(condition):
+                    result = [row for row in result if condition(self.tags(row))]
+                else:
+                    code = self._tag_names.code_of(condition)
+                    result = [row for row in result if code in self._tag_codes[row]]
+            elif column in self._coded and not callable(condition):
+                # 値を番号に変換して、番号どうしで比較する
+                coded = self._coded[column]
+                values = condition if isinstance(condition, (set, frozenset)) else {condition}
+                wanted = {coded.code_of(value) for value in values} - {None}
+                codes = coded.codes
+                result = [row for row in result if codes[row] in wanted]
+            elif callable(condition):
+                result = [row for row in result if condition(self.value(column, row))]
+            elif isinstance(condition, (set, frozenset)):
+                result = [row for row in result if self.value(column, row) in condition]
+            else:
+                result = [row for row in result if self.value(column, row) == condition]
+        return result
+
+    def group_count(self, *columns, rows=None, key=None) -> Counter:
+        """列の値（複数の場合は値のタプル）ごとの行数
+
+        keyを指定した場合は、値をkey(値)に変換してから集計する（NULLと空文字をまとめる場合など）
+        """
+        if rows is None:
+            rows = range(self._size)
+        # 番号で保持している列は番号のまま数え、最後に値に戻す
+        sources = [self._coded[column].codes if column in self._coded else None for column in columns]
+        raw_counts = Counter()
+        for row in rows:
+            raw_counts[tuple(
+                source[row] if source is not None else self.value(column, row)
+                for column, source in zip(columns, sources)
+            )] += 1
+
+        counts = Counter()
+        for raw, count in raw_counts.items():
+            values = tuple(
+                self._coded[column].values[item] if column in self._coded else item
+                for column, item in zip(columns, raw)
+            )
+            if key:
+                values = tuple(key(value) for value in values)
+            counts[values[0] if len(columns) == 1 else values] += count
+        return counts
+
+    def group_rows(self, *columns, rows=None) -> dict:
+        """列の値（複数の場合は値のタプル）ごとの行番号のリスト"""
+        if rows is None:
+            rows = range(self._size)
+        groups = defaultdict(list)
+        for row in rows:
+            values = tuple(self.value(column, row) for column in columns)
+            groups[values[0] if len(columns) == 1 else values].append(row)
+        return dict(groups)
+
+    def distinct(self, column: str, rows=None) -> list:
+        """列の値の一覧（出現順）"""
+        if rows is None and column in self._coded:
+            return list(self._coded[column].values)
+        return list(dict.fromkeys(self.column(column, rows)))
+
+    def tag_counts(self, rows=None) -> Counter:
+        """タグごとの出現回数"""
+        if rows is None:
+            rows = range(self._size)
+        code_counts = Counter()
+        for row in rows:
+            code_counts.update(self._tag_codes[row])
+        names = self._tag_names.values
+        return Counter({names[code]: count for code, count in code_counts.items()})
+
+    def duplicates(self, column: str = 'text', key=None, rows=None) -> dict:
+        """値（keyを指定した場合はkey(値)）が2行以上で一致するものの、値 → 行番号のリスト"""
+        if rows is None:
+            rows = range(self._size)
+        groups = defaultdict(list)
+        for row in rows:
+            value = self.value(column, row)
+            groups[key(value) if key else value].append(row)
+        return {value: group for value, group in groups.items() if len(group) > 1}
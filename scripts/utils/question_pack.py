@@ -0,0 +1,368 @@
+"""問題パック（.qpk）形式の書き出し・読み込み
+
+Weekly RecapのJSON（{"version": ..., "questions": [...]}）をそのまま元データとし、
+配信用にコンパクトなバイナリ形式へ変換する。JSONとの相互変換で内容は失われない。
+
+ファイル構成（整数はすべてリトルエンディアン）:
+
+    ヘッダー（32バイト）
+        magic          4s   b'FQPK'
+        version        u16  PACK_VERSION
+        flags          u16  予約（0）
+        record_count   u32  問題数
+        string_count   u32  文字列テーブルの要素数
+        meta_offset    u32  メタデータの位置
+        strings_offset u32  文字列テーブルの位置
+        index_offset   u32  インデックスの位置
+        records_offset u32  レコード領域の位置
+    メタデータ      varint長 + UTF-8のJSON（questions以外のトップレベルのフィールド）
+    文字列テーブル  (varint長 + UTF-8) × string_count
+                    region・categoryId・league・season・タグなど、繰り返し現れる値を1回だけ保持する
+    インデックス    (u32 問題IDの文字列番号, u32 レコードの相対位置) × record_count（問題IDの昇順）
+    レコード領域    (varint長 + レコード本体) × record_count（元のJSONの順序）
+
+レコード本体は、QUESTION_FIELDSの各フィールドの有無を表すビットマスク（varint）と、
+存在するフィールドの値を定義順に並べたもの。スキーマにないキーや想定外の型の値は
+末尾のextra（JSON文字列）に格納する。
+"""
+import bisect
+import json
+import os
+import struct
+from pathlib import Path
+
+PACK_MAGIC = b'FQPK'
+PACK_VERSION = 1
+PACK_SUFFIX = '.qpk'
+HEADER_FORMAT = '<4sHHIIIIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INDEX_ENTRY_FORMAT = '<II'
+INDEX_ENTRY_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
+
+# フィールドの種類
+#   interned      文字列テーブルの番号（繰り返し現れる短い値）
+#   text          長さ付きのUTF-8文字列（問題文・解説など、ほぼ繰り返されない値）
+#   int           整数（ジグザグ符号化のvarint）
+#   interned_list 文字列テーブルの番号のリスト
+#   text_list     長さ付き文字列のリスト
+#   struct        ネストしたオブジェクト（同じ形式で再帰的に符号化）
+WEEKLY_META_FIELDS = [
+    ('matchweek', 'int'),
+    ('matchDate', 'interned'),
+    ('publishDate', 'interned'),
+    ('expiryDate', 'interned'),
+    ('season', 'interned'),
+]
+
+QUESTION_FIELDS = [
+    ('id', 'interned'),
+    ('quizType', 'interned'),
+    ('difficulty', 'interned'),
+    ('region', 'interned'),
+    ('league', 'interned'),
+    ('team', 'interned'),
+    ('teamId', 'interned'),
+    ('category', 'interned'),
+    ('categoryId', 'interned'),
+    ('tags', 'interned_list'),
+    ('text', 'text'),
+    ('options', 'text_list'),
+    ('answerIndex', 'int'),
+    ('explanation', 'text'),
+    ('trivia', 'text'),
+    ('referenceDate', 'interned'),
+    ('weeklyMeta', ('struct', WEEKLY_META_FIELDS)),
+]
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos: int) -> tuple:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if value % 2 == 0 else -((value + 1) >> 1)
+
+
+def _write_text(out: bytearray, text: str):
+    encoded = text.encode('utf-8')
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_text(data, pos: int) -> tuple:
+    length, pos = _read_varint(data, pos)
+    return bytes(data[pos:pos + length]).decode('utf-8'), pos + length
+
+
+def _matches_kind(value, kind) -> bool:
+    """値がフィールドの種類で符号化できるか（nullは文字列系のフィールドのみ許可）"""
+    if isinstance(kind, tuple):
+        return isinstance(value, dict)
+    if kind == 'int':
+        return type(value) is int
+    if kind in ('interned', 'text'):
+        return value is None or isinstance(value, str)
+    if kind in ('interned_list', 'text_list'):
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    return False
+
+
+class _StringTable:
+    """文字列テーブル（番号0はnullを表す）"""
+
+    def __init__(self):
+        self.strings = []
+        self._ids = {}
+
+    def intern(self, value) -> int:
+        if value is None:
+            return 0
+        string_id = self._ids.get(value)
+        if string_id is None:
+            self.strings.append(value)
+            string_id = len(self.strings)
+            self._ids[value] = string_id
+        return string_id
+
+
+def _encode_struct(out: bytearray, obj: dict, fields: list, strings: _StringTable):
+    """フィールドの有無のビットマスク・値・extraの順に符号化"""
+    mask = 0
+    present = []
+    for bit, (key, kind) in enumerate(fields):
+        if key in obj and _matches_kind(obj[key], kind):
+            mask |= 1 << bit
+            present.append((key, kind))
+    known_keys = {key for key, _ in present}
+    extra = {key: value for key, value in obj.items() if key not in known_keys}
+    _write_varint(out, mask)
+
+    for key, kind in present:
+        value = obj[key]
+        if isinstance(kind, tuple):
+            _encode_struct(out, value, kind[1], strings)
+        elif kind == 'interned':
+            _write_varint(out, strings.intern(value))
+        elif kind == 'text':
+            # 0はnull、それ以外は長さ+1
+            if value is None:
+                _write_varint(out, 0)
+            else:
+                encoded = value.encode('utf-8')
+                _write_varint(out, len(encoded) + 1)
+                out += encoded
+        elif kind == 'int':
+            _write_varint(out, _zigzag(value))
+        elif kind == 'interned_list':
+            _write_varint(out, len(value))
+            for item in value:
+                _write_varint(out, strings.intern(item))
+        elif kind == 'text_list':
+            _write_varint(out, len(value))
+            for item in value:
+                _write_text(out, item)
+
+    if extra:
+        _write_text(out, json.dumps(extra, ensure_ascii=False, separators=(',', ':')))
+    else:
+        _write_varint(out, 0)
+
+
+def _decode_struct(data, pos: int, fields: list, strings: list) -> tuple:
+    mask, pos = _read_varint(data, pos)
+    obj = {}
+    for bit, (key, kind) in enumerate(fields):
+        if not mask & (1 << bit):
+            continue
+        if isinstance(kind, tuple):
+            obj[key], pos = _decode_struct(data, pos, kind[1], strings)
+        elif kind == 'interned':
+            string_id, pos = _read_varint(data, pos)
+            obj[key] = strings[string_id - 1] if string_id else None
+        elif kind == 'text':
+            length, pos = _read_varint(data, pos)
+            if length == 0:
+                obj[key] = None
+            else:
+                obj[key] = bytes(data[pos:pos + length - 1]).decode('utf-8')
+                pos += length - 1
+        elif kind == 'int':
+            value, pos = _read_varint(data, pos)
+            obj[key] = _unzigzag(value)
+        elif kind == 'interned_list':
+            count, pos = _read_varint(data, pos)
+            items = []
+            for _ in range(count):
+                string_id, pos = _read_varint(data, pos)
+                items.append(strings[string_id - 1])
+            obj[key] = items
+        elif kind == 'text_list':
+            count, pos = _read_varint(data, pos)
+            items = []
+            for _ in range(count):
+                item, pos = _read_text(data, pos)
+                items.append(item)
+            obj[key] = items
+
+    extra_length, pos = _read_varint(data, pos)
+    if extra_length:
+        obj.update(json.loads(bytes(data[pos:pos + extra_length]).decode('utf-8')))
+        pos += extra_length
+    return obj, pos
+
+
+def encode_question_pack(document) -> bytes:
+    """Weekly Recap形式のJSONデータ（または問題のリスト）を問題パックのバイト列に変換"""
+    if isinstance(document, list):
+        metadata, questions = None, document
+    else:
+        metadata = {key: value for key, value in document.items() if key != 'questions'}
+        questions = document.get('questions', [])
+
+    strings = _StringTable()
+    records = bytearray()
+    index = []
+    for question in questions:
+        if not isinstance(question.get('id'), str):
+            raise ValueError(f"問題パックに変換するにはすべての問題に文字列のidが必要です: {question.get('id')!r}")
+        record = bytearray()
+        _encode_struct(record, question, QUESTION_FIELDS, strings)
+        index.append((question['id'], strings.intern(question['id']), len(records)))
+        _write_varint(records, len(record))
+        records += record
+
+    ids = [question_id for question_id, _, _ in index]
+    if len(set(ids)) != len(ids):
+        raise ValueError("問題パックに変換するには問題のidが一意である必要があります")
+
+    meta_bytes = bytearray()
+    _write_text(meta_bytes, json.dumps(metadata, ensure_ascii=False, separators=(',', ':')))
+    string_bytes = bytearray()
+    for value in strings.strings:
+        _write_text(string_bytes, value)
+    index_bytes = bytearray()
+    for _, string_id, offset in sorted(index):
+        index_bytes += struct.pack(INDEX_ENTRY_FORMAT, string_id, offset)
+
+    meta_offset = HEADER_SIZE
+    strings_offset = meta_offset + len(meta_bytes)
+    index_offset = strings_offset + len(string_bytes)
+    records_offset = index_offset + len(index_bytes)
+    header = struct.pack(
+        HEADER_FORMAT, PACK_MAGIC, PACK_VERSION, 0, len(questions), len(strings.strings),
+        meta_offset, strings_offset, index_offset, records_offset
+    )
+    return bytes(header + meta_bytes + string_bytes + index_bytes + records)
+
+
+def write_question_pack(document, pack_path) -> Path:
+    """問題パックをファイルに書き出す（一時ファイルに書いてから置き換える）"""
+    pack_path = Path(pack_path)
+    tmp_path = pack_path.with_suffix(pack_path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(encode_question_pack(document))
+    os.replace(tmp_path, pack_path)
+    return pack_path
+
+
+class QuestionPack:
+    """問題パックの読み込み
+
+    ヘッダー・文字列テーブル・インデックスのみを読み込み、各問題はアクセス時にデコードする。
+    get()は問題IDでインデックスを二分探索し、該当するレコードだけをデコードする。
+    """
+
+    def __init__(self, data: bytes):
+        self._data = memoryview(data)
+        (magic, version, _, self.record_count, string_count, meta_offset,
+         strings_offset, index_offset, self._records_offset) = struct.unpack_from(HEADER_FORMAT, data, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError("問題パックの形式ではありません")
+        if version != PACK_VERSION:
+            raise ValueError(f"未対応の問題パックのバージョンです: {version}")
+
+        metadata_text, _ = _read_text(self._data, meta_offset)
+        self.metadata = json.loads(metadata_text)
+
+        self._strings = []
+        pos = strings_offset
+        for _ in range(string_count):
+            value, pos = _read_text(self._data, pos)
+            self._strings.append(value)
+
+        self._index_ids = []
+        self._index_offsets = []
+        for i in range(self.record_count):
+            string_id, offset = struct.unpack_from(INDEX_ENTRY_FORMAT, data, index_offset + i * INDEX_ENTRY_SIZE)
+            self._index_ids.append(self._strings[string_id - 1])
+            self._index_offsets.append(offset)
+
+    @classmethod
+    def open(cls, pack_path) -> 'QuestionPack':
+        with open(pack_path, 'rb') as f:
+            return cls(f.read())
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __contains__(self, question_id: str) -> bool:
+        return self._find(question_id) is not None
+
+    def _find(self, question_id: str):
+        i = bisect.bisect_left(self._index_ids, question_id)
+        if i < len(self._index_ids) and self._index_ids[i] == question_id:
+            return self._index_offsets[i]
+        return None
+
+    def _decode_record_at(self, offset: int) -> tuple:
+        """レコード領域の相対位置offsetの問題をデコードし、(問題, 次のレコードの相対位置) を返す"""
+        pos = self._records_offset + offset
+        length, pos = _read_varint(self._data, pos)
+        question, _ = _decode_struct(self._data, pos, QUESTION_FIELDS, self._strings)
+        return question, pos + length - self._records_offset
+
+    def get(self, question_id: str):
+        """問題IDで問題を取得（存在しない場合はNone）"""
+        offset = self._find(question_id)
+        if offset is None:
+            return None
+        return self._decode_record_at(offset)[0]
+
+    def ids(self) -> list:
+        """問題IDのリスト（昇順）"""
+        return list(self._index_ids)
+
+    def __iter__(self):
+        """元のJSONの順序で問題を返す"""
+        offset = 0
+        for _ in range(self.record_count):
+            question, offset = self._decode_record_at(offset)
+            yield question
+
+    def to_document(self):
+        """元のJSONデータに戻す（メタデータがない場合は問題のリスト）"""
+        questions = list(self)
+        if self.metadata is None:
+            return questions
+        document = dict(self.metadata)
+        document['questions'] = questions
+        return document
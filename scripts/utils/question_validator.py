@@ -1,89 +1,318 @@
-"""生成された問題の検証"""
-import json
+"""生成された問題・登録する問題の検証
+
+検証ルールはフィールドごとの仕様（スキーマ）として定義し、compile_schemaで1回だけ
+フィールドごとの検査関数（クロージャ）に変換する。検査関数はエラーがなければNone、
+あればエラーコードを返す。
+
+- QuestionValidator.check: 1問を検証し、(フィールド, コード, メッセージ) のリストを返す（ストリーミング生成用）
+- QuestionValidator.validate_batch: 問題のリストをまとめて検証し、列指向のValidationReportを返す
+
+フィールドの仕様に指定できるキー:
+    required: 必須かどうか（デフォルト: True）
+    type: 型（タプルも可）。boolはintとして扱わない
+    non_empty: 文字列・リストが空（空白のみを含む）でないこと
+    length: リストの要素数
+    item_type / item_non_empty: リストの各要素の型・空でないこと
+    min_length: 文字列の最小の長さ
+    range: (最小値, 最大値)（両端を含む）
+    index_of: このフィールドの値が、指定したフィールドのリストのインデックスとして有効であること
+    messages: {エラーコード: メッセージ} （デフォルトのメッセージを上書きする）
+"""
+from array import array
+from collections import Counter
+
+_MISSING = object()
+
+# エラーコード → デフォルトのメッセージ
+DEFAULT_MESSAGES = {
+    'not_object': "問題がオブジェクトではありません",
+    'missing': "必須フィールド '{field}' がありません",
+    'type': "'{field}' の型が正しくありません（期待: {expected}）",
+    'empty': "'{field}' が空です",
+    'length': "'{field}' の要素数は{length}である必要があります",
+    'item': "'{field}' の要素はすべて空でない{item_type}である必要があります",
+    'too_short': "'{field}' が短すぎます（{min_length}文字以上）",
+    'range': "'{field}' は{range[0]}〜{range[1]}の範囲内である必要があります",
+    'index': "'{field}' が '{index_of}' の範囲外です",
+}
+
+# 生成した問題の検証（validate_question）
+BASIC_SCHEMA = {
+    'text': {'type': str, 'non_empty': True, 'messages': {'empty': "問題文が空です"}},
+    'options': {
+        'type': list, 'length': 4, 'item_type': str, 'item_non_empty': True,
+        'messages': {
+            'length': "選択肢は4つである必要があります",
+            'item': "すべての選択肢は空でない文字列である必要があります",
+        },
+    },
+    'answerIndex': {'type': int, 'range': (0, 3), 'messages': {'range': "answerIndexは0-3の範囲内である必要があります"}},
+    'explanation': {
+        'type': str, 'non_empty': True, 'min_length': 50,
+        'messages': {'empty': "解説が空です", 'too_short': "解説が短すぎます（50文字以上推奨）"},
+    },
+}
+
+# Gemini APIのレスポンスの問題（validate_batch_question・validate_category_question）
+# answerIndex・quizType・region・categoryId・referenceDateの値は検証後に補正するため、存在のみ確認する
+GENERATED_SCHEMA = {
+    'text': {},
+    'options': {'type': list, 'length': 4, 'messages': {'length': "選択肢が4つではありません", 'type': "選択肢が4つではありません"}},
+    'answerIndex': {},
+    'explanation': {},
+    'quizType': {},
+    'region': {},
+    'categoryId': {},
+    'referenceDate': {},
+    'weeklyMeta': {},
+}
+
+# DBに登録する問題（新しいスキーマ形式をconvert_new_schema_to_db_formatで変換した後）
+INGEST_SCHEMA = {
+    'id': {'type': str, 'non_empty': True, 'messages': {'missing': "問題にIDがありません", 'empty': "問題にIDがありません"}},
+    'text': {'type': str},
+    'options': {'type': list, 'item_type': str, 'messages': {'type': "optionsが配列ではありません"}},
+    'answerIndex': {'type': int, 'index_of': 'options'},
+    'explanation': {'type': str},
+    'category': {},
+    'difficulty': {},
+    'tags': {'type': (str, list)},
+    'quizType': {},
+}
+
+
+def _type_name(expected) -> str:
+    if isinstance(expected, tuple):
+        return '/'.join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def compile_field(spec: dict):
+    """フィールドの仕様を、値を受け取りエラーコード（エラーがなければNone）を返す関数に変換"""
+    required = spec.get('required', True)
+    expected = spec.get('type')
+    reject_bool = expected is not None and (expected is int or (isinstance(expected, tuple) and int in expected))
+    non_empty = spec.get('non_empty', False)
+    length = spec.get('length')
+    item_type = spec.get('item_type')
+    item_non_empty = spec.get('item_non_empty', False)
+    min_length = spec.get('min_length')
+    value_range = spec.get('range')
+
+    def check(value):
+        if value is _MISSING:
+            return 'missing' if required else None
+        if expected is not None:
+            if not isinstance(value, expected) or (reject_bool and value.__class__ is bool):
+                return 'type'
+        if non_empty and (not value.strip() if isinstance(value, str) else not value):
+            return 'empty'
+        if length is not None and len(value) != length:
+            return 'length'
+        if item_type is not None:
+            for item in value:
+                if not isinstance(item, item_type) or (item_non_empty and not item.strip()):
+                    return 'item'
+        if min_length is not None and len(value) < min_length:
+            return 'too_short'
+        if value_range is not None and not value_range[0] <= value <= value_range[1]:
+            return 'range'
+        return None
+
+    return check
+
+
+def compile_schema(schema: dict) -> 'QuestionValidator':
+    """スキーマを検査関数に変換したQuestionValidatorを作成（モジュールの読み込み時に1回だけ行う）"""
+    return QuestionValidator(schema)
+
+
+class ValidationReport:
+    """validate_batchの結果（エラーを (問題の位置, フィールド, コード) の列で保持する）"""
+
+    def __init__(self, total: int, messages: dict):
+        self.total = total
+        self.error_index = array('I')
+        self.error_field = []
+        self.error_code = []
+        self._messages = messages
+        self._invalid = set()
+
+    def add(self, index: int, field: str, code: str):
+        self.error_index.append(index)
+        self.error_field.append(field)
+        self.error_code.append(code)
+        self._invalid.add(index)
+
+    @property
+    def invalid_count(self) -> int:
+        return len(self._invalid)
+
+    @property
+    def valid_count(self) -> int:
+        return self.total - len(self._invalid)
+
+    def is_valid(self, index: int) -> bool:
+        return index not in self._invalid
+
+    def valid_indexes(self) -> list:
+        return [index for index in range(self.total) if index not in self._invalid]
+
+    def invalid_indexes(self) -> list:
+        return sorted(self._invalid)
+
+    def errors_for(self, index: int) -> list:
+        """問題1問の (フィールド, コード) のリスト"""
+        if index not in self._invalid:
+            return []
+        return [
+            (self.error_field[position], self.error_code[position])
+            for position, error_index in enumerate(self.error_index)
+            if error_index == index
+        ]
+
+    def messages_for(self, index: int) -> list:
+        return [self._messages[(field, code)] for field, code in self.errors_for(index)]
+
+    def errors_by_index(self) -> dict:
+        """{問題の位置: [(フィールド, コード), ...]}（エラーのある問題のみ）"""
+        grouped = {}
+        for index, field, code in zip(self.error_index, self.error_field, self.error_code):
+            grouped.setdefault(index, []).append((field, code))
+        return grouped
+
+    def code_counts(self) -> Counter:
+        """(フィールド, コード) ごとのエラー数"""
+        return Counter(zip(self.error_field, self.error_code))
+
+    def to_dict(self, max_examples: int = 20) -> dict:
+        grouped = self.errors_by_index()
+        return {
+            'total': self.total,
+            'valid': self.valid_count,
+            'invalid': self.invalid_count,
+            'error_counts': {
+                f"{field or '-'}:{code}": count
+                for (field, code), count in sorted(self.code_counts().items(), key=lambda item: (item[0][0] or '', item[0][1]))
+            },
+            'examples': [
+                {'index': index, 'errors': [self._messages[key] for key in grouped[index]]}
+                for index in sorted(grouped)[:max_examples]
+            ],
+        }
+
+
+class QuestionValidator:
+    """compile_schemaで作成する、スキーマから変換済みの検査関数を持つ検証器"""
+
+    def __init__(self, schema: dict):
+        self.schema = schema
+        # (フィールド, 検査関数) のリスト。存在のみを確認するフィールドは検査関数を呼ばずに確認する（None）
+        self.fields = [
+            (field, None if spec.get('required', True) and not set(spec) - {'required', 'messages'}
+             else compile_field(spec))
+            for field, spec in schema.items()
+        ]
+        self.index_rules = [
+            (field, spec['index_of']) for field, spec in schema.items() if spec.get('index_of')
+        ]
+        self.messages = {(None, 'not_object'): DEFAULT_MESSAGES['not_object']}
+        for field, spec in schema.items():
+            values = dict(spec, field=field, expected=_type_name(spec['type']) if 'type' in spec else '')
+            values.setdefault('item_type', str)
+            values['item_type'] = _type_name(values['item_type'])
+            for code, template in DEFAULT_MESSAGES.items():
+                if code == 'not_object':
+                    continue
+                template = spec.get('messages', {}).get(code, template)
+                try:
+                    self.messages[(field, code)] = template.format(**values)
+                except (KeyError, IndexError, TypeError):
+                    self.messages[(field, code)] = template
+
+    def _errors(self, question) -> list:
+        if not isinstance(question, dict):
+            return [(None, 'not_object')]
+        get = question.get
+        errors = []
+        for field, check in self.fields:
+            if check is None:
+                if field not in question:
+                    errors.append((field, 'missing'))
+                continue
+            code = check(get(field, _MISSING))
+            if code is not None:
+                errors.append((field, code))
+        for field, list_field in self.index_rules:
+            value = get(field)
+            items = get(list_field)
+            if (isinstance(value, int) and isinstance(items, list) and not (0 <= value < len(items))
+                    and not any(error[0] in (field, list_field) for error in errors)):
+                errors.append((field, 'index'))
+        return errors
+
+    def check(self, question) -> list:
+        """1問を検証し、(フィールド, コード, メッセージ) のリストを返す（エラーがなければ空のリスト）"""
+        return [(field, code, self.messages[(field, code)]) for field, code in self._errors(question)]
+
+    def validate_batch(self, questions: list) -> ValidationReport:
+        """問題のリストをまとめて検証"""
+        report = ValidationReport(len(questions), self.messages)
+        errors_of = self._errors
+        add = report.add
+        for index, question in enumerate(questions):
+            errors = errors_of(question)
+            if errors:
+                for field, code in errors:
+                    add(index, field, code)
+        return report
+
+
+BASIC_VALIDATOR = compile_schema(BASIC_SCHEMA)
+GENERATED_QUESTION_VALIDATOR = compile_schema(GENERATED_SCHEMA)
+INGEST_QUESTION_VALIDATOR = compile_schema(INGEST_SCHEMA)
+
+
+def missing_fields(errors: list) -> list:
+    """checkの結果から、存在しない必須フィールドのリストを返す"""
+    return [field for field, code, _ in errors if code == 'missing']
 
 
 def validate_question(question: dict) -> tuple[bool, list[str]]:
     """
     問題の妥当性を検証する
-    
+
+    エラーはBASIC_SCHEMAのフィールドの順に並ぶ（必須フィールド・型のエラーが先に並ぶとは限らない）。
+    boolはintとして扱わないため、answerIndexがtrue/falseの問題は型のエラーになる。
+
     Args:
         question: 検証する問題の辞書
-    
+
     Returns:
         (is_valid, errors) のタプル
     """
-    errors = []
-    
-    # 必須フィールドのチェック
-    required_fields = {
-        'text': str,
-        'options': list,
-        'answerIndex': int,
-        'explanation': str,
-    }
-    
-    for field, field_type in required_fields.items():
-        if field not in question:
-            errors.append(f"必須フィールド '{field}' がありません")
-        elif not isinstance(question[field], field_type):
-            errors.append(f"'{field}' の型が正しくありません（期待: {field_type.__name__}）")
-    
-    # 選択肢のチェック
-    if 'options' in question:
-        if len(question['options']) != 4:
-            errors.append("選択肢は4つである必要があります")
-        elif not all(isinstance(opt, str) and opt.strip() for opt in question['options']):
-            errors.append("すべての選択肢は空でない文字列である必要があります")
-    
-    # answerIndexのチェック
-    if 'answerIndex' in question:
-        if not (0 <= question['answerIndex'] <= 3):
-            errors.append("answerIndexは0-3の範囲内である必要があります")
-        elif 'options' in question and len(question['options']) == 4:
-            # 選択肢のインデックスが有効か確認
-            pass
-    
-    # 問題文のチェック
-    if 'text' in question:
-        if not question['text'].strip():
-            errors.append("問題文が空です")
-    
-    # 解説のチェック
-    if 'explanation' in question:
-        if not question['explanation'].strip():
-            errors.append("解説が空です")
-        elif len(question['explanation']) < 50:
-            errors.append("解説が短すぎます（50文字以上推奨）")
-    
+    errors = [message for _, _, message in BASIC_VALIDATOR.check(question)]
     return len(errors) == 0, errors
 
 
 def validate_questions(questions: list) -> dict:
     """
     複数の問題を検証する
-    
+
     Args:
         questions: 検証する問題のリスト
-    
+
     Returns:
         検証結果の辞書
     """
-    results = {
-        'total': len(questions),
-        'valid': 0,
-        'invalid': 0,
-        'errors': []
+    report = BASIC_VALIDATOR.validate_batch(questions)
+    grouped = report.errors_by_index()
+    return {
+        'total': report.total,
+        'valid': report.valid_count,
+        'invalid': report.invalid_count,
+        'errors': [
+            {'index': index, 'errors': [BASIC_VALIDATOR.messages[key] for key in grouped[index]]}
+            for index in sorted(grouped)
+        ]
     }
-    
-    for i, question in enumerate(questions):
-        is_valid, errors = validate_question(question)
-        if is_valid:
-            results['valid'] += 1
-        else:
-            results['invalid'] += 1
-            results['errors'].append({
-                'index': i,
-                'errors': errors
-            })
-    
-    return results
@@ -0,0 +1,179 @@
+"""Gemini API呼び出しのレート制限とバックオフ
+
+並列実行中のすべての呼び出し元で1つのRateLimiterを共有し、
+リクエスト数/分・トークン数/分の上限を超えないように送信タイミングを調整する。
+クォータ超過（429）が発生した場合は、サーバーが指定した待機時間（retry-after）を
+全呼び出し元に適用し、待機明けのリクエストも一定間隔で送信されるようにする。
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+
+class TokenBucket:
+    """1分あたりの上限を持つトークンバケット
+
+    予約方式で、トークンが不足していても即座に消費して残量をマイナスにし、
+    その分の待機時間を返す。呼び出し元は予約順に一定間隔で送信できる。
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.fill_rate = self.capacity / 60.0  # 1秒あたりの補充量
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.fill_rate)
+            self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """amount分を予約し、送信可能になるまでの待機秒数を返す"""
+        self._refill(now)
+        # 1回のリクエストがバケット容量を超える場合は容量分として扱う
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.fill_rate
+
+    def adjust(self, delta: float, now: float):
+        """予約量と実際の使用量の差分を反映（deltaが正なら追加で消費）"""
+        self._refill(now)
+        self.tokens -= delta
+
+    def block_until(self, deadline: float, now: float):
+        """deadlineちょうどに1件分だけ送信できる残量にする
+
+        待機明けのリクエストは1件ずつ補充間隔を空けて送信され、一斉送信にならない
+        """
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - (deadline - now) * self.fill_rate)
+
+
+class RateLimiter:
+    """リクエスト数/分とトークン数/分の両方を制限するレートリミッター
+
+    スレッド・asyncioのどちらから呼び出しても同じ制限を共有する。
+    per_minuteに0以下を指定した項目は制限しない。
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self._lock = threading.Lock()
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int = 0) -> float:
+        """1リクエスト分（tokensトークン）を予約し、待機秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._paused_until - now)
+            if self._request_bucket is not None:
+                wait = max(wait, self._request_bucket.reserve(1, now))
+            if self._token_bucket is not None and tokens > 0:
+                wait = max(wait, self._token_bucket.reserve(tokens, now))
+            return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """送信可能になるまでブロックする（待機した秒数を返す）"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """acquireの非同期版"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """レスポンスの実際のトークン使用量で予約量を補正"""
+        if self._token_bucket is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._token_bucket.adjust(actual_tokens - estimated_tokens, time.monotonic())
+
+    def pause(self, seconds: float):
+        """クォータ超過時に、すべての呼び出し元の送信をseconds秒停止する"""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            if self._request_bucket is not None:
+                self._request_bucket.block_until(self._paused_until, now)
+
+
+def compute_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """ジッター付き指数バックオフ（Full Jitter）の待機秒数を計算
+
+    複数の呼び出し元が同時に失敗しても、再試行のタイミングが揃わないようにする
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def estimate_tokens(text: str) -> int:
+    """プロンプトのトークン数を概算（日本語主体のため1文字≒1トークンとして多めに見積もる）"""
+    return len(text)
+
+
+def get_response_token_count(response):
+    """レスポンスのusage_metadataから合計トークン数を取得（取得できない場合はNone）"""
+    usage = getattr(response, 'usage_metadata', None)
+    return getattr(usage, 'total_token_count', None)
+
+
+def is_quota_error(error: Exception) -> bool:
+    """クォータ超過（429 / RESOURCE_EXHAUSTED）のエラーかどうか
+
+    google.genaiのerrors.APIErrorのcode・status、またはエラー詳細（{"error": {"code", "status"}}）のみで判定する。
+    エラーメッセージの文字列は見ない（"(char 429)" や "quota" を含む無関係のエラーで、
+    すべての呼び出し元が共有するリミッターを一時停止させないため）
+    """
+    if getattr(error, 'code', None) == 429 or getattr(error, 'status', None) == 'RESOURCE_EXHAUSTED':
+        return True
+    details = getattr(error, 'details', None)
+    info = details.get('error') if isinstance(details, dict) else None
+    if isinstance(info, dict):
+        return info.get('code') == 429 or info.get('status') == 'RESOURCE_EXHAUSTED'
+    return False
+
+
+def get_retry_after_seconds(error: Exception):
+    """エラーからサーバーが指定した待機秒数を取得（指定がない場合はNone）
+
+    以下の順に確認する:
+    1. HTTPレスポンスのRetry-Afterヘッダー
+    2. エラー詳細のgoogle.rpc.RetryInfo（retryDelay: "37s"）
+    3. エラーメッセージ中の "retry in 37.5s"
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers is not None:
+        try:
+            value = headers.get('retry-after') or headers.get('Retry-After')
+            if value is not None:
+                return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+
+    details = getattr(error, 'details', None)
+    try:
+        text = json.dumps(details, ensure_ascii=False) if details else str(error)
+    except (TypeError, ValueError):
+        text = str(error)
+    if details:
+        text += ' ' + str(error)
+
+    match = re.search(r'retryDelay["\']?\s*[:=]\s*["\']?(\d+(?:\.\d+)?)s', text)
+    if match:
+        return float(match.group(1))
+    match = re.search(r'retry in (\d+(?:\.\d+)?)\s*s', text, re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
@@ -0,0 +1,117 @@
+"""Gemini APIレスポンスのディスクキャッシュ
+
+(モデル名, プロンプト, ツール設定) のハッシュをキーとして、レスポンス本文を
+1キー1ファイルで保存する。同じ--dateでの再実行や、一部カテゴリの失敗からの
+復旧時に、成功済みのリクエストをAPIに再送しないために使用する。
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class ResponseCache:
+    """TTLとサイズ上限付きのレスポンスキャッシュ
+
+    - 有効期限（ttl_seconds）を過ぎたエントリは読み込み時・整理時に削除する
+    - 合計サイズがmax_bytesを超えた場合は、最終アクセスが古いものから削除する
+    """
+
+    def __init__(self, cache_dir, ttl_seconds: float, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, config: dict) -> str:
+        """モデル名・プロンプト・ツール設定からキャッシュキー（SHA-256）を作成"""
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "config": config},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str):
+        """キャッシュされたレスポンス本文を返す（存在しない・期限切れの場合はNone）"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        # 最終アクセス時刻を更新（サイズ超過時の削除順に使用）
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return entry.get('text')
+
+    def set(self, key: str, text: str, model: str = None):
+        """レスポンス本文を保存し、必要に応じて古いエントリを削除"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "model": model,
+            "created_at": time.time(),
+            "text": text,
+        }
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """期限切れのエントリと、サイズ上限を超えた分のエントリを削除"""
+        with self._lock:
+            if not self.cache_dir.exists():
+                return
+            now = time.time()
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                # 更新時刻（最終アクセス時刻）が有効期限より前なら、作成時刻も必ず期限切れ
+                if now - stat.st_mtime > self.ttl_seconds:
+                    self._remove(path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in entries)
+            if total_size <= self.max_bytes:
+                return
+
+            # 最終アクセスが古い順に削除
+            entries.sort()
+            for _, size, path in entries:
+                if total_size <= self.max_bytes:
+                    break
+                self._remove(path)
+                total_size -= size
+
+    def clear(self):
+        """すべてのエントリを削除"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,138 @@
+"""ベンチマーク用の合成問題の生成
+
+新しいスキーマ形式（quizTypeあり）の問題を生成する。生成した問題は、生成時の検証（BASIC_SCHEMA）と
+DB登録時の検証（INGEST_SCHEMA）の両方を満たす。
+同じシードからは同じ問題を生成し、duplicate_ratioを指定すると、その割合の問題を先に生成した問題と
+同じ内容（IDのみ異なる）にする（重複チェックの計測用）。
+
+- generate_questions: 問題を1問ずつ返すジェネレーター
+- weekly_recap_document: Weekly Recap形式（{"questions": [...]}）のドキュメント
+- write_questions_json: 問題をJSONファイルに1問ずつ書き出す（配列・Weekly Recap形式）
+- model_response_text: Gemini APIのレスポンスと同じ形式（```json ... ```）のテキスト
+"""
+import json
+import random
+
+QUIZ_TYPES = ['team', 'history', 'rule', 'weekly']
+DIFFICULTIES = ['easy', 'normal', 'hard']
+CATEGORY_IDS = {
+    'japan': ['weekly-jp-match', 'weekly-jp-standings', 'weekly-jp-player', 'weekly-jp-club', 'weekly-jp-buzz'],
+    'world': ['weekly-world-match', 'weekly-world-standings', 'weekly-world-japanese', 'weekly-world-player',
+              'weekly-world-buzz'],
+}
+TEAMS = ['鹿島アントラーズ', '浦和レッズ', '川崎フロンターレ', '横浜F・マリノス', 'ガンバ大阪', 'ヴィッセル神戸',
+         'レアル・マドリード', 'バルセロナ', 'マンチェスター・シティ', 'リヴァプール', 'バイエルン', 'インテル']
+SUBJECTS = ['優勝', '得点王', '最多アシスト', '初出場', '連勝記録', '監督交代', '移籍', '記録更新']
+TEXT_TEMPLATES = [
+    '{year}年に{subject}を達成したクラブはどれ？',
+    '{year}年シーズン、{subject}で話題になったのはどのチーム？',
+    '次のうち、{year}年の{subject}に最も関係が深いクラブは？',
+    '{subject}の記録が生まれた{year}年、その中心にいたクラブを選べ。',
+]
+# 問題文が互いに類似しすぎないように加える語（実際の問題の固有名詞の代わり）
+KANA = 'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン'
+LAYOUTS = ['array', 'weekly']
+REFERENCE_DATE = '2026-02-02'
+
+
+def _question(index: int, rng: random.Random) -> dict:
+    region = rng.choice(['japan', 'world'])
+    quiz_type = rng.choice(QUIZ_TYPES)
+    team_a, team_b, team_c, team_d = rng.sample(TEAMS, 4)
+    subject = rng.choice(SUBJECTS)
+    year = rng.randrange(1993, 2026)
+    options = [f"{team_a}（{year}年）", f"{team_b}（{year}年）", f"{team_c}（{year}年）", f"{team_d}（{year}年）"]
+    answer_index = rng.randrange(4)
+    question = {
+        'id': f"bench_{index:07d}",
+        'quizType': quiz_type,
+        'difficulty': rng.choice(DIFFICULTIES),
+        'region': region,
+        'league': None,
+        'team': None,
+        'teamId': None,
+        'categoryId': rng.choice(CATEGORY_IDS[region]) if quiz_type == 'weekly' else None,
+        'tags': ['benchmark', subject, team_a],
+        'text': (rng.choice(TEXT_TEMPLATES).format(year=year, subject=subject)
+                 + f"（{''.join(rng.choices(KANA, k=12))}・問題{index}）"),
+        'options': options,
+        'answerIndex': answer_index,
+        'explanation': (f"{year}年の{subject}は{options[answer_index]}が達成しました。"
+                        f"この年は{team_b}と{team_c}も上位に入り、最後まで接戦が続いたシーズンとして知られています。"),
+        'trivia': f"{team_d}は同じ年に{rng.choice(SUBJECTS)}でも話題になりました。",
+        'referenceDate': REFERENCE_DATE,
+    }
+    if quiz_type == 'weekly':
+        question['weeklyMeta'] = {
+            'matchweek': rng.randrange(1, 39),
+            'matchDate': None,
+            'publishDate': REFERENCE_DATE,
+            'expiryDate': '2026-02-09',
+            'season': str(year),
+        }
+    return question
+
+
+def generate_questions(count: int, seed: int = 0, duplicate_ratio: float = 0.0):
+    """合成問題を1問ずつ返すジェネレーター
+
+    Args:
+        count: 問題数
+        seed: 乱数のシード
+        duplicate_ratio: 先に生成した問題と内容が同じ（IDのみ異なる）問題の割合（0〜1）
+    """
+    rng = random.Random(seed)
+    originals = []
+    for index in range(count):
+        if originals and rng.random() < duplicate_ratio:
+            question = dict(rng.choice(originals), id=f"bench_{index:07d}")
+        else:
+            question = _question(index, rng)
+            if duplicate_ratio and len(originals) < 10_000:
+                originals.append(question)
+        yield question
+
+
+def weekly_recap_document(questions: list, league_type: str = 'j1', date: str = REFERENCE_DATE) -> dict:
+    """Weekly Recap形式のドキュメント（generate_weekly_recap.save_weekly_recap_jsonと同じ形式）"""
+    return {
+        'version': '1.0',
+        'generated_at': f"{date}T00:00:00Z",
+        'category': 'match_recap',
+        'league_type': league_type,
+        'date': date,
+        'questions': questions,
+    }
+
+
+def write_questions_json(path, questions, layout: str = 'array') -> int:
+    """問題を1問ずつJSONファイルに書き出し、書き出した問題数を返す（問題のリストをメモリに保持しない）
+
+    Args:
+        layout: 'array'（[...]）または 'weekly'（Weekly Recap形式の{"questions": [...]}）
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layoutは{', '.join(LAYOUTS)}のいずれかを指定してください: {layout}")
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        if layout == 'weekly':
+            header = json.dumps(weekly_recap_document([]), ensure_ascii=False, indent=2)
+            f.write(header[:header.rindex('[') + 1] + '\n')
+        else:
+            f.write('[\n')
+        for question in questions:
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(question, ensure_ascii=False, indent=2))
+            count += 1
+        f.write('\n]' + ('\n}' if layout == 'weekly' else '') + '\n')
+    return count
+
+
+def model_response_text(questions: list) -> str:
+    """Gemini APIのレスポンスと同じ形式（説明文とマークダウンのコードブロック）のテキスト"""
+    return (
+        "以下が作成した問題です。\n\n```json\n"
+        + json.dumps(questions, ensure_ascii=False, indent=2)
+        + "\n```\n"
+    )
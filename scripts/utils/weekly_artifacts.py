@@ -0,0 +1,163 @@
+"""Weekly Recapの配信用ファイル（圧縮版・マニフェスト）の作成
+
+- 圧縮版: {date}_{league_type}.json.gz（gzip）と .json.br（brotli、パッケージがある場合のみ）
+  配信側でContent-Encodingを付けて返せるよう、事前に最高圧縮率で作成しておく
+- マニフェスト: 出力ディレクトリのmanifest.json
+  週・リーグごとに内容のハッシュ（SHA-256）・バイト数・問題数・各形式のファイルを一覧にする。
+  アプリはマニフェストだけを取得し、ハッシュが変わったファイル（通常は最新の週）のみを取得すればよい。
+  内容に変更がない場合はマニフェストを書き換えない（ETag・キャッシュが無効にならない）。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from utils.question_pack import QuestionPack
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = '1.0'
+# Weekly RecapのJSONファイル名: {YYYY-MM-DD}_{league_type}.json
+WEEKLY_FILE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})_([a-z0-9]+)\.json$')
+# 配信用の別形式（JSONファイル名に付ける拡張子）
+VARIANT_SUFFIXES = {
+    'gzip': '.json.gz',
+    'brotli': '.json.br',
+    'qpk': '.qpk',
+}
+
+
+def is_weekly_recap_file(path: Path) -> bool:
+    """Weekly RecapのJSONファイル名かどうか（manifest.jsonなどを除外する）"""
+    return WEEKLY_FILE_PATTERN.match(Path(path).name) is not None
+
+
+def get_variant_path(json_path: Path, variant: str) -> Path:
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + VARIANT_SUFFIXES[variant])
+
+
+def _write_bytes_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_compressed_variants(json_path: Path) -> list:
+    """JSONファイルのgzip版・brotli版を作成し、作成したファイルのリストを返す
+
+    gzipはヘッダーの更新時刻を0にし、同じ内容からは常に同じバイト列を作成する
+    """
+    json_path = Path(json_path)
+    data = json_path.read_bytes()
+    written = []
+
+    gzip_path = get_variant_path(json_path, 'gzip')
+    _write_bytes_atomic(gzip_path, gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(gzip_path)
+
+    brotli_path = get_variant_path(json_path, 'brotli')
+    if brotli is not None:
+        _write_bytes_atomic(brotli_path, brotli.compress(data, quality=11))
+        written.append(brotli_path)
+    elif brotli_path.exists():
+        # 古い内容のbrotli版が残らないように削除する
+        brotli_path.unlink()
+    return written
+
+
+def _variant_matches(variant: str, variant_data: bytes, data: bytes, document) -> bool:
+    """別形式のファイルをデコードし、JSONと同じ内容かどうかを確認"""
+    try:
+        if variant == 'gzip':
+            return gzip.decompress(variant_data) == data
+        if variant == 'brotli':
+            # brotliがない環境では確認できないため、存在するファイルをそのまま載せる
+            return brotli is None or brotli.decompress(variant_data) == data
+        if variant == 'qpk':
+            return QuestionPack(variant_data).to_document() == document
+    except Exception:
+        return False
+    return False
+
+
+def build_manifest_entry(json_path: Path) -> dict:
+    """1ファイル分のマニフェストの項目を作成"""
+    json_path = Path(json_path)
+    data = json_path.read_bytes()
+    date, league_type = WEEKLY_FILE_PATTERN.match(json_path.name).groups()
+    document = json.loads(data)
+
+    variants = {}
+    for variant in VARIANT_SUFFIXES:
+        variant_path = get_variant_path(json_path, variant)
+        # JSONと内容が一致しない（古い）別形式は載せない
+        if variant_path.exists() and _variant_matches(variant, variant_path.read_bytes(), data, document):
+            variants[variant] = {'file': variant_path.name, 'bytes': variant_path.stat().st_size}
+
+    return {
+        'date': date,
+        'league_type': league_type,
+        'file': json_path.name,
+        'sha256': hashlib.sha256(data).hexdigest(),
+        'bytes': len(data),
+        'question_count': len(document.get('questions', [])),
+        'generated_at': document.get('generated_at'),
+        'variants': variants,
+    }
+
+
+def build_manifest(output_dir: Path) -> dict:
+    """出力ディレクトリ内のWeekly Recapファイルからマニフェストを作成（新しい週が先頭）"""
+    output_dir = Path(output_dir)
+    entries = [
+        build_manifest_entry(path)
+        for path in output_dir.glob('*.json')
+        if is_weekly_recap_file(path)
+    ]
+    entries.sort(key=lambda entry: (entry['date'], entry['league_type']), reverse=True)
+
+    latest = {}
+    for entry in entries:
+        latest.setdefault(entry['league_type'], entry['date'])
+
+    return {
+        'version': MANIFEST_VERSION,
+        'generated_at': datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'latest': latest,
+        'files': entries,
+    }
+
+
+def write_manifest(output_dir: Path) -> tuple:
+    """マニフェストを作成して保存
+
+    Returns:
+        (マニフェストのパス, 書き換えたかどうか) のタプル
+    """
+    manifest_path = Path(output_dir) / MANIFEST_FILENAME
+    manifest = build_manifest(output_dir)
+
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            current = None
+        if (current is not None
+                and current.get('version') == manifest['version']
+                and current.get('latest') == manifest['latest']
+                and current.get('files') == manifest['files']):
+            return manifest_path, False
+
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    _write_bytes_atomic(manifest_path, data)
+    return manifest_path, True
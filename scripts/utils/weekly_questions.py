@@ -0,0 +1,314 @@
+"""Gemini APIのレスポンスの問題の解析・検証・補完
+
+APIクライアントやAPIキーを必要としない処理のみを置く（gemini_client.pyから分離）。
+レスポンスのテキストからのJSONの抽出・復元、生成された問題の検証とフィールドの補完を行う。
+"""
+import json
+import re
+
+from utils.json_stream import find_array_start, salvage_json_array
+from utils.question_validator import GENERATED_QUESTION_VALIDATOR, missing_fields
+
+# 一括生成で要求する問題数
+BATCH_QUESTION_COUNT = 30
+
+
+def check_region_category_id(region: str, category_id: str):
+    """regionとcategoryIdの整合性チェック"""
+    if region == "japan" and not category_id.startswith("weekly-jp-"):
+        raise ValueError(f"region='japan'の場合、categoryIdは'weekly-jp-*'で始まる必要があります。現在の値: {category_id}")
+    if region == "world" and not category_id.startswith("weekly-world-"):
+        raise ValueError(f"region='world'の場合、categoryIdは'weekly-world-*'で始まる必要があります。現在の値: {category_id}")
+
+
+def extract_json_text(response_text: str) -> str:
+    """モデルのレスポンスからJSON配列部分の文字列を抽出"""
+    response_text = response_text.strip()
+    
+    # マークダウンコードブロックからJSONを抽出
+    # ```json ... ``` の形式を探す
+    json_match = re.search(r'```json\s*\n(.*?)\n```', response_text, re.DOTALL)
+    if json_match:
+        # JSONブロックが見つかった場合
+        return json_match.group(1).strip()
+    
+    # JSONブロックが見つからない場合、通常の``` ... ```を探す
+    json_match = re.search(r'```\s*\n(.*?)\n```', response_text, re.DOTALL)
+    if json_match:
+        return json_match.group(1).strip()
+    
+    # コードブロックがない場合、JSON配列の開始位置を探す（説明文中の [参考: 3件] などは読み飛ばす）
+    json_start = find_array_start(response_text)
+    json_end = response_text.rfind(']') + 1
+    if json_start != -1 and json_end > json_start:
+        return response_text[json_start:json_end]
+    
+    # それでも見つからない場合は、説明文を除去してから試す
+    # 最初の[から最後の]までを抽出
+    if '[' in response_text:
+        response_text = response_text[response_text.find('['):]
+        if ']' in response_text:
+            response_text = response_text[:response_text.rfind(']') + 1]
+    return response_text
+
+
+def _complete_weekly_question(
+    question_data: dict,
+    index: int,
+    reference_date: str,
+    matchweek: int,
+    publish_date: str,
+    expiry_date: str,
+    season: str,
+    default_category: str
+):
+    """tags・team・referenceDate・weeklyMeta・デフォルト値を補完"""
+    i = index
+    
+    # tagsが配列形式であることを確認（文字列の場合は分割）
+    tags_value = question_data.get('tags', [])
+    if isinstance(tags_value, str):
+        # カンマ区切りの文字列を配列に変換
+        question_data['tags'] = [tag.strip() for tag in tags_value.split(',') if tag.strip()]
+    elif not isinstance(tags_value, list):
+        question_data['tags'] = []
+    
+    # teamとteamIdは常にnull
+    question_data['team'] = None
+    question_data['teamId'] = None
+    
+    # referenceDateが正しいことを確認
+    if question_data.get('referenceDate') != reference_date:
+        print(f"警告: 問題{i+1}のreferenceDateが'{reference_date}'ではありません。修正します。")
+        question_data['referenceDate'] = reference_date
+    
+    # weeklyMetaの検証と補完
+    weekly_meta = question_data.get('weeklyMeta', {})
+    if not isinstance(weekly_meta, dict):
+        weekly_meta = {}
+    
+    # weeklyMetaの必須フィールドを補完
+    weekly_meta.setdefault('matchweek', matchweek)
+    weekly_meta.setdefault('matchDate', None)
+    weekly_meta.setdefault('publishDate', publish_date)
+    weekly_meta.setdefault('expiryDate', expiry_date)
+    weekly_meta.setdefault('season', season)
+    question_data['weeklyMeta'] = weekly_meta
+    
+    # デフォルト値の設定
+    question_data.setdefault('difficulty', 'normal')
+    question_data.setdefault('category', default_category)
+    question_data.setdefault('trivia', '')
+    question_data.setdefault('league', None)
+
+
+def _check_generated_question(question_data, index: int) -> bool:
+    """必須フィールド・選択肢の数を検証し、スキップする場合は警告を表示してFalseを返す"""
+    errors = GENERATED_QUESTION_VALIDATOR.check(question_data)
+    if not errors:
+        return True
+    if not isinstance(question_data, dict):
+        print(f"警告: 問題{index+1}がオブジェクトではありません。スキップします。")
+    elif missing_fields(errors):
+        print(f"警告: 問題{index+1}に必須フィールドがありません: {missing_fields(errors)}。スキップします。")
+    else:
+        print(f"警告: 問題{index+1}の{errors[0][2]}。スキップします。")
+    return False
+
+
+def validate_batch_question(
+    question_data: dict,
+    index: int,
+    region: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None
+):
+    """30問一括生成の問題1問を検証し、フィールドを補完する
+    
+    Returns:
+        補完済みの問題（スキップする場合はNone）
+    """
+    i = index
+    if not _check_generated_question(question_data, i):
+        return None
+    
+    # answerIndexが0であることを確認（プロンプトで0に固定）
+    if question_data.get('answerIndex', -1) != 0:
+        print(f"警告: 問題{i+1}のanswerIndexが0ではありません。0に修正します。")
+        question_data['answerIndex'] = 0
+    
+    # quizTypeが"weekly"であることを確認
+    if question_data.get('quizType') != 'weekly':
+        print(f"警告: 問題{i+1}のquizTypeが'weekly'ではありません。修正します。")
+        question_data['quizType'] = 'weekly'
+    
+    # regionが正しいことを確認
+    if question_data.get('region') != region:
+        print(f"警告: 問題{i+1}のregionが'{region}'ではありません。修正します。")
+        question_data['region'] = region
+    
+    _complete_weekly_question(
+        question_data, i, reference_date, matchweek,
+        publish_date, expiry_date, season, 'match_recap'
+    )
+    return question_data
+
+
+def validate_category_question(
+    question_data: dict,
+    index: int,
+    region: str,
+    category_id: str,
+    category_name: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None
+):
+    """カテゴリ別生成の問題1問を検証し、フィールドを補完する
+    
+    Returns:
+        補完済みの問題（スキップする場合はNone）
+    """
+    i = index
+    if not _check_generated_question(question_data, i):
+        return None
+    
+    # answerIndexが0であることを確認
+    if question_data.get('answerIndex', -1) != 0:
+        print(f"警告: 問題{i+1}のanswerIndexが0ではありません。0に修正します。")
+        question_data['answerIndex'] = 0
+    
+    # quizTypeが"weekly"であることを確認
+    if question_data.get('quizType') != 'weekly':
+        print(f"警告: 問題{i+1}のquizTypeが'weekly'ではありません。修正します。")
+        question_data['quizType'] = 'weekly'
+    
+    # regionが正しいことを確認
+    if question_data.get('region') != region:
+        print(f"警告: 問題{i+1}のregionが'{region}'ではありません。修正します。")
+        question_data['region'] = region
+    
+    # categoryIdが正しいことを確認
+    if question_data.get('categoryId') != category_id:
+        print(f"警告: 問題{i+1}のcategoryIdが'{category_id}'ではありません。修正します。")
+        question_data['categoryId'] = category_id
+    
+    # regionとcategoryIdの整合性をチェック
+    question_region = question_data.get('region', '')
+    question_category_id = question_data.get('categoryId', '')
+    if question_region == "japan" and not question_category_id.startswith("weekly-jp-"):
+        print(f"エラー: 問題{i+1}でregion='japan'なのにcategoryId='{question_category_id}'です。スキップします。")
+        return None
+    if question_region == "world" and not question_category_id.startswith("weekly-world-"):
+        print(f"エラー: 問題{i+1}でregion='world'なのにcategoryId='{question_category_id}'です。スキップします。")
+        return None
+    
+    _complete_weekly_question(
+        question_data, i, reference_date, matchweek,
+        publish_date, expiry_date, season, category_name
+    )
+    return question_data
+
+
+def validate_question_list(questions_data: list, validate_item, expected_count: int, category_id: str = None) -> list:
+    """問題データのリストを1問ずつ検証し、有効な問題のリストを返す
+    
+    Args:
+        validate_item: (問題データ, インデックス) を受け取り、補完済みの問題またはNoneを返す関数
+        expected_count: 要求した問題数（超過分は切り捨てる）
+        category_id: ログ出力用のカテゴリID（一括生成の場合はNone）
+    """
+    context = f"（カテゴリ: {category_id}）" if category_id else ""
+    
+    # 問題数の確認
+    if len(questions_data) < expected_count:
+        print(f"警告: 要求された{expected_count}問に対して{len(questions_data)}問しか生成されませんでした")
+    
+    # 各問題のバリデーションとフィールド補完
+    validated_questions = []
+    for i, question_data in enumerate(questions_data[:expected_count]):
+        validated_question = validate_item(question_data, i)
+        if validated_question is not None:
+            validated_questions.append(validated_question)
+    
+    if len(validated_questions) == 0:
+        raise ValueError(f"有効な問題が1問も生成されませんでした{context}")
+    
+    print(f"成功: {len(validated_questions)}問を生成しました{context}")
+    return validated_questions
+
+
+def validate_batch_questions(
+    questions_data: list,
+    region: str,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None
+) -> list:
+    """30問一括生成のレスポンスを検証し、フィールドを補完する"""
+    return validate_question_list(
+        questions_data,
+        lambda question_data, i: validate_batch_question(
+            question_data, i, region, reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        BATCH_QUESTION_COUNT
+    )
+
+
+def validate_category_questions(
+    questions_data: list,
+    region: str,
+    category_id: str,
+    category_name: str,
+    question_count: int,
+    reference_date: str,
+    matchweek: int = None,
+    publish_date: str = None,
+    expiry_date: str = None,
+    season: str = None
+) -> list:
+    """カテゴリ別生成のレスポンスを検証し、フィールドを補完する"""
+    return validate_question_list(
+        questions_data,
+        lambda question_data, i: validate_category_question(
+            question_data, i, region, category_id, category_name,
+            reference_date, matchweek, publish_date, expiry_date, season
+        ),
+        question_count,
+        category_id=category_id
+    )
+
+
+def print_json_element_errors(errors: list):
+    """パースできなかった配列要素を警告として表示"""
+    for error in errors:
+        print(f"警告: 問題{error['index']+1}のJSONを解析できませんでした。スキップします。({error['error']})")
+
+
+def load_questions_json(json_text: str, response_text: str = None) -> list:
+    """抽出したJSON文字列をパースして問題データのリストを返す
+    
+    JSONが途中で切れている・一部が壊れている場合は、レスポンス全体から
+    完全な問題オブジェクトだけを復元する（1問も復元できない場合は例外を送出）
+    """
+    try:
+        questions_data = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        questions_data, errors = salvage_json_array(response_text or json_text)
+        if not questions_data:
+            raise
+        print_json_element_errors(errors)
+        print(f"警告: JSONの解析に失敗したため（{e}）、完全な{len(questions_data)}問を復元しました")
+        return questions_data
+    
+    # リストでない場合はリストに変換
+    if not isinstance(questions_data, list):
+        questions_data = [questions_data]
+    return questions_data